@@ -9,7 +9,7 @@ from pathlib import Path
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from simpldb.parser import SQLParser
+from simpldb.parser import QueryType, SQLParser
 
 def test_column_parsing():
     """Test individual column parsing"""
@@ -107,9 +107,9 @@ def test_multiple_queries():
         print(f"\n{i}. {sql}")
         try:
             query = parser.parse(sql)
-            print(f"   ✅ Type: {query.query_type.value}")
+            print(f"   ✅ Type: {query.query_type.name}")
             if hasattr(query, 'columns') and isinstance(query.columns, list):
-                if query.query_type.value == 'CREATE_TABLE':
+                if query.query_type == QueryType.CREATE_TABLE:
                     print(f"   Columns: {len(query.columns)}")
                     for col in query.columns:
                         print(f"      - {col.name} {col.data_type}" + 
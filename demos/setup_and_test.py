@@ -144,13 +144,8 @@ def run_full_tests():
     print("="*70 + "\n")
     
     try:
-        # Add project root to path
-        sys.path.insert(0, str(Path.cwd()))
-        
-        # Import and run tests
-        from tests import test_query_engine
-        test_query_engine.run_all_tests()
-        return True
+        import pytest
+        return pytest.main([str(Path.cwd() / "tests"), "-q"]) == 0
     except Exception as e:
         print(f"❌ Full test suite failed: {e}")
         import traceback
@@ -17,7 +17,11 @@ def main():
 
     args = parser.parse_args()
 
-    repl = SimplDBREPL(db_name=args.name, data_dir=args.data_dir)
+    repl = SimplDBREPL(
+        db_name=args.name,
+        data_dir=args.data_dir,
+        interactive=not args.execute and sys.stdin.isatty(),
+    )
 
     if args.execute:
         repl.execute_sql(args.execute)
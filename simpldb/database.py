@@ -4,10 +4,21 @@ Main database interface that orchestrates all components
 """
 
 import json
+import os
 from datetime import datetime
 from pathlib import Path
 from threading import RLock
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; the stdlib json is used instead
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows; the data directory is not locked
+    fcntl = None
 
 from simpldb.executor import QueryExecutor, QueryResult
 from simpldb.indexes import IndexManager
@@ -15,6 +26,40 @@ from simpldb.parser import SQLParser
 from simpldb.schema import SchemaManager
 from simpldb.storage import Storage
 
+# Catalog changes appended to catalog.wal before catalog.json is rewritten
+CATALOG_CHECKPOINT_EVERY = 100
+
+# Database durability level -> storage sync policy. "full" fsyncs every
+# change (including the catalog), "batch" fsyncs table logs from a
+# background thread, "none" leaves flushing to the OS
+DURABILITY_LEVELS = {"none": "none", "batch": "batch", "full": "always"}
+
+# Held with an exclusive flock by the Database using a data directory
+LOCK_FILE = "simpldb.lock"
+
+
+def _encode(obj: Any, indent: bool = False) -> bytes:
+    """Serialize catalog data to JSON bytes"""
+    if orjson is not None:
+        try:
+            option = orjson.OPT_INDENT_2 if indent else 0
+            return orjson.dumps(obj, option=option)
+        except TypeError:
+            pass  # e.g. integers wider than 64 bits
+    if indent:
+        return json.dumps(obj, indent=2).encode()
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def _decode(data: bytes) -> Any:
+    """Parse JSON bytes, raising ValueError on malformed input"""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN written by the stdlib encoder
+    return json.loads(data)
+
 
 class Transaction:
     """Represents a database transaction"""
@@ -49,28 +94,66 @@ class DatabaseCatalog:
     """
     Database catalog - stores metadata about the database
     Includes information about tables, indexes, statistics, etc.
+
+    Changes are appended to catalog.wal as one JSON record per line and
+    folded into catalog.json on close, on the next load, or every
+    CATALOG_CHECKPOINT_EVERY records. With in_memory=True the catalog is
+    never read from or written to disk. With fsync=True every WAL record
+    and checkpoint is forced to disk.
     """
 
-    def __init__(self, data_dir: Path):
+    def __init__(
+        self, data_dir: Path, in_memory: bool = False, fsync: bool = False
+    ):
         self.data_dir = data_dir
         self.catalog_file = data_dir / "catalog.json"
+        self.wal_file = data_dir / "catalog.wal"
+        self.in_memory = in_memory
+        self.fsync = fsync
         self.lock = RLock()
+        self._wal = None
+        self._wal_records = 0
+        self._deferred = False
+        # Bumped by every table/index (un)registration, so callers can
+        # tell when derived schema information is stale
+        self.version = 0
         self._load_catalog()
 
     def _load_catalog(self):
         """Load catalog from disk"""
-        if self.catalog_file.exists():
-            try:
-                with open(self.catalog_file, "r") as f:
-                    self.catalog = json.load(f)
-            except Exception:
-                self._init_catalog()
-        else:
+        if self.in_memory:
             self._init_catalog()
+            return
+        try:
+            with open(self.catalog_file, "rb") as f:
+                self.catalog = _decode(f.read())
+        except Exception:
+            # Missing or unreadable: start empty, but still recover what
+            # the WAL holds rather than checkpointing over it
+            self.catalog = self._empty_catalog()
+            if not self._replay_wal():
+                self._save_catalog()
+        else:
+            self._replay_wal()
 
-    def _init_catalog(self):
-        """Initialize empty catalog"""
-        self.catalog = {
+    def _replay_wal(self) -> bool:
+        """Apply changes logged since the last checkpoint, if any"""
+        if not self.wal_file.exists():
+            return False
+        with open(self.wal_file, "rb") as f:
+            for line in f:
+                try:
+                    record = _decode(line)
+                except ValueError:
+                    break  # torn final record from an interrupted write
+                self._apply(record)
+        self._save_catalog()
+        return True
+
+    @staticmethod
+    def _empty_catalog() -> Dict:
+        """Build an empty catalog"""
+        return {
             "version": "0.1.0",
             "created_at": datetime.now().isoformat(),
             "tables": {},
@@ -78,37 +161,109 @@ class DatabaseCatalog:
             "statistics": {},
             "metadata": {},
         }
+
+    def _init_catalog(self):
+        """Initialize empty catalog"""
+        self.catalog = self._empty_catalog()
         self._save_catalog()
 
     def _save_catalog(self):
-        """Save catalog to disk"""
+        """Save catalog to disk (checkpoint) and discard the WAL"""
+        if self.in_memory:
+            return
         with self.lock:
-            with open(self.catalog_file, "w") as f:
-                json.dump(self.catalog, f, indent=2)
+            # The WAL is only dropped once the new catalog.json is in place
+            tmp_file = self.catalog_file.with_suffix(".json.tmp")
+            with open(tmp_file, "wb") as f:
+                f.write(_encode(self.catalog, indent=True))
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_file, self.catalog_file)
+            if self._wal is not None:
+                self._wal.close()
+                self._wal = None
+            if self.wal_file.exists():
+                self.wal_file.unlink()
+            self._wal_records = 0
+
+    def _apply(self, record: Dict):
+        """Apply one change record to the in-memory catalog"""
+        op = record["op"]
+        if op == "t":
+            self.catalog["tables"][record["n"]] = record["v"]
+        elif op == "dt":
+            table_name = record["n"]
+            self.catalog["tables"].pop(table_name, None)
+            # Also remove associated indexes
+            self.catalog["indexes"] = {
+                k: v
+                for k, v in self.catalog["indexes"].items()
+                if not k.startswith(f"{table_name}.")
+            }
+        elif op == "i":
+            self.catalog["indexes"][record["k"]] = record["v"]
+        elif op == "di":
+            self.catalog["indexes"].pop(record["k"], None)
+        elif op == "s":
+            table_info = self.catalog["tables"].get(record["n"])
+            if table_info is not None:
+                table_info["row_count"] = record["r"]
+                table_info["last_modified"] = record["m"]
+        elif op == "m":
+            self.catalog["metadata"].update(record["v"])
+
+    def _log(self, record: Dict):
+        """Apply a change and append it to the WAL (caller holds lock)"""
+        self._apply(record)
+        if self.in_memory:
+            return
+
+        if self._wal is None:
+            self._wal = open(self.wal_file, "ab")
+        self._wal.write(_encode(record) + b"\n")
+        self._wal_records += 1
+
+        if self._wal_records >= CATALOG_CHECKPOINT_EVERY:
+            self._save_catalog()
+        elif not self._deferred:
+            self._flush_wal()
+
+    def _flush_wal(self):
+        """Hand buffered WAL records to the OS, and the disk if fsync"""
+        self._wal.flush()
+        if self.fsync:
+            os.fsync(self._wal.fileno())
+
+    def begin_batch(self):
+        """Buffer WAL records until end_batch()"""
+        self._deferred = True
+
+    def end_batch(self):
+        """Flush the WAL records buffered since begin_batch()"""
+        with self.lock:
+            self._deferred = False
+            if self._wal is not None:
+                self._flush_wal()
 
     def register_table(self, table_name: str, schema_dict: Dict):
         """Register a table in the catalog"""
         with self.lock:
-            self.catalog["tables"][table_name] = {
-                "created_at": datetime.now().isoformat(),
+            now = datetime.now().isoformat()
+            table_info = {
+                "created_at": now,
                 "schema": schema_dict,
                 "row_count": 0,
-                "last_modified": datetime.now().isoformat(),
+                "last_modified": now,
             }
-            self._save_catalog()
+            self.version += 1
+            self._log({"op": "t", "n": table_name, "v": table_info})
 
     def unregister_table(self, table_name: str):
         """Remove a table from the catalog"""
         with self.lock:
-            if table_name in self.catalog["tables"]:
-                del self.catalog["tables"][table_name]
-            # Also remove associated indexes
-            self.catalog["indexes"] = {
-                k: v
-                for k, v in self.catalog["indexes"].items()
-                if not k.startswith(f"{table_name}.")
-            }
-            self._save_catalog()
+            self.version += 1
+            self._log({"op": "dt", "n": table_name})
 
     def register_index(
         self, table_name: str, column_name: str, index_name: str, unique: bool
@@ -116,37 +271,45 @@ class DatabaseCatalog:
         """Register an index in the catalog"""
         with self.lock:
             key = f"{table_name}.{column_name}"
-            self.catalog["indexes"][key] = {
+            index_info = {
                 "name": index_name,
                 "table": table_name,
                 "column": column_name,
                 "unique": unique,
                 "created_at": datetime.now().isoformat(),
             }
-            self._save_catalog()
+            self.version += 1
+            self._log({"op": "i", "k": key, "v": index_info})
 
     def unregister_index(self, table_name: str, column_name: str):
         """Remove an index from the catalog"""
         with self.lock:
             key = f"{table_name}.{column_name}"
             if key in self.catalog["indexes"]:
-                del self.catalog["indexes"][key]
-                self._save_catalog()
+                self.version += 1
+                self._log({"op": "di", "k": key})
 
     def update_table_stats(self, table_name: str, row_count: int):
         """Update table statistics"""
         with self.lock:
             if table_name in self.catalog["tables"]:
-                self.catalog["tables"][table_name]["row_count"] = row_count
-                self.catalog["tables"][table_name]["last_modified"] = (
-                    datetime.now().isoformat()
+                self._log(
+                    {
+                        "op": "s",
+                        "n": table_name,
+                        "r": row_count,
+                        "m": datetime.now().isoformat(),
+                    }
                 )
-                self._save_catalog()
 
     def get_table_info(self, table_name: str) -> Optional[Dict]:
         """Get information about a table"""
         return self.catalog["tables"].get(table_name)
 
+    def has_table(self, table_name: str) -> bool:
+        """Check if a table is registered"""
+        return table_name in self.catalog["tables"]
+
     def get_all_tables(self) -> List[str]:
         """Get list of all tables"""
         return list(self.catalog["tables"].keys())
@@ -157,9 +320,14 @@ class DatabaseCatalog:
 
     def set_metadata(self, key: str, value: Any):
         """Set database metadata"""
+        self.set_metadata_bulk({key: value})
+
+    def set_metadata_bulk(self, mapping: Dict[str, Any]):
+        """Set several metadata keys with a single catalog write"""
+        if not mapping:
+            return
         with self.lock:
-            self.catalog["metadata"][key] = value
-            self._save_catalog()
+            self._log({"op": "m", "v": dict(mapping)})
 
     def get_metadata(self, key: str, default=None) -> Any:
         """Get database metadata"""
@@ -170,15 +338,31 @@ class Database:
     """
     Main database class - the primary interface for SimplDB
     Provides high-level API wrapping all components
+
+    Tables, indexes and the catalog are loaded into memory once and not
+    re-read, so a data directory belongs to one open Database at a time:
+    opening a second one on it, in this or another process, raises
+    RuntimeError until the first is closed.
     """
 
-    def __init__(self, name: str = "simpldb", data_dir: str = "data"):
+    def __init__(
+        self,
+        name: str = "simpldb",
+        data_dir: str = "data",
+        in_memory: bool = False,
+        durability: str = "none",
+    ):
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"Unknown durability level: {durability}")
+
         self.name = name
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.durability = durability
+        self._lock_file = self._lock_data_dir()
 
         # Initialize components
-        self.storage = Storage(data_dir)
+        self.storage = Storage(data_dir, sync=DURABILITY_LEVELS[durability])
         self.schema_manager = SchemaManager()
         self.index_manager = IndexManager(data_dir)
         self.parser = SQLParser()
@@ -189,7 +373,19 @@ class Database:
         self.executor.index_manager = self.index_manager
         self.executor.storage = self.storage
 
-        self.catalog = DatabaseCatalog(self.data_dir)
+        # in_memory keeps the catalog out of catalog.json (table data is
+        # still stored under data_dir); meant for throwaway databases
+        self.catalog = DatabaseCatalog(
+            self.data_dir,
+            in_memory=in_memory,
+            fsync=durability == "full",
+        )
+
+        # table -> (catalog version, columns, indexes) for describe_table
+        self._described: Dict[str, Tuple[int, List[Dict], List[Dict]]] = {}
+        # table -> (catalog version, row count, last modified, JSON text)
+        # of the table's last export_schema entry
+        self._exported: Dict[str, Tuple[int, int, str, str]] = {}
 
         # Transaction management
         self.transactions: Dict[int, Transaction] = {}
@@ -268,14 +464,35 @@ class Database:
             self.catalog.update_table_stats(query.table_name, table.count())
 
     def execute_many(self, sql_queries: List[str]) -> List[QueryResult]:
-        """Execute multiple SQL queries"""
+        """
+        Execute multiple SQL queries
+        More than one query runs in an implicit transaction: catalog and
+        index files are written, and table logs flushed, once at the end
+        instead of per query.
+        """
+        if len(sql_queries) < 2:
+            return [self.execute(sql) for sql in sql_queries]
+
         results = []
-        for sql in sql_queries:
-            result = self.execute(sql)
-            results.append(result)
-            # Stop on first error
-            if not result.success:
-                break
+        tx_id = self.begin_transaction()
+        self.catalog.begin_batch()
+        self.index_manager.begin_batch()
+        self.storage.begin_batch()
+        try:
+            for sql in sql_queries:
+                result = self.execute(sql)
+                results.append(result)
+                # Stop on first error
+                if not result.success:
+                    break
+        finally:
+            self.storage.end_batch()
+            self.index_manager.end_batch()
+            self.catalog.end_batch()
+            if results and results[-1].success:
+                self.commit_transaction(tx_id)
+            else:
+                self.rollback_transaction(tx_id)
         return results
 
     def begin_transaction(self) -> int:
@@ -308,42 +525,55 @@ class Database:
         """List all tables in the database"""
         return self.catalog.get_all_tables()
 
+    def has_table(self, table_name: str) -> bool:
+        """Check if a table exists, without building the table list"""
+        return self.catalog.has_table(table_name)
+
     def describe_table(self, table_name: str) -> Optional[Dict]:
-        """Get detailed information about a table"""
+        """
+        Get detailed information about a table
+        Column and index details only change with DDL, so they are built
+        once per catalog version and shared between calls - do not
+        mutate them
+        """
         table_info = self.catalog.get_table_info(table_name)
         if not table_info:
             return None
 
-        schema = self.executor.schema_manager.get_schema(table_name)
-        if not schema:
-            return table_info
-
-        # schema = self.schema_manager.get_schema(table_name)
-        # if not schema:
-        #     return table_info
-
-        # Add column details
-        columns_info = []
-        for col_name, col in schema.columns.items():
-            col_info = {
-                "name": col.name,
-                "type": col.data_type.value,
-                "max_length": col.max_length,
-                "constraints": [c.value for c in col.constraints],
-                "default": col.default,
-            }
-            columns_info.append(col_info)
-
-        table_info["columns"] = columns_info
-
-        # Add index information
-        indexes = []
-        for idx_key, idx_info in self.catalog.get_all_indexes().items():
-            if idx_info["table"] == table_name:
-                indexes.append(idx_info)
-        table_info["indexes"] = indexes
-
-        return table_info
+        version = self.catalog.version
+        described = self._described.get(table_name)
+        if described is None or described[0] != version:
+            schema = self.executor.schema_manager.get_schema(table_name)
+            if not schema:
+                return table_info
+
+            # Add column details
+            columns_info = []
+            for col_name, col in schema.columns.items():
+                col_info = {
+                    "name": col.name,
+                    "type": col.data_type.value,
+                    "max_length": col.max_length,
+                    "constraints": [c.value for c in col.constraints],
+                    "default": col.default,
+                }
+                columns_info.append(col_info)
+
+            # Add index information
+            indexes = []
+            for idx_key, idx_info in self.catalog.get_all_indexes().items():
+                if idx_info["table"] == table_name:
+                    indexes.append(idx_info)
+
+            described = (version, columns_info, indexes)
+            self._described[table_name] = described
+
+        # Row count and timestamps change with every write, so they are
+        # read from the catalog entry each time
+        info = dict(table_info)
+        info["columns"] = described[1]
+        info["indexes"] = described[2]
+        return info
 
     def get_table_stats(self, table_name: str) -> Optional[Dict]:
         """Get statistics for a table"""
@@ -369,6 +599,15 @@ class Database:
 
         return stats
 
+    def get_all_table_stats(self) -> Dict[str, Dict]:
+        """Get statistics for every table, keyed by table name"""
+        all_stats = {}
+        for table_name in self.list_tables():
+            stats = self.get_table_stats(table_name)
+            if stats:
+                all_stats[table_name] = stats
+        return all_stats
+
     def get_database_info(self) -> Dict:
         """Get overall database information"""
         tables = self.list_tables()
@@ -389,29 +628,61 @@ class Database:
             "total_indexes": len(self.catalog.get_all_indexes()),
         }
 
-    def export_schema(self, output_file: str):
-        """Export database schema to a file"""
-        schema_data = {
+    def export_schema(self, output_file: Union[str, TextIO]):
+        """Export database schema to a file path or text file object
+
+        Tables are described and written one at a time, so the whole
+        export is never held in memory. A table's JSON text is kept and
+        reused by the next export until DDL or a write changes it.
+        """
+        if hasattr(output_file, "write"):
+            self._write_schema(output_file)
+            return
+        with open(output_file, "w") as f:
+            self._write_schema(f)
+
+    def _write_schema(self, f: TextIO):
+        """Write the schema export JSON to an open text file"""
+        header = {
             "database": self.name,
             "version": self.catalog.catalog.get("version"),
             "exported_at": datetime.now().isoformat(),
-            "tables": [],
         }
 
+        f.write(json.dumps(header, indent=2)[:-2])
+        f.write(',\n  "tables": [')
+        sep = "\n"
+        version = self.catalog.version
         for table_name in self.list_tables():
-            table_info = self.describe_table(table_name)
-            if table_info:
-                schema_data["tables"].append(table_info)
-
-        with open(output_file, "w") as f:
-            json.dump(schema_data, f, indent=2)
-
-    def import_schema(self, input_file: str) -> List[QueryResult]:
-        """Import database schema from a file"""
-        with open(input_file, "r") as f:
-            schema_data = json.load(f)
-
-        results = []
+            entry = self.catalog.get_table_info(table_name)
+            key = (version, entry["row_count"], entry["last_modified"])
+            exported = self._exported.get(table_name)
+            if exported is None or exported[:3] != key:
+                table_info = self.describe_table(table_name)
+                if not table_info:
+                    continue
+                body = json.dumps(table_info, indent=2)
+                exported = key + ("    " + body.replace("\n", "\n    "),)
+                self._exported[table_name] = exported
+            f.write(sep + exported[3])
+            sep = ",\n"
+        f.write("\n  ]\n}" if sep != "\n" else "]\n}")
+
+    def import_schema(
+        self, input_file: Union[str, TextIO]
+    ) -> List[QueryResult]:
+        """Import database schema from a file path or text file object"""
+        return list(self.iter_import_schema(input_file))
+
+    def iter_import_schema(
+        self, input_file: Union[str, TextIO]
+    ) -> Iterator[QueryResult]:
+        """Import database schema, yielding one result per table"""
+        if hasattr(input_file, "read"):
+            schema_data = json.load(input_file)
+        else:
+            with open(input_file, "r") as f:
+                schema_data = json.load(f)
 
         # Create tables
         for table_info in schema_data.get("tables", []):
@@ -443,10 +714,21 @@ class Database:
                 columns_sql.append(col_sql)
 
             sql = f"CREATE TABLE {table_name} ({', '.join(columns_sql)})"
-            result = self.execute(sql)
-            results.append(result)
+            yield self.execute(sql)
 
-        return results
+    def _lock_data_dir(self):
+        """Lock data_dir for this instance, or raise if it is in use"""
+        lock_file = open(self.data_dir / LOCK_FILE, "a")
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                raise RuntimeError(
+                    f"Data directory '{self.data_dir}' is in use by "
+                    f"another Database"
+                )
+        return lock_file
 
     def close(self):
         """Close the database and cleanup resources"""
@@ -458,6 +740,10 @@ class Database:
 
         # Save final catalog state
         self.catalog._save_catalog()
+        self.storage.close()
+
+        # Closing the file releases the directory lock
+        self._lock_file.close()
 
 
 if __name__ == "__main__":
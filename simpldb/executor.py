@@ -13,6 +13,7 @@ from simpldb.parser import (
     DropIndexQuery,
     DropTableQuery,
     InsertQuery,
+    JoinType,
     Operator,
     Query,
     QueryType,
@@ -63,6 +64,8 @@ class QueryExecutor:
         self.storage = Storage(data_dir)
         self.schema_manager = SchemaManager()
         self.index_manager = IndexManager(data_dir)
+        # How SELECTs found their candidate rows
+        self.stats: Dict[str, int] = {"index_lookups": 0, "full_scans": 0}
 
     def execute(self, query: Query) -> QueryResult:
         """Execute a parsed query"""
@@ -203,9 +206,9 @@ class QueryExecutor:
 
         # Rebuild index from existing data
         table = self.storage.get_table(query.table_name)
-        rows = [row.to_dict() for row in table.select_all()]
-        self.index_manager.rebuild_index(
-            query.table_name, query.column_name, rows
+        row_ids, keys = table.select_column(query.column_name)
+        self.index_manager.rebuild_index_from_arrays(
+            query.table_name, query.column_name, row_ids, keys
         )
 
         return QueryResult(
@@ -234,6 +237,9 @@ class QueryExecutor:
                 False, f"Table '{query.table_name}' does not exist"
             )
 
+        if query.rows is not None:
+            return self._execute_insert_rows(query, schema)
+
         # Build row data
         row_data = dict(zip(query.columns, query.values))
 
@@ -247,21 +253,19 @@ class QueryExecutor:
         # Convert types
         converted = schema.convert_row(row_data)
 
-        # Check unique constraints via indexes
-        existing = [
-            r.to_dict()
-            for r in self.storage.get_table(query.table_name).select_all()
-        ]
-
+        # Check unique constraints against the stored values
+        table = self.storage.get_table(query.table_name)
         for column in schema.get_unique_columns():
-            is_valid, error = schema.check_unique_constraint(
-                column.name, converted.get(column.name), existing
+            value = converted.get(column.name)
+            if value is None:
+                continue
+            is_valid, error = schema.check_unique_value(
+                column.name, value, table.find_ids(column.name, value)
             )
             if not is_valid:
                 return QueryResult(False, error)
 
         # Insert into storage
-        table = self.storage.get_table(query.table_name)
         row_id = table.insert(converted)
 
         # Update indexes
@@ -278,6 +282,75 @@ class QueryExecutor:
             True, f"1 row inserted (ID: {row_id})", rows_affected=1
         )
 
+    def _execute_insert_rows(
+        self, query: InsertQuery, schema: Schema
+    ) -> QueryResult:
+        """
+        Execute a multi-row INSERT
+        All rows are validated before any is stored, and the rows go to
+        storage in one write; a failure inserts nothing
+        """
+        rows_data = [dict(zip(query.columns, values)) for values in query.rows]
+
+        is_valid, errors = schema.validate_rows(rows_data)
+        if not is_valid:
+            return QueryResult(
+                False, f"Validation failed: {', '.join(errors)}"
+            )
+
+        converted = [schema.convert_row(row_data) for row_data in rows_data]
+
+        # Check unique constraints against the stored values and the
+        # earlier rows of this statement
+        table = self.storage.get_table(query.table_name)
+        for column in schema.get_unique_columns():
+            name = column.name
+            seen = set()
+            for row in converted:
+                value = row.get(name)
+                if value is None:
+                    continue
+                row_ids = table.find_ids(name, value)
+                if not row_ids and value in seen:
+                    row_ids = (None,)  # held by an earlier row
+                is_valid, error = schema.check_unique_value(
+                    name, value, row_ids
+                )
+                if not is_valid:
+                    return QueryResult(False, error)
+                seen.add(value)
+
+        # Insert into storage
+        row_ids = table.insert_many(converted)
+
+        # Update indexes, writing the index file once
+        index_manager = self.index_manager
+        index_manager.begin_batch()
+        try:
+            for position, (row_id, row) in enumerate(zip(row_ids, converted)):
+                success, error = index_manager.insert_into_indexes(
+                    query.table_name, row_id, row
+                )
+                if not success:
+                    # Rollback the rows indexed so far and every stored row
+                    for done_id, done_row in zip(
+                        row_ids[:position], converted
+                    ):
+                        index_manager.delete_from_indexes(
+                            query.table_name, done_id, done_row
+                        )
+                    for stored_id in row_ids:
+                        table.delete_by_id(stored_id)
+                    return QueryResult(False, f"Index error: {error}")
+        finally:
+            index_manager.end_batch()
+
+        return QueryResult(
+            True,
+            f"{len(row_ids)} rows inserted",
+            rows_affected=len(row_ids),
+        )
+
     def _execute_select(self, query: SelectQuery) -> QueryResult:
         """Execute SELECT"""
         schema = self.schema_manager.get_schema(query.table_name)
@@ -295,14 +368,17 @@ class QueryExecutor:
             )
             if candidate_row_ids is not None:
                 # Use indexed lookup
+                self.stats["index_lookups"] += 1
                 rows = [
                     table.select_by_id(row_id) for row_id in candidate_row_ids
                 ]
                 rows = [r for r in rows if r is not None]
             else:
                 # Fall back to full scan
+                self.stats["full_scans"] += 1
                 rows = table.select_all()
         else:
+            self.stats["full_scans"] += 1
             rows = table.select_all()
 
         # Handle JOINs
@@ -318,9 +394,10 @@ class QueryExecutor:
             ]
 
         # Select columns
+        select_all = len(query.columns) == 1 and query.columns[0] == "*"
         result_rows = []
         for row in rows:
-            if query.columns == ["*"]:
+            if select_all:
                 result_rows.append(row.data if hasattr(row, "data") else row)
             else:
                 selected = {}
@@ -389,13 +466,13 @@ class QueryExecutor:
             converted = schema.convert_row(new_data)
 
             # Check unique constraints (excluding current row)
-            existing = [r.to_dict() for r in table.select_all()]
             for column in schema.get_unique_columns():
-                if column.name in query.updates:
-                    is_valid, error = schema.check_unique_constraint(
+                value = converted.get(column.name)
+                if column.name in query.updates and value is not None:
+                    is_valid, error = schema.check_unique_value(
                         column.name,
-                        converted.get(column.name),
-                        existing,
+                        value,
+                        table.find_ids(column.name, value),
                         exclude_row_id=row.row_id,
                     )
                     if not is_valid:
@@ -607,7 +684,7 @@ class QueryExecutor:
                         matched = True
 
                 # For LEFT JOIN, include left row even if no match
-                if not matched and join.join_type.value == "LEFT":
+                if not matched and join.join_type == JoinType.LEFT:
                     combined = {}
                     if hasattr(left_row, "data"):
                         combined.update(
@@ -4,10 +4,63 @@ Implements B-Tree-like indexes for fast data retrieval
 """
 
 import json
-from bisect import bisect_left
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
 from pathlib import Path
 from threading import Lock
-from typing import Any, Dict, List, Optional, Tuple
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+# Range scan functions specialized per bound mode, built on first use
+_RANGE_SCANS: Dict[Tuple[bool, bool, bool, bool], Callable] = {}
+
+
+def _get_range_scan(
+    has_start: bool, has_end: bool, include_start: bool, include_end: bool
+) -> Callable:
+    """
+    Get a scan(keys, values, lo, hi, out) function for a bound mode
+    The bound checks are folded into the generated source, so the
+    loop body does a single comparison per key
+    """
+    mode = (has_start, has_end, include_start, include_end)
+    scan = _RANGE_SCANS.get(mode)
+    if scan is not None:
+        return scan
+
+    lines = ["def scan(keys, values, lo, hi, out):"]
+    if has_start:
+        find = "bisect_left" if include_start else "bisect_right"
+        lines.append(f"    pos = {find}(keys, lo)")
+    else:
+        lines.append("    pos = 0")
+
+    if has_end:
+        past_end = ">" if include_end else ">="
+        lines += [
+            "    for i in range(pos, len(keys)):",
+            f"        if keys[i] {past_end} hi:",
+            "            break",
+            "        out.extend(values[i])",
+        ]
+    else:
+        lines += [
+            "    for i in range(pos, len(values)):",
+            "        out.extend(values[i])",
+        ]
+
+    namespace = {"bisect_left": bisect_left, "bisect_right": bisect_right}
+    exec("\n".join(lines), namespace)
+    scan = _RANGE_SCANS[mode] = namespace["scan"]
+    return scan
 
 
 class BTreeNode:
@@ -26,23 +79,66 @@ class BTreeNode:
 
     def insert(self, key: Any, row_id: int):
         """Insert a key-value pair"""
+        keys = self.keys
+
+        # Keys usually arrive in ascending order (ids, timestamps), so
+        # appending past the last key skips the search entirely
+        if not keys or keys[-1] < key:
+            keys.append(key)
+            self.values.append([row_id])
+            return
+
         # Find position using binary search
-        pos = bisect_left(self.keys, key)
+        pos = bisect_left(keys, key)
 
-        if pos < len(self.keys) and self.keys[pos] == key:
+        if pos < len(keys) and keys[pos] == key:
             # Key exists, append row_id if not already present
             if row_id not in self.values[pos]:
                 self.values[pos].append(row_id)
         else:
             # New key, insert at position
-            self.keys.insert(pos, key)
+            keys.insert(pos, key)
             self.values.insert(pos, [row_id])
 
+    def bulk_load(
+        self, entries: Iterable[Tuple[Any, int]], unique: bool = False
+    ) -> List[Tuple[Any, int]]:
+        """
+        Replace the node's contents with (key, row_id) pairs
+        The pairs are sorted once and appended in key order, instead of
+        searching the node for every pair. With unique=True only the
+        first row of each key is kept; the others are returned
+        """
+        keys: List[Any] = []
+        values: List[List[int]] = []
+        duplicates = []
+
+        # The sort is stable, so a unique key keeps its first row
+        for key, row_id in sorted(entries, key=itemgetter(0)):
+            if keys and keys[-1] == key:
+                row_ids = values[-1]
+                if row_id in row_ids:
+                    continue
+                if unique:
+                    duplicates.append((key, row_id))
+                    continue
+                row_ids.append(row_id)
+            else:
+                keys.append(key)
+                values.append([row_id])
+
+        self.keys = keys
+        self.values = values
+        return duplicates
+
     def search(self, key: Any) -> List[int]:
-        """Search for a key, returns list of row IDs"""
+        """
+        Search for a key, returns list of row IDs
+        The list is the node's internal storage - do not mutate it
+        """
         pos = bisect_left(self.keys, key)
         if pos < len(self.keys) and self.keys[pos] == key:
-            return self.values[pos].copy()
+            return self.values[pos]
         return []
 
     def range_search(
@@ -52,28 +148,26 @@ class BTreeNode:
         include_start: bool = True,
         include_end: bool = True,
     ) -> List[int]:
-        """Search for keys in range [start_key, end_key]"""
-        result = []
-
-        # Find start position
-        start_pos = bisect_left(self.keys, start_key)
-
-        # Collect all matching keys
-        for i in range(start_pos, len(self.keys)):
-            key = self.keys[i]
-
-            # Check if we've passed the end
-            if key > end_key:
-                break
-            if key == end_key and not include_end:
-                break
-
-            # Check if we should include start
-            if key == start_key and not include_start:
-                continue
+        """
+        Search for keys in range [start_key, end_key]
+        Row IDs are returned in key order
+        """
+        keys = self.keys
 
-            result.extend(self.values[i])
+        # Both ends are found by binary search, so the keys in between
+        # are never compared one by one
+        if include_start:
+            start_pos = bisect_left(keys, start_key)
+        else:
+            start_pos = bisect_right(keys, start_key)
+        if include_end:
+            end_pos = bisect_right(keys, end_key, start_pos)
+        else:
+            end_pos = bisect_left(keys, end_key, start_pos)
 
+        result: List[int] = []
+        for row_ids in self.values[start_pos:end_pos]:
+            result.extend(row_ids)
         return result
 
     def delete(self, key: Any, row_id: Optional[int] = None):
@@ -156,7 +250,10 @@ class Index:
             return True, None
 
     def search(self, key: Any) -> List[int]:
-        """Search for exact key match"""
+        """
+        Search for exact key match
+        May return an internal reference - do not mutate the result
+        """
         with self.lock:
             return self.root.search(key)
 
@@ -168,40 +265,22 @@ class Index:
         include_end: bool = True,
     ) -> List[int]:
         """
-        Search for keys in a range
+        Search for keys in a range, returning row IDs in key order
         If start_key is None, starts from beginning
         If end_key is None, goes to end
         """
-        with self.lock:
-            if start_key is None and end_key is None:
-                # Return all
-                result = []
-                for _, row_ids in self.root.get_all_keys():
-                    result.extend(row_ids)
-                return result
-
-            # Get all keys and filter
-            all_keys = self.root.get_all_keys()
-            result = []
-
-            for key, row_ids in all_keys:
-                include = True
-
-                if start_key is not None:
-                    if key < start_key:
-                        include = False
-                    elif key == start_key and not include_start:
-                        include = False
-
-                if end_key is not None:
-                    if key > end_key:
-                        include = False
-                    elif key == end_key and not include_end:
-                        include = False
-
-                if include:
-                    result.extend(row_ids)
+        has_start = start_key is not None
+        has_end = end_key is not None
+        scan = _get_range_scan(
+            has_start,
+            has_end,
+            include_start or not has_start,
+            include_end or not has_end,
+        )
 
+        with self.lock:
+            result: List[int] = []
+            scan(self.root.keys, self.root.values, start_key, end_key, result)
             return result
 
     def delete(self, key: Any, row_id: Optional[int] = None):
@@ -235,6 +314,33 @@ class Index:
             self.root.insert(new_key, row_id)
             return True, None
 
+    def bulk_load(
+        self, entries: Iterable[Tuple[Any, int]]
+    ) -> List[Tuple[int, str]]:
+        """
+        Replace the index contents with (key, row_id) pairs
+        The pairs are sorted once and the node is filled in key order,
+        instead of searching the node for every pair.
+        Returns (row_id, error_message) for rows a unique index rejected
+        """
+        root = BTreeNode()
+        duplicates = root.bulk_load(entries, unique=self.unique)
+        with self.lock:
+            self.root = root
+        return [
+            (
+                row_id,
+                f"Unique constraint violation on "
+                f"{self.column_name}: '{key}' already exists",
+            )
+            for key, row_id in duplicates
+        ]
+
+    def clear(self):
+        """Remove every entry from the index"""
+        with self.lock:
+            self.root = BTreeNode()
+
     def get_stats(self) -> Dict[str, Any]:
         """Get index statistics"""
         with self.lock:
@@ -251,12 +357,13 @@ class Index:
 
     def to_dict(self) -> Dict:
         """Serialize index"""
-        return {
-            "table_name": self.table_name,
-            "column_name": self.column_name,
-            "unique": self.unique,
-            "root": self.root.to_dict(),
-        }
+        with self.lock:
+            return {
+                "table_name": self.table_name,
+                "column_name": self.column_name,
+                "unique": self.unique,
+                "root": self.root.to_dict(),
+            }
 
     @classmethod
     def from_dict(cls, data: Dict) -> "Index":
@@ -276,6 +383,9 @@ class IndexManager:
             str, Dict[str, Index]
         ] = {}  # table_name -> {column_name -> Index}
         self.lock = Lock()
+        # Tables whose index file is stale while saves are deferred
+        self._deferred: Optional[set] = None
+        self._batch_depth = 0
 
         # Load existing indexes
         self._load_indexes()
@@ -301,8 +411,29 @@ class IndexManager:
             except Exception as e:
                 print(f"Warning: Could not load index file {index_file}: {e}")
 
+    def begin_batch(self):
+        """Defer index file writes until end_batch()"""
+        self._batch_depth += 1
+        if self._deferred is None:
+            self._deferred = set()
+
+    def end_batch(self):
+        """
+        Write every index file touched since begin_batch()
+        Batches nest; files are written when the outermost one ends
+        """
+        self._batch_depth -= 1
+        if self._batch_depth > 0:
+            return
+        pending, self._deferred = self._deferred, None
+        for table_name in pending or ():
+            self._save_indexes(table_name)
+
     def _save_indexes(self, table_name: str):
         """Save indexes for a table to disk"""
+        if self._deferred is not None:
+            self._deferred.add(table_name)
+            return
         if table_name not in self.indexes or not self.indexes[table_name]:
             return
 
@@ -374,25 +505,40 @@ class IndexManager:
         Rebuild an index from scratch using provided rows
         Useful when creating index on existing data
         """
+        return self.rebuild_index_from_arrays(
+            table_name,
+            column_name,
+            [row.get("row_id") for row in rows],
+            [row.get("data", {}).get(column_name) for row in rows],
+        )
+
+    def rebuild_index_from_arrays(
+        self,
+        table_name: str,
+        column_name: str,
+        row_ids: Sequence[Optional[int]],
+        keys: Sequence[Any],
+    ) -> bool:
+        """
+        Rebuild an index from parallel row ID and key sequences
+        Saves building a row dict per row when the caller already has
+        the column's values. Entries with a None key or row ID are
+        skipped
+        """
         index = self.get_index(table_name, column_name)
         if not index:
             return False
 
-        with self.lock:
-            # Clear existing index
-            index.root = BTreeNode()
-
-            # Rebuild from rows
-            for row in rows:
-                row_id = row.get("row_id")
-                value = row.get("data", {}).get(column_name)
+        entries = [
+            (key, row_id)
+            for key, row_id in zip(keys, row_ids)
+            if key is not None and row_id is not None
+        ]
 
-                if value is not None and row_id is not None:
-                    success, error = index.insert(value, row_id)
-                    if not success:
-                        print(
-                            f"Warning: Could not index row {row_id}: {error}"
-                        )
+        with self.lock:
+            # Replaces the existing contents
+            for row_id, error in index.bulk_load(entries):
+                print(f"Warning: Could not index row {row_id}: {error}")
 
             self._save_indexes(table_name)
             return True
@@ -4,48 +4,216 @@ Parses SQL-like queries into structured query objects
 """
 
 import re
+import sys
+from collections import OrderedDict
 from dataclasses import dataclass
-from enum import Enum
-from typing import Any, Dict, List, Optional
-
-
-class QueryType(Enum):
+from enum import IntEnum
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+# Shared, immutable column list for SELECT * and empty JOIN list
+_STAR_COLUMNS = ("*",)
+_EMPTY_JOINS: tuple = ()
+
+# Identifiers (table, column and index names) repeat across statements;
+# interning them shares one string object and speeds later dict lookups
+_intern = sys.intern
+
+# Maximum number of parsed statements kept by each SQLParser
+PARSE_CACHE_SIZE = 1024
+
+# Value-free clauses (JOINs, IS [NULL|NOT NULL] conditions) are shared
+# between parsed queries; each cache is reset once it reaches this size
+SHARED_CLAUSE_LIMIT = 4096
+_SHARED_JOINS: Dict[tuple, "JoinClause"] = {}
+_SHARED_NULL_CONDITIONS: Dict[tuple, "Condition"] = {}
+
+# Leading keyword(s) of each statement; the matched group names the handler
+_RE_DISPATCH = re.compile(
+    r"(?:(?P<create_table>CREATE\s+TABLE)"
+    r"|(?P<drop_table>DROP\s+TABLE)"
+    r"|(?P<create_index>CREATE\s+(?:UNIQUE\s+)?INDEX)"
+    r"|(?P<drop_index>DROP\s+INDEX)"
+    r"|(?P<insert>INSERT)"
+    r"|(?P<select>SELECT)"
+    r"|(?P<update>UPDATE)"
+    r"|(?P<delete>DELETE))\b",
+    re.IGNORECASE,
+)
+
+# Statement patterns, compiled once at import
+_RE_CREATE_TABLE = re.compile(
+    r"CREATE\s+TABLE\s+(\w+)\s*\((.*)\)\s*$", re.IGNORECASE | re.DOTALL
+)
+_RE_DROP_TABLE = re.compile(r"DROP\s+TABLE\s+(\w+)", re.IGNORECASE)
+_RE_CREATE_INDEX = re.compile(
+    r"CREATE\s+(UNIQUE\s+)?INDEX\s+(\w+)\s+ON\s+(\w+)\s*\((\w+)\)",
+    re.IGNORECASE,
+)
+_RE_DROP_INDEX = re.compile(
+    r"DROP\s+INDEX\s+(\w+)\s+ON\s+(\w+)", re.IGNORECASE
+)
+_RE_INSERT = re.compile(
+    r"INSERT\s+INTO\s+(\w+)\s*\((.*?)\)\s+VALUES\s*(.+)$",
+    re.IGNORECASE | re.DOTALL,
+)
+_RE_SELECT = re.compile(
+    r"SELECT\s+(.*?)\s+FROM\s+(\w+)(.*)", re.IGNORECASE | re.DOTALL
+)
+_RE_UPDATE = re.compile(
+    r"UPDATE\s+(\w+)\s+SET\s+(.*?)(?:\s+WHERE\s+(.*))?$",
+    re.IGNORECASE | re.DOTALL,
+)
+_RE_DELETE = re.compile(
+    r"DELETE\s+FROM\s+(\w+)(?:\s+WHERE\s+(.*))?$", re.IGNORECASE | re.DOTALL
+)
+
+# Common trivial shapes, answered without the general clause parsing
+_RE_SELECT_STAR = re.compile(r"SELECT\s+\*\s+FROM\s+(\w+)$", re.IGNORECASE)
+_RE_DELETE_ALL = re.compile(r"DELETE\s+FROM\s+(\w+)$", re.IGNORECASE)
+
+# SELECT clause fragments, shared by the one-pass and per-clause patterns.
+# Only the parts that are read back are captured.
+_P_JOIN = (
+    r"(?P<join_type>INNER|LEFT|RIGHT)\s+JOIN\s+\w+\s+(?P<join_alias>\w+)"
+    r"\s+ON\s+(?P<on_left>\w+\.\w+)\s*=\s*(?P<on_right>\w+\.\w+)"
+)
+_P_LIMIT = r"LIMIT\s+(?P<limit>\d+)(?:\s+OFFSET\s+(?P<offset>\d+))?"
+
+# Everything after "FROM table" in the usual clause order, in one pass.
+# WHERE and ORDER BY stop before the clauses that may follow them, so a
+# tail that does not fit (clauses out of order, a malformed LIMIT or
+# OFFSET) fails to match instead of being absorbed into a capture
+_RE_SELECT_TAIL = re.compile(
+    r"(?:\s+(?!(?:INNER|LEFT|RIGHT|WHERE|ORDER|LIMIT)\b)\w+)?"
+    rf"(?:\s+{_P_JOIN})?"
+    r"(?:\s+WHERE\s+(?P<where>(?:(?!\s+(?:ORDER\s+BY|LIMIT)\b).)+))?"
+    r"(?:\s+ORDER\s+BY\s+(?P<order_by>(?:(?!\s+LIMIT\b).)+))?"
+    rf"(?:\s+{_P_LIMIT})?"
+    r"\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+# Individual SELECT clause patterns, for clauses out of the usual order
+_RE_JOIN = re.compile(_P_JOIN, re.IGNORECASE)
+_RE_WHERE = re.compile(
+    r"WHERE\s+(.*?)(?:\s+ORDER\s+BY|\s+LIMIT|\s*$)", re.IGNORECASE | re.DOTALL
+)
+_RE_ORDER_BY = re.compile(
+    r"ORDER\s+BY\s+(.*?)(?:\s+LIMIT|\s*$)", re.IGNORECASE
+)
+_RE_LIMIT = re.compile(_P_LIMIT, re.IGNORECASE)
+
+# WHERE condition patterns
+_RE_AND = re.compile(r"\s+AND\s+", re.IGNORECASE)
+_RE_AND_OR_QUOTED = re.compile(
+    r"'[^']*'?|\"[^\"]*\"?|(\s+AND\s+)", re.IGNORECASE
+)
+_RE_NULL_COND = re.compile(
+    r"\s*([\w.]+)\s+IS\s+(NOT\s+)?NULL\s*$", re.IGNORECASE
+)
+_RE_COMPARE_COND = re.compile(
+    r"\s*([\w.]+)(?:\s*(<=|>=|!=|<|>|=)|\s+(LIKE)\b)\s*(.*?)\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+# List splitting; a quoted string, even if unterminated, is one token
+_RE_VALUE_TOKEN = re.compile(r"'[^']*'?|\"[^\"]*\"?|[^,'\"]+|,")
+_RE_COLUMN_TOKEN = re.compile(r"[^,()]+|[(),]")
+_RE_PAREN_TOKEN = re.compile(r"'[^']*'?|\"[^\"]*\"?|[^()'\"]+|[()]")
+
+# Literal keywords, and the first characters that can start a literal
+_KEYWORD_VALUES = {"NULL": None, "TRUE": True, "FALSE": False}
+_KEYWORD_START = frozenset("NTFntf")
+_NUMBER_START = frozenset("+-.")
+
+# Numeric literals
+_RE_INT = re.compile(r"[+-]?\d+\Z")
+_RE_FLOAT = re.compile(r"[+-]?(?:\d+\.\d*|\.\d+)(?:[eE][+-]?\d+)?\Z")
+
+# Column definitions: name, type with optional (length), then constraints
+_RE_COLUMN_DEF = re.compile(
+    r"(\S+)\s+([^\s(]+)(?:\s*\(\s*(\d+)\s*\))?(.*)$", re.DOTALL
+)
+_RE_CONSTRAINT = re.compile(
+    r"\b(?:(?P<primary_key>PRIMARY\s+KEY)\b"
+    r"|(?P<unique>UNIQUE)\b"
+    r"|(?P<not_null>NOT\s+NULL)\b"
+    r"|DEFAULT\s+(?P<default>'[^']*'|\"[^\"]*\"|\S+))",
+    re.IGNORECASE,
+)
+_CONSTRAINT_NAMES = {
+    "primary_key": "PRIMARY_KEY",
+    "unique": "UNIQUE",
+    "not_null": "NOT_NULL",
+}
+
+
+class QueryType(IntEnum):
     """Types of SQL queries"""
 
-    CREATE_TABLE = "CREATE_TABLE"
-    DROP_TABLE = "DROP_TABLE"
-    CREATE_INDEX = "CREATE_INDEX"
-    DROP_INDEX = "DROP_INDEX"
-    INSERT = "INSERT"
-    SELECT = "SELECT"
-    UPDATE = "UPDATE"
-    DELETE = "DELETE"
+    CREATE_TABLE = 1
+    DROP_TABLE = 2
+    CREATE_INDEX = 3
+    DROP_INDEX = 4
+    INSERT = 5
+    SELECT = 6
+    UPDATE = 7
+    DELETE = 8
 
 
-class JoinType(Enum):
+class JoinType(IntEnum):
     """Types of joins"""
 
-    INNER = "INNER"
-    LEFT = "LEFT"
-    RIGHT = "RIGHT"
+    INNER = 1
+    LEFT = 2
+    RIGHT = 3
 
 
-class Operator(Enum):
+class Operator(IntEnum):
     """Comparison operators for WHERE clauses"""
 
-    EQ = "="
-    NE = "!="
-    LT = "<"
-    LE = "<="
-    GT = ">"
-    GE = ">="
-    LIKE = "LIKE"
-    IN = "IN"
-    IS_NULL = "IS NULL"
-    IS_NOT_NULL = "IS NOT NULL"
-
-
-@dataclass
+    EQ = 1
+    NE = 2
+    LT = 3
+    LE = 4
+    GT = 5
+    GE = 6
+    LIKE = 7
+    IN = 8
+    IS_NULL = 9
+    IS_NOT_NULL = 10
+
+    @property
+    def symbol(self) -> str:
+        """SQL spelling of the operator"""
+        return _OPERATOR_SYMBOLS[self]
+
+
+_OPERATOR_SYMBOLS = {
+    Operator.EQ: "=",
+    Operator.NE: "!=",
+    Operator.LT: "<",
+    Operator.LE: "<=",
+    Operator.GT: ">",
+    Operator.GE: ">=",
+    Operator.LIKE: "LIKE",
+    Operator.IN: "IN",
+    Operator.IS_NULL: "IS NULL",
+    Operator.IS_NOT_NULL: "IS NOT NULL",
+}
+
+# Comparison operator tokens accepted in WHERE conditions
+_COMPARE_OPS = {
+    "=": Operator.EQ,
+    "!=": Operator.NE,
+    "<": Operator.LT,
+    "<=": Operator.LE,
+    ">": Operator.GT,
+    ">=": Operator.GE,
+}
+
+
+@dataclass(slots=True, frozen=True)
 class Condition:
     """Represents a WHERE clause condition"""
 
@@ -54,10 +222,10 @@ class Condition:
     value: Any
 
     def __repr__(self):
-        return f"{self.column} {self.operator.value} {self.value}"
+        return f"{self.column} {self.operator.symbol} {self.value}"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class JoinClause:
     """Represents a JOIN clause"""
 
@@ -68,12 +236,12 @@ class JoinClause:
 
     def __repr__(self):
         return (
-            f"{self.join_type.value} JOIN {self.table} ON "
+            f"{self.join_type.name} JOIN {self.table} ON "
             f"{self.on_left} = {self.on_right}"
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class ColumnDef:
     """Column definition for CREATE TABLE"""
 
@@ -95,7 +263,7 @@ class ColumnDef:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Query:
     """Base query object"""
 
@@ -103,7 +271,7 @@ class Query:
     raw_sql: str
 
 
-@dataclass
+@dataclass(slots=True)
 class CreateTableQuery(Query):
     """CREATE TABLE query"""
 
@@ -111,14 +279,14 @@ class CreateTableQuery(Query):
     columns: List[ColumnDef]
 
 
-@dataclass
+@dataclass(slots=True)
 class DropTableQuery(Query):
     """DROP TABLE query"""
 
     table_name: str
 
 
-@dataclass
+@dataclass(slots=True)
 class CreateIndexQuery(Query):
     """CREATE INDEX query"""
 
@@ -128,7 +296,7 @@ class CreateIndexQuery(Query):
     unique: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class DropIndexQuery(Query):
     """DROP INDEX query"""
 
@@ -136,23 +304,25 @@ class DropIndexQuery(Query):
     table_name: str
 
 
-@dataclass
+@dataclass(slots=True)
 class InsertQuery(Query):
     """INSERT query"""
 
     table_name: str
     columns: List[str]
-    values: List[Any]
+    values: List[Any]  # first (or only) row
+    # Every row of a multi-row VALUES list; None for a single row
+    rows: Optional[List[List[Any]]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class SelectQuery(Query):
     """SELECT query"""
 
     table_name: str
-    columns: List[str]  # ['*'] for all columns
+    columns: Sequence[str]  # ('*',) for all columns
     where: Optional[List[Condition]] = None
-    joins: Optional[List[JoinClause]] = None
+    joins: Optional[Sequence[JoinClause]] = None
     order_by: Optional[List[tuple[str, str]]] = (
         None  # [(column, 'ASC'/'DESC')]
     )
@@ -160,7 +330,7 @@ class SelectQuery(Query):
     offset: Optional[int] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class UpdateQuery(Query):
     """UPDATE query"""
 
@@ -169,7 +339,7 @@ class UpdateQuery(Query):
     where: Optional[List[Condition]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class DeleteQuery(Query):
     """DELETE query"""
 
@@ -180,29 +350,18 @@ class DeleteQuery(Query):
 class SQLParser:
     """Parser for SQL-like queries"""
 
-    def __init__(self):
-        self.query_patterns = {
-            QueryType.CREATE_TABLE: (r"CREATE\s+TABLE\s+(\w+)\s*\((.*)\)\s*$"),
-            QueryType.DROP_TABLE: r"DROP\s+TABLE\s+(\w+)",
-            QueryType.CREATE_INDEX: (
-                r"CREATE\s+(UNIQUE\s+)?INDEX\s+(\w+)\s+ON\s+(\w+)\s*\((\w+)\)"
-            ),
-            QueryType.DROP_INDEX: r"DROP\s+INDEX\s+(\w+)\s+ON\s+(\w+)",
-            # QueryType.INSERT: (
-            #     r"INSERT\s+INTO\s+(\w+)\s*\((.*?)\)\s+VALUES\s*\((.*?)\)"
-            # ),
-            QueryType.INSERT: (
-                r"INSERT\s+INTO\s+(\w+)\s*\((.*?)\)\s+VALUES\s*(.+)$"
-            ),
-            QueryType.SELECT: r"SELECT\s+(.*?)\s+FROM\s+(\w+)(.*)",
-            QueryType.UPDATE: (
-                r"UPDATE\s+(\w+)\s+SET\s+(.*?)(?:\s+WHERE\s+(.*))?$"
-            ),
-            QueryType.DELETE: r"DELETE\s+FROM\s+(\w+)(?:\s+WHERE\s+(.*))?$",
-        }
+    def __init__(self, cache_size: int = PARSE_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cache: OrderedDict = OrderedDict()
 
     def parse(self, sql: str) -> Query:
-        """Parse SQL string into a Query object"""
+        """
+        Parse SQL string into a Query object
+
+        Results are cached by statement text, so repeated statements
+        return the same Query instance. Callers must treat it as
+        read-only.
+        """
         sql = sql.strip()
         if not sql:
             raise ValueError("Empty SQL query")
@@ -211,43 +370,81 @@ class SQLParser:
         if sql.endswith(";"):
             sql = sql[:-1].strip()
 
+        cache = self._cache
+        query = cache.get(sql)
+        if query is not None:
+            try:
+                cache.move_to_end(sql)
+            except KeyError:
+                pass  # evicted concurrently
+            return query
+
+        query = self._parse_uncached(sql)
+        if self.cache_size > 0:
+            cache[sql] = query
+            if len(cache) > self.cache_size:
+                cache.popitem(last=False)
+        return query
+
+    def parse_many(self, sqls: Iterable[str]) -> List[Query]:
+        """
+        Parse a batch of SQL strings, e.g. the statements of a script
+
+        Raises ValueError for the first invalid statement, like parse.
+        Statements already in the cache are reused, but the batch does
+        not add to it: a bulk load of one-off INSERTs would otherwise
+        evict the hot entries. Repeats within the batch are parsed once.
+        """
+        cached = self._cache.get
+        dispatch = _RE_DISPATCH.match
+        handlers = _HANDLERS
+        seen: Dict[str, Query] = {}
+        queries = []
+
+        for sql in sqls:
+            sql = sql.strip()
+            if not sql:
+                raise ValueError("Empty SQL query")
+            if sql.endswith(";"):
+                sql = sql[:-1].strip()
+
+            query = seen.get(sql) or cached(sql)
+            if query is None:
+                match = dispatch(sql)
+                if not match:
+                    raise ValueError(
+                        f"Unsupported query type: {sql[:20]}..."
+                    )
+                query = handlers[match.lastgroup](self, sql)
+            seen[sql] = query
+            queries.append(query)
+
+        return queries
+
+    def clear_cache(self):
+        """Drop all cached parse results"""
+        self._cache.clear()
+
+    def _parse_uncached(self, sql: str) -> Query:
+        """Parse a normalized statement (stripped, no trailing semicolon)"""
         # Determine query type
-        sql_upper = sql.upper()
-
-        if sql_upper.startswith("CREATE TABLE"):
-            return self._parse_create_table(sql)
-        elif sql_upper.startswith("DROP TABLE"):
-            return self._parse_drop_table(sql)
-        elif sql_upper.startswith("CREATE"):
-            return self._parse_create_index(sql)
-        elif sql_upper.startswith("DROP INDEX"):
-            return self._parse_drop_index(sql)
-        elif sql_upper.startswith("INSERT"):
-            return self._parse_insert(sql)
-        elif sql_upper.startswith("SELECT"):
-            return self._parse_select(sql)
-        elif sql_upper.startswith("UPDATE"):
-            return self._parse_update(sql)
-        elif sql_upper.startswith("DELETE"):
-            return self._parse_delete(sql)
-        else:
+        match = _RE_DISPATCH.match(sql)
+        if not match:
             raise ValueError(f"Unsupported query type: {sql[:20]}...")
 
+        return _HANDLERS[match.lastgroup](self, sql)
+
     def _parse_create_table(self, sql: str) -> CreateTableQuery:
         """Parse CREATE TABLE query"""
-        match = re.match(
-            self.query_patterns[QueryType.CREATE_TABLE],
-            sql,
-            re.IGNORECASE | re.DOTALL,
-        )
+        match = _RE_CREATE_TABLE.match(sql)
         if not match:
             raise ValueError(f"Invalid CREATE TABLE syntax: {sql}")
 
-        table_name = match.group(1)
+        table_name = _intern(match.group(1))
         columns_str = match.group(2)
 
         columns = []
-        for col_def in self._split_columns(columns_str):
+        for col_def in _split_columns(columns_str):
             columns.append(self._parse_column_def(col_def))
 
         return CreateTableQuery(
@@ -260,68 +457,26 @@ class SQLParser:
     def _parse_column_def(self, col_def: str) -> ColumnDef:
         """Parse column definition"""
         col_def = col_def.strip()
-        parts = col_def.split()
-
-        if len(parts) < 2:
+        match = _RE_COLUMN_DEF.match(col_def)
+        if not match:
             raise ValueError(f"Invalid column definition: {col_def}")
 
-        name = parts[0]
-        data_type_raw = parts[1]
-
-        # Extract max_length from VARCHAR(100)
-        max_length = None
-        data_type = data_type_raw
-        if "(" in data_type_raw:
-            match = re.match(r"(\w+)\((\d+)\)", data_type_raw)
-            if match:
-                data_type = match.group(1)
-                max_length = int(match.group(2))
-            else:
-                # Handle case where closing paren might be in next token
-                # e.g., "VARCHAR(100" and ")" are separate
-                match = re.match(r"(\w+)\((\d+)", data_type_raw)
-                if match:
-                    data_type = match.group(1)
-                    max_length = int(match.group(2))
-                    # Skip the next token if it's just ")"
-                    if len(parts) > 2 and parts[2].strip() == ")":
-                        parts.pop(2)
+        name, data_type, length, rest = match.groups()
+        max_length = int(length) if length else None
 
         # Parse constraints and default
         constraints = []
         default = None
-        i = 2
-
-        while i < len(parts):
-            part_upper = parts[i].upper()
-
-            if (
-                part_upper == "PRIMARY"
-                and i + 1 < len(parts)
-                and parts[i + 1].upper() == "KEY"
-            ):
-                constraints.append("PRIMARY_KEY")
-                i += 2
-            elif part_upper == "UNIQUE":
-                constraints.append("UNIQUE")
-                i += 1
-            elif (
-                part_upper == "NOT"
-                and i + 1 < len(parts)
-                and parts[i + 1].upper() == "NULL"
-            ):
-                constraints.append("NOT_NULL")
-                i += 2
-            elif part_upper == "DEFAULT":
-                if i + 1 < len(parts):
-                    default = self._parse_value(parts[i + 1])
-                i += 2
+        for constraint in _RE_CONSTRAINT.finditer(rest):
+            kind = constraint.lastgroup
+            if kind == "default":
+                default = self._parse_value(constraint.group("default"))
             else:
-                i += 1
+                constraints.append(_CONSTRAINT_NAMES[kind])
 
         return ColumnDef(
-            name=name,
-            data_type=data_type,
+            name=_intern(name),
+            data_type=_intern(data_type),
             constraints=constraints,
             max_length=max_length,
             default=default,
@@ -329,30 +484,26 @@ class SQLParser:
 
     def _parse_drop_table(self, sql: str) -> DropTableQuery:
         """Parse DROP TABLE query"""
-        match = re.match(
-            self.query_patterns[QueryType.DROP_TABLE], sql, re.IGNORECASE
-        )
+        match = _RE_DROP_TABLE.match(sql)
         if not match:
             raise ValueError(f"Invalid DROP TABLE syntax: {sql}")
 
         return DropTableQuery(
             query_type=QueryType.DROP_TABLE,
             raw_sql=sql,
-            table_name=match.group(1),
+            table_name=_intern(match.group(1)),
         )
 
     def _parse_create_index(self, sql: str) -> CreateIndexQuery:
         """Parse CREATE INDEX query"""
-        match = re.match(
-            self.query_patterns[QueryType.CREATE_INDEX], sql, re.IGNORECASE
-        )
+        match = _RE_CREATE_INDEX.match(sql)
         if not match:
             raise ValueError(f"Invalid CREATE INDEX syntax: {sql}")
 
         unique = match.group(1) is not None
-        index_name = match.group(2)
-        table_name = match.group(3)
-        column_name = match.group(4)
+        index_name = _intern(match.group(2))
+        table_name = _intern(match.group(3))
+        column_name = _intern(match.group(4))
 
         return CreateIndexQuery(
             query_type=QueryType.CREATE_INDEX,
@@ -365,133 +516,105 @@ class SQLParser:
 
     def _parse_drop_index(self, sql: str) -> DropIndexQuery:
         """Parse DROP INDEX query"""
-        match = re.match(
-            self.query_patterns[QueryType.DROP_INDEX], sql, re.IGNORECASE
-        )
+        match = _RE_DROP_INDEX.match(sql)
         if not match:
             raise ValueError(f"Invalid DROP INDEX syntax: {sql}")
 
         return DropIndexQuery(
             query_type=QueryType.DROP_INDEX,
             raw_sql=sql,
-            index_name=match.group(1),
-            table_name=match.group(2),
+            index_name=_intern(match.group(1)),
+            table_name=_intern(match.group(2)),
         )
 
     def _parse_insert(self, sql: str) -> InsertQuery:
         """Parse INSERT query"""
-        match = re.match(
-            self.query_patterns[QueryType.INSERT],
-            sql,
-            re.IGNORECASE | re.DOTALL,
-        )
+        match = _RE_INSERT.match(sql)
         if not match:
             raise ValueError(f"Invalid INSERT syntax: {sql}")
 
-        table_name = match.group(1)
+        table_name = _intern(match.group(1))
         columns_str = match.group(2)
         # values_str = match.group(3)
 
         values_block = match.group(3)
-        values_str = self._extract_parenthesized(values_block)
-
-        columns = [col.strip() for col in columns_str.split(",")]
-        values = [
-            self._parse_value(val.strip())
-            for val in self._split_values(values_str)
-        ]
-
-        if len(columns) != len(values):
-            raise ValueError(
-                f"Column count ({len(columns)}) "
-                f"doesn't match value count ({len(values)})"
-            )
+        groups = _extract_value_groups(values_block)
+
+        columns = [_intern(col.strip()) for col in columns_str.split(",")]
+        parse_value = self._parse_value
+        rows = []
+        for values_str in groups:
+            values = [
+                parse_value(val.strip()) for val in _split_values(values_str)
+            ]
+            if len(columns) != len(values):
+                raise ValueError(
+                    f"Column count ({len(columns)}) "
+                    f"doesn't match value count ({len(values)})"
+                )
+            rows.append(values)
 
         return InsertQuery(
             query_type=QueryType.INSERT,
             raw_sql=sql,
             table_name=table_name,
             columns=columns,
-            values=values,
+            values=rows[0],
+            rows=rows if len(rows) > 1 else None,
         )
 
     def _parse_select(self, sql: str) -> SelectQuery:
         """Parse SELECT query"""
-        match = re.match(
-            self.query_patterns[QueryType.SELECT],
-            sql,
-            re.IGNORECASE | re.DOTALL,
-        )
+        match = _RE_SELECT_STAR.match(sql)
+        if match:
+            return SelectQuery(
+                query_type=QueryType.SELECT,
+                raw_sql=sql,
+                table_name=_intern(match.group(1)),
+                columns=_STAR_COLUMNS,
+                joins=_EMPTY_JOINS,
+            )
+
+        match = _RE_SELECT.match(sql)
         if not match:
             raise ValueError(f"Invalid SELECT syntax: {sql}")
 
         columns_str = match.group(1).strip()
-        table_name = match.group(2)
-        rest = match.group(3).strip() if match.group(3) else ""
+        table_name = _intern(match.group(2))
+        tail_str = match.group(3) or ""
+        rest = tail_str.strip()
 
         # Parse columns
         if columns_str == "*":
-            columns = ["*"]
+            columns = _STAR_COLUMNS
         else:
-            columns = [col.strip() for col in columns_str.split(",")]
+            columns = [_intern(col.strip()) for col in columns_str.split(",")]
 
         # Parse optional clauses
-        joins: List[JoinClause] = []
+        joins: Sequence[JoinClause] = _EMPTY_JOINS
         where = None
         order_by = None
         limit = None
         offset = None
 
         if rest:
-            # Parse JOIN clauses
-            join_match = re.search(
-                r"(INNER|LEFT|RIGHT)\s+JOIN\s+(\w+)\s+(\w+)\s+ON\s+(\w+\.\w+)\s*=\s*(\w+\.\w+)",
-                rest,
-                re.IGNORECASE,
-            )
-
-            if join_match:
-                join_type = JoinType[join_match.group(1).upper()]
-                join_table_alias = join_match.group(
-                    3
-                )  # <-- alias, not table name
-                on_left = join_match.group(4)
-                on_right = join_match.group(5)
-
-                joins.append(
-                    JoinClause(
-                        join_type=join_type,
-                        table=join_table_alias,
-                        on_left=on_left,
-                        on_right=on_right,
-                    )
+            tail = _RE_SELECT_TAIL.match(tail_str)
+            if tail:
+                if tail.group("join_type"):
+                    joins = [_join_clause(tail)]
+                if tail.group("where"):
+                    where = self._parse_where(tail.group("where"))
+                if tail.group("order_by"):
+                    order_by = self._parse_order_by(tail.group("order_by"))
+                if tail.group("limit"):
+                    limit = int(tail.group("limit"))
+                    if tail.group("offset"):
+                        offset = int(tail.group("offset"))
+            else:
+                joins, where, order_by, limit, offset = (
+                    self._parse_select_clauses(rest)
                 )
 
-            # Parse WHERE clause
-            where_match = re.search(
-                r"WHERE\s+(.*?)(?:\s+ORDER BY|\s+LIMIT|\s*$)",
-                rest,
-                re.IGNORECASE | re.DOTALL,
-            )
-            if where_match:
-                where = self._parse_where(where_match.group(1))
-
-            # Parse ORDER BY
-            order_match = re.search(
-                r"ORDER BY\s+(.*?)(?:\s+LIMIT|\s*$)", rest, re.IGNORECASE
-            )
-            if order_match:
-                order_by = self._parse_order_by(order_match.group(1))
-
-            # Parse LIMIT
-            limit_match = re.search(
-                r"LIMIT\s+(\d+)(?:\s+OFFSET\s+(\d+))?", rest, re.IGNORECASE
-            )
-            if limit_match:
-                limit = int(limit_match.group(1))
-                if limit_match.group(2):
-                    offset = int(limit_match.group(2))
-
         return SelectQuery(
             query_type=QueryType.SELECT,
             raw_sql=sql,
@@ -504,30 +627,56 @@ class SQLParser:
             offset=offset,
         )
 
+    def _parse_select_clauses(self, rest: str) -> tuple:
+        """Search for each SELECT clause separately, in any order"""
+        joins: Sequence[JoinClause] = _EMPTY_JOINS
+        where = None
+        order_by = None
+        limit = None
+        offset = None
+
+        # Parse JOIN clauses
+        join_match = _RE_JOIN.search(rest)
+
+        if join_match:
+            joins = [_join_clause(join_match)]
+
+        # Parse WHERE clause
+        where_match = _RE_WHERE.search(rest)
+        if where_match:
+            where = self._parse_where(where_match.group(1))
+
+        # Parse ORDER BY
+        order_match = _RE_ORDER_BY.search(rest)
+        if order_match:
+            order_by = self._parse_order_by(order_match.group(1))
+
+        # Parse LIMIT
+        limit_match = _RE_LIMIT.search(rest)
+        if limit_match:
+            limit = int(limit_match.group("limit"))
+            if limit_match.group("offset"):
+                offset = int(limit_match.group("offset"))
+
+        return joins, where, order_by, limit, offset
+
     def _parse_update(self, sql: str) -> UpdateQuery:
         """Parse UPDATE query"""
-        match = re.match(
-            self.query_patterns[QueryType.UPDATE],
-            sql,
-            re.IGNORECASE | re.DOTALL,
-        )
+        match = _RE_UPDATE.match(sql)
         if not match:
             raise ValueError(f"Invalid UPDATE syntax: {sql}")
 
-        table_name = match.group(1)
+        table_name = _intern(match.group(1))
         set_clause = match.group(2)
         where_clause = match.group(3)
 
         updates = {}
-        for assignment in self._split_assignments(set_clause):
-            if "=" not in assignment:
+        for assignment in _split_values(set_clause):
+            column, sep, value_str = assignment.partition("=")
+            if not sep:
                 raise ValueError(f"Invalid SET clause: {assignment}")
 
-            column, value_str = assignment.split("=", 1)
-            column = column.strip()
-            value = self._parse_value(value_str.strip())
-
-            updates[column] = value
+            updates[_intern(column.strip())] = self._parse_value(value_str)
 
         # # Parse SET clause
         # updates = {}
@@ -554,15 +703,19 @@ class SQLParser:
 
     def _parse_delete(self, sql: str) -> DeleteQuery:
         """Parse DELETE query"""
-        match = re.match(
-            self.query_patterns[QueryType.DELETE],
-            sql,
-            re.IGNORECASE | re.DOTALL,
-        )
+        match = _RE_DELETE_ALL.match(sql)
+        if match:
+            return DeleteQuery(
+                query_type=QueryType.DELETE,
+                raw_sql=sql,
+                table_name=_intern(match.group(1)),
+            )
+
+        match = _RE_DELETE.match(sql)
         if not match:
             raise ValueError(f"Invalid DELETE syntax: {sql}")
 
-        table_name = match.group(1)
+        table_name = _intern(match.group(1))
         where_clause = match.group(2)
 
         where = None
@@ -582,60 +735,26 @@ class SQLParser:
 
         # Split by AND
         # (simple parsing, doesn't handle OR or complex expressions)
-        parts = re.split(r"\s+AND\s+", where_clause, flags=re.IGNORECASE)
+        parts = _split_and(where_clause)
 
         for part in parts:
-            part = part.strip()
-
-            # Check for IS NULL / IS NOT NULL
-            if re.search(r"IS\s+NOT\s+NULL", part, re.IGNORECASE):
-                column = re.match(
-                    r"(\w+)\s+IS\s+NOT\s+NULL", part, re.IGNORECASE
-                ).group(1)
-                conditions.append(
-                    Condition(column, Operator.IS_NOT_NULL, None)
-                )
-            elif re.search(r"IS\s+NULL", part, re.IGNORECASE):
-                column = re.match(
-                    r"(\w+)\s+IS\s+NULL", part, re.IGNORECASE
-                ).group(1)
-                conditions.append(Condition(column, Operator.IS_NULL, None))
-            else:
-                # Parse comparison operators
-                for op in ["<=", ">=", "!=", "<", ">", "=", "LIKE"]:
-                    if op in part.upper() or op in part:
-                        if op == "LIKE":
-                            match = re.search(
-                                r"(\w+)\s+LIKE\s+(.+)", part, re.IGNORECASE
-                            )
-                        else:
-                            parts_split = part.split(op)
-                            if len(parts_split) == 2:
-                                match = True
-                                column = parts_split[0].strip()
-                                value_str = parts_split[1].strip()
-
-                        if op == "LIKE" and match:
-                            column = match.group(1)
-                            value_str = match.group(2).strip()
-                            value = self._parse_value(value_str)
-                            conditions.append(
-                                Condition(column, Operator.LIKE, value)
-                            )
-                        elif match and op != "LIKE":
-                            value = self._parse_value(value_str)
-                            op_enum = {
-                                "=": Operator.EQ,
-                                "!=": Operator.NE,
-                                "<": Operator.LT,
-                                "<=": Operator.LE,
-                                ">": Operator.GT,
-                                ">=": Operator.GE,
-                            }[op]
-                            conditions.append(
-                                Condition(column, op_enum, value)
-                            )
-                        break
+            # IS NULL / IS NOT NULL
+            match = _RE_NULL_COND.match(part)
+            if match:
+                if match.group(2):
+                    op_enum = Operator.IS_NOT_NULL
+                else:
+                    op_enum = Operator.IS_NULL
+                conditions.append(_null_condition(match.group(1), op_enum))
+                continue
+
+            # Comparison operators and LIKE
+            match = _RE_COMPARE_COND.match(part)
+            if match:
+                column, op, like, value_str = match.groups()
+                op_enum = Operator.LIKE if like else _COMPARE_OPS[op]
+                value = self._parse_value(value_str)
+                conditions.append(Condition(_intern(column), op_enum, value))
 
         return conditions
 
@@ -654,90 +773,41 @@ class SQLParser:
                 column = part
                 direction = "ASC"
 
-            order_by.append((column, direction))
+            order_by.append((_intern(column), direction))
 
         return order_by
 
     def _parse_value(self, value_str: str) -> Any:
         """Parse a value from string"""
         value_str = value_str.strip()
-
-        # NULL
-        if value_str.upper() == "NULL":
-            return None
+        first = value_str[:1]
 
         # String (quoted)
-        if (value_str.startswith("'") and value_str.endswith("'")) or (
-            value_str.startswith('"') and value_str.endswith('"')
-        ):
+        if (first == "'" or first == '"') and value_str.endswith(first):
             return value_str[1:-1]
 
-        # Boolean
-        if value_str.upper() in ("TRUE", "FALSE"):
-            return value_str.upper() == "TRUE"
-
         # Number
-        try:
-            if "." in value_str:
-                return float(value_str)
-            else:
-                return int(value_str)
-        except ValueError:
-            pass
+        if first in _NUMBER_START or first.isdigit():
+            number = _parse_number(value_str)
+            if number is not None:
+                return number
+
+        # NULL / Boolean
+        elif first in _KEYWORD_START:
+            keyword = value_str.upper()
+            if keyword in _KEYWORD_VALUES:
+                return _KEYWORD_VALUES[keyword]
 
         # Default: treat as string
         return value_str
 
     def _split_columns(self, columns_str: str) -> List[str]:
         """Split column definitions, handling parentheses"""
-        columns = []
-        current = []
-        depth = 0
-
-        for char in columns_str:
-            if char == "(":
-                depth += 1
-                current.append(char)
-            elif char == ")":
-                depth -= 1
-                current.append(char)
-            elif char == "," and depth == 0:
-                columns.append("".join(current).strip())
-                current = []
-            else:
-                current.append(char)
-
-        if current:
-            columns.append("".join(current).strip())
-
-        return columns
+        return _split_columns(columns_str)
 
     def _split_values(self, values_str: str) -> List[str]:
         """Split values, handling quoted strings"""
-        values = []
-        current = []
-        in_quote = False
-        quote_char = None
-
-        for char in values_str:
-            if char in ('"', "'") and not in_quote:
-                in_quote = True
-                quote_char = char
-                current.append(char)
-            elif char == quote_char and in_quote:
-                in_quote = False
-                quote_char = None
-                current.append(char)
-            elif char == "," and not in_quote:
-                values.append("".join(current).strip())
-                current = []
-            else:
-                current.append(char)
-
-        if current:
-            values.append("".join(current).strip())
-
-        return values
+        return _split_values(values_str)
 
     def _split_assignments(self, assignments_str: str) -> List[str]:
         """
@@ -745,66 +815,189 @@ class SQLParser:
         Example:
         content = 'Hello, world', title = 'Test'
         """
-        assignments = []
-        current = []
-        in_quote = False
-        quote_char = None
-
-        for char in assignments_str:
-            if char in ("'", '"') and not in_quote:
-                in_quote = True
-                quote_char = char
-                current.append(char)
-            elif char == quote_char and in_quote:
-                in_quote = False
-                quote_char = None
-                current.append(char)
-            elif char == "," and not in_quote:
-                assignments.append("".join(current).strip())
-                current = []
-            else:
-                current.append(char)
-
-        if current:
-            assignments.append("".join(current).strip())
-
-        return assignments
+        return _split_values(assignments_str)
 
     def _extract_parenthesized(self, text: str) -> str:
         """
         Extract content inside the first top-level (...) pair,
         respecting quoted strings.
         """
-        text = text.strip()
-        if not text.startswith("("):
-            raise ValueError("Expected '(' at start of VALUES")
-
-        depth = 0
-        in_quote = False
-        quote_char = None
-        content = []
-
-        for i, char in enumerate(text):
-            if char in ("'", '"') and not in_quote:
-                in_quote = True
-                quote_char = char
-            elif char == quote_char and in_quote:
-                in_quote = False
-                quote_char = None
-
-            if char == "(" and not in_quote:
-                depth += 1
-                if depth == 1:
-                    continue
-            elif char == ")" and not in_quote:
-                depth -= 1
-                if depth == 0:
-                    return "".join(content)
-
-            if depth >= 1:
-                content.append(char)
+        return _extract_parenthesized(text)
+
+
+def _join_clause(match: re.Match) -> JoinClause:
+    """Build (or reuse) the JoinClause for a match of _P_JOIN"""
+    key = match.group("join_type", "join_alias", "on_left", "on_right")
+    clause = _SHARED_JOINS.get(key)
+    if clause is None:
+        join_type, alias, on_left, on_right = key
+        clause = JoinClause(
+            join_type=JoinType[join_type.upper()],
+            table=_intern(alias),  # alias, not table name
+            on_left=_intern(on_left),
+            on_right=_intern(on_right),
+        )
+        if len(_SHARED_JOINS) >= SHARED_CLAUSE_LIMIT:
+            _SHARED_JOINS.clear()
+        _SHARED_JOINS[key] = clause
+    return clause
+
+
+def _null_condition(column: str, operator: Operator) -> Condition:
+    """Build (or reuse) an IS [NOT] NULL condition"""
+    key = (column, operator)
+    condition = _SHARED_NULL_CONDITIONS.get(key)
+    if condition is None:
+        condition = Condition(_intern(column), operator, None)
+        if len(_SHARED_NULL_CONDITIONS) >= SHARED_CLAUSE_LIMIT:
+            _SHARED_NULL_CONDITIONS.clear()
+        _SHARED_NULL_CONDITIONS[key] = condition
+    return condition
+
+
+def _split_plain(text: str) -> List[str]:
+    """Split on every comma; used when there is nothing to protect"""
+    parts = text.split(",")
+    if not parts[-1]:
+        parts.pop()
+    return [part.strip() for part in parts]
+
+
+def _split_columns(columns_str: str) -> List[str]:
+    """Split column definitions on commas outside parentheses"""
+    if "(" not in columns_str and ")" not in columns_str:
+        return _split_plain(columns_str)
+
+    columns = []
+    current = []
+    depth = 0
+
+    for token in _RE_COLUMN_TOKEN.findall(columns_str):
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+        elif token == "," and depth == 0:
+            columns.append("".join(current).strip())
+            current = []
+            continue
+        current.append(token)
+
+    if current:
+        columns.append("".join(current).strip())
+
+    return columns
 
+
+def _split_values(values_str: str) -> List[str]:
+    """Split a value list on commas outside quoted strings"""
+    if "'" not in values_str and '"' not in values_str:
+        return _split_plain(values_str)
+
+    values = []
+    current = []
+
+    for token in _RE_VALUE_TOKEN.findall(values_str):
+        if token == ",":
+            values.append("".join(current).strip())
+            current = []
+        else:
+            current.append(token)
+
+    if current:
+        values.append("".join(current).strip())
+
+    return values
+
+
+def _extract_parenthesized(text: str) -> str:
+    """Return the content of the (...) pair that opens text"""
+    text = text.strip()
+    if not text.startswith("("):
+        raise ValueError("Expected '(' at start of VALUES")
+
+    depth = 0
+    for match in _RE_PAREN_TOKEN.finditer(text):
+        token = match.group()
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+            if depth == 0:
+                return text[1 : match.start()]
+
+    raise ValueError("Unbalanced parentheses in VALUES clause")
+
+
+def _extract_value_groups(text: str) -> List[str]:
+    """Return the contents of each (...) group in a VALUES list"""
+    text = text.strip()
+    if not text.startswith("("):
+        raise ValueError("Expected '(' at start of VALUES")
+
+    groups = []
+    depth = 0
+    start = end = 0
+    for match in _RE_PAREN_TOKEN.finditer(text):
+        token = match.group()
+        if token == "(":
+            if depth == 0:
+                # Groups must be separated by exactly one comma
+                if groups and text[end : match.start()].strip() != ",":
+                    raise ValueError("Expected ',' between VALUES rows")
+                start = match.end()
+            depth += 1
+        elif token == ")":
+            depth -= 1
+            if depth == 0:
+                groups.append(text[start : match.start()])
+                end = match.end()
+            elif depth < 0:
+                break
+
+    if depth != 0 or not groups:
         raise ValueError("Unbalanced parentheses in VALUES clause")
+    trailing = text[end:].strip()
+    if trailing:
+        raise ValueError(f"Unexpected '{trailing}' after VALUES")
+    return groups
+
+
+def _split_and(clause: str) -> List[str]:
+    """Split a WHERE clause on AND keywords outside quoted strings"""
+    if "'" not in clause and '"' not in clause:
+        return _RE_AND.split(clause)
+
+    parts = []
+    start = 0
+    for match in _RE_AND_OR_QUOTED.finditer(clause):
+        if match.group(1):
+            parts.append(clause[start : match.start()])
+            start = match.end()
+    parts.append(clause[start:])
+    return parts
+
+
+def _parse_number(text: str) -> Optional[float]:
+    """Return text as an int or float, or None if it is not a number"""
+    if _RE_INT.match(text):
+        return int(text)
+    if _RE_FLOAT.match(text):
+        return float(text)
+    return None
+
+
+# Statement handlers, keyed by the _RE_DISPATCH group names
+_HANDLERS = {
+    "create_table": SQLParser._parse_create_table,
+    "drop_table": SQLParser._parse_drop_table,
+    "create_index": SQLParser._parse_create_index,
+    "drop_index": SQLParser._parse_drop_index,
+    "insert": SQLParser._parse_insert,
+    "select": SQLParser._parse_select,
+    "update": SQLParser._parse_update,
+    "delete": SQLParser._parse_delete,
+}
 
 
 if __name__ == "__main__":
@@ -844,7 +1037,7 @@ if __name__ == "__main__":
         print(f"\n{i}. SQL: {sql}")
         try:
             query = parser.parse(sql)
-            print(f"   Type: {query.query_type.value}")
+            print(f"   Type: {query.query_type.name}")
             print(f"   Parsed: {query}")
         except Exception as e:
             print(f"   Error: {e}")
@@ -5,27 +5,219 @@ Provides a command-line interface for executing SQL queries
 
 import atexit
 import os
-import readline
+import re
 import sys
-from datetime import datetime
+import time
+from bisect import bisect_left
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
+from typing import Dict, List, Sequence
 
 from tabulate import tabulate
 
 from simpldb import Database
 
+# SQL keywords offered by tab completion, sorted for prefix lookup
+SQL_KEYWORDS = tuple(
+    sorted(
+        [
+            "SELECT",
+            "FROM",
+            "WHERE",
+            "INSERT",
+            "INTO",
+            "VALUES",
+            "UPDATE",
+            "SET",
+            "DELETE",
+            "CREATE",
+            "TABLE",
+            "DROP",
+            "INDEX",
+            "ON",
+            "PRIMARY",
+            "KEY",
+            "UNIQUE",
+            "NOT",
+            "NULL",
+            "INTEGER",
+            "VARCHAR",
+            "FLOAT",
+            "BOOLEAN",
+            "DATE",
+            "TEXT",
+            "AND",
+            "OR",
+            "ORDER",
+            "BY",
+            "LIMIT",
+            "OFFSET",
+            "ASC",
+            "DESC",
+            "JOIN",
+            "INNER",
+            "LEFT",
+            "RIGHT",
+        ]
+    )
+)
+
+BANNER = """
+╔═══════════════════════════════════════════════════════════════════╗
+║                        SimplDB v0.1.0                             ║
+║              Simple Relational Database Management System         ║
+╚═══════════════════════════════════════════════════════════════════╝
+
+Type .help for help, .exit to quit
+"""
+
+HELP_TEXT = """
+SimplDB Interactive Shell - Help
+
+SQL COMMANDS:
+  Write SQL queries ending with semicolon (;)
+  Multi-line queries are supported
+
+  Examples:
+    CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100));
+    INSERT INTO users (id, name) VALUES (1, 'Alice');
+    SELECT * FROM users;
+    UPDATE users SET name = 'Bob' WHERE id = 1;
+    DELETE FROM users WHERE id = 1;
+
+META COMMANDS:
+  .help              Show this help message
+  .tables            List all tables
+  .schema [table]    Show schema for all tables or specific table
+  .describe <table>  Show detailed information about a table
+  .stats [table]     Show statistics for all or specific table
+  .dbinfo            Show database information
+  .export <file>     Export database schema to file
+  .import <file>     Import database schema from file
+  .clear             Clear screen
+  .exit, .quit       Exit the shell
+
+KEYBOARD SHORTCUTS:
+  Tab                Auto-complete SQL keywords and table names
+  Ctrl+C             Cancel current input
+  Ctrl+D             Exit shell
+  Up/Down arrows     Navigate command history
+
+SUPPORTED SQL:
+  - CREATE TABLE / DROP TABLE
+  - CREATE INDEX / DROP INDEX
+  - INSERT INTO
+  - SELECT (with WHERE, ORDER BY, LIMIT, JOIN)
+  - UPDATE (with WHERE)
+  - DELETE (with WHERE)
+
+DATA TYPES:
+  INTEGER, VARCHAR(n), FLOAT, BOOLEAN, DATE, TEXT
+
+CONSTRAINTS:
+  PRIMARY KEY, UNIQUE, NOT NULL, DEFAULT
+
+For more information, visit: https://github.com/yourusername/simpldb
+"""
+
+# Maximum number of lines kept in the history file
+HISTORY_LENGTH = 1000
+
+# Result rows rendered per table chunk (and per pager screen)
+PAGE_SIZE = 1000
+
+# Seconds a snapshot of table names is reused by tab completion
+TABLE_NAMES_TTL = 2.0
+
+# Seconds table statistics are reused by .tables and .stats
+TABLE_STATS_TTL = 5.0
+
+# Tables imported between progress lines printed by .import
+IMPORT_PROGRESS_EVERY = 100
+
+# Tables whose describe / stats results are kept between meta-commands
+DESCRIBE_CACHE_SIZE = 128
+
+# Statements after which cached table names / statistics are stale
+_RE_SCHEMA_CHANGE = re.compile(r"\s*(?:CREATE|DROP|ALTER)\s+TABLE\b", re.I)
+_RE_DATA_CHANGE = re.compile(
+    r"\s*(?:INSERT|UPDATE|DELETE|CREATE|DROP|ALTER)\b", re.I
+)
+
+
+def _write_out(text: str):
+    """
+    Write a large block of text to stdout in one call
+
+    Goes straight to the binary buffer when there is one, skipping the
+    text layer's per-write encoding and locking; falls back to write()
+    for streams without a buffer (e.g. StringIO in tests).
+    """
+    out = sys.stdout
+    buffer = getattr(out, "buffer", None)
+    if buffer is None:
+        out.write(text)
+        return
+    out.flush()  # keep ordering with anything already print()ed
+    buffer.write(text.encode(out.encoding or "utf-8", "replace"))
+    buffer.flush()
+
+
+def _prefix_matches(names: Sequence[str], prefix: str) -> List[str]:
+    """Return the entries of a sorted sequence that start with prefix"""
+    matches = []
+    for i in range(bisect_left(names, prefix), len(names)):
+        if not names[i].startswith(prefix):
+            break
+        matches.append(names[i])
+    return matches
+
+
+def _table_cells(page: Sequence[Dict], headers: List[str]) -> List[List]:
+    """Lay out one page of result rows as cells in header order"""
+    # Rows of a single table all carry the same keys, so fetch the
+    # cells in C with itemgetter; rows missing a column (outer joins)
+    # fall back to the per-cell lookup with an empty default.
+    if len(headers) == 1:
+        key = headers[0]
+        try:
+            return [[row[key]] for row in page]
+        except KeyError:
+            return [[row.get(key, "")] for row in page]
+
+    getter = itemgetter(*headers)
+    try:
+        return [list(getter(row)) for row in page]
+    except KeyError:
+        return [[row.get(key, "") for key in headers] for row in page]
+
 
 class SimplDBREPL:
     """Interactive REPL for SimplDB"""
 
-    def __init__(self, db_name: str = "simpldb", data_dir: str = "data"):
+    def __init__(
+        self,
+        db_name: str = "simpldb",
+        data_dir: str = "data",
+        interactive: bool = True,
+    ):
         self.db = Database(name=db_name, data_dir=data_dir)
         self.running = True
         self.history_file = Path.home() / ".simpldb_history"
         self.command_buffer = []
-
-        # Setup readline for command history
-        self._setup_readline()
+        self.interactive = interactive
+        # History entries loaded at startup / present now; kept as a
+        # counter so nothing asks readline for the length per line
+        self._history_start = 0
+        self._history_count = 0
+        self._history_last = None
+        self._tracks_history = False
+
+        # Setup readline for command history (not needed for one-shot
+        # --execute runs, which never prompt)
+        if interactive:
+            self._setup_readline()
 
         # Command shortcuts
         self.meta_commands = {
@@ -42,8 +234,30 @@ class SimplDBREPL:
             ".dbinfo": self.show_db_info,
         }
 
+        # Tab completion caches
+        self._meta_names = tuple(sorted(self.meta_commands))
+        self._table_names: Sequence[str] = ()
+        self._table_names_ts = None
+        self._completions = (None, None, [])
+        self._static_completions: Dict[str, List[str]] = {}
+
+        # Table statistics cache for .tables / .stats
+        self._table_stats: Dict[str, Dict] = {}
+        self._table_stats_ts = None
+
+        # Per-table describe / stats results, dropped on any write
+        self._describe = lru_cache(maxsize=DESCRIBE_CACHE_SIZE)(
+            self.db.describe_table
+        )
+        self._stats_for = lru_cache(maxsize=DESCRIBE_CACHE_SIZE)(
+            self.db.get_table_stats
+        )
+
     def _setup_readline(self):
         """Setup readline for command history and completion"""
+        # Imported here so scripted runs never load or initialize it
+        import readline
+
         # Enable tab completion
         readline.parse_and_bind("tab: complete")
         readline.set_completer(self._completer)
@@ -54,92 +268,113 @@ class SimplDBREPL:
                 readline.read_history_file(self.history_file)
             except Exception:
                 pass
+        self._history_start = readline.get_current_history_length()
+        self._history_count = self._history_start
+        if self._history_start:
+            self._history_last = readline.get_history_item(
+                self._history_start
+            )
+        # input() only goes through readline (and its history) on a tty
+        self._tracks_history = sys.stdin.isatty()
 
         # Save history on exit
         atexit.register(self._save_history)
 
         # Set history length
-        readline.set_history_length(1000)
+        readline.set_history_length(HISTORY_LENGTH)
 
     def _save_history(self):
-        """Save command history to file"""
+        """Append this session's commands to the history file"""
+        import readline
+
         try:
-            readline.write_history_file(self.history_file)
+            new_entries = self._history_count - self._history_start
+            if new_entries <= 0:
+                return
+
+            if self.history_file.exists() and hasattr(
+                readline, "append_history_file"
+            ):
+                readline.append_history_file(new_entries, self.history_file)
+                readline.history_truncate_file(
+                    self.history_file, HISTORY_LENGTH
+                )
+            else:
+                readline.write_history_file(self.history_file)
         except Exception:
             pass
 
     def _completer(self, text, state):
         """Tab completion for SQL keywords and meta commands"""
-        sql_keywords = [
-            "SELECT",
-            "FROM",
-            "WHERE",
-            "INSERT",
-            "INTO",
-            "VALUES",
-            "UPDATE",
-            "SET",
-            "DELETE",
-            "CREATE",
-            "TABLE",
-            "DROP",
-            "INDEX",
-            "ON",
-            "PRIMARY",
-            "KEY",
-            "UNIQUE",
-            "NOT",
-            "NULL",
-            "INTEGER",
-            "VARCHAR",
-            "FLOAT",
-            "BOOLEAN",
-            "DATE",
-            "TEXT",
-            "AND",
-            "OR",
-            "ORDER",
-            "BY",
-            "LIMIT",
-            "OFFSET",
-            "ASC",
-            "DESC",
-            "JOIN",
-            "INNER",
-            "LEFT",
-            "RIGHT",
-        ]
-
-        meta_commands = list(self.meta_commands.keys())
-
-        # Get all possible completions
-        options = []
-
-        # Add SQL keywords
-        options.extend(
-            [kw for kw in sql_keywords if kw.startswith(text.upper())]
-        )
-
-        # Add meta commands
-        options.extend(
-            [cmd for cmd in meta_commands if cmd.startswith(text.lower())]
-        )
-
-        # Add table names
-        try:
-            tables = self.db.list_tables()
-            options.extend(
-                [tbl for tbl in tables if tbl.startswith(text.lower())]
-            )
-        except Exception:
-            pass
+        # readline asks for state 0, 1, 2, ... with the same text;
+        # build the options once and index into them afterwards. They
+        # are reused for a repeated Tab as long as the table snapshot
+        # has not been refreshed.
+        cached_text, cached_tables, options = self._completions
+        if state == 0 or cached_text != text:
+            tables = self._get_table_names()
+            if cached_text != text or cached_tables is not tables:
+                options = self._keyword_completions(text)
+                options += _prefix_matches(tables, text.lower())
+                self._completions = (text, tables, options)
 
         if state < len(options):
             return options[state]
         return None
 
+    def _keyword_completions(self, text: str) -> List[str]:
+        """SQL keywords and meta commands starting with text"""
+        static = self._static_completions.get(text)
+        if static is None:
+            static = _prefix_matches(SQL_KEYWORDS, text.upper())
+            static += _prefix_matches(self._meta_names, text.lower())
+            if len(self._static_completions) >= 256:
+                self._static_completions.clear()
+            self._static_completions[text] = static
+        return list(static)
+
+    def _get_table_names(self) -> Sequence[str]:
+        """Sorted table names, refreshed at most every TABLE_NAMES_TTL"""
+        now = time.monotonic()
+        if (
+            self._table_names_ts is None
+            or now - self._table_names_ts > TABLE_NAMES_TTL
+        ):
+            try:
+                self._table_names = tuple(sorted(self.db.list_tables()))
+            except Exception:
+                self._table_names = ()
+            self._table_names_ts = now
+        return self._table_names
+
+    def _invalidate_table_names(self):
+        """Force the next completion to reload table names"""
+        self._table_names_ts = None
+
+    def _get_table_stats(self) -> Dict[str, Dict]:
+        """Statistics for all tables, refreshed every TABLE_STATS_TTL"""
+        now = time.monotonic()
+        if (
+            self._table_stats_ts is None
+            or now - self._table_stats_ts > TABLE_STATS_TTL
+        ):
+            self._table_stats = self.db.get_all_table_stats()
+            self._table_stats_ts = now
+        return self._table_stats
+
+    def _invalidate_table_stats(self):
+        """Force the next .tables / .stats / .describe to reload"""
+        self._table_stats_ts = None
+        self._describe.cache_clear()
+        self._stats_for.cache_clear()
+
     def run(self):
         """Run the REPL"""
+        if not sys.stdin.isatty():
+            # Piped script: no prompts, banner or readline round-trips
+            self.run_script(sys.stdin.read())
+            return
+
         self.print_banner()
 
         while self.running:
@@ -150,24 +385,17 @@ class SimplDBREPL:
                 else:
                     prompt = "      -> "
 
-                line = input(prompt).strip()
-
-                if not line:
-                    continue
-
-                # Handle meta commands
-                if line.startswith("."):
-                    self.handle_meta_command(line)
-                    continue
-
-                # Build multi-line SQL
-                self.command_buffer.append(line)
-
-                # Check if statement is complete (ends with semicolon)
-                if line.endswith(";"):
-                    sql = " ".join(self.command_buffer)
-                    self.command_buffer = []
-                    self.execute_sql(sql)
+                raw_line = input(prompt)
+                if (
+                    self._tracks_history
+                    and raw_line
+                    and raw_line != self._history_last
+                ):
+                    # readline records each non-empty line that differs
+                    # from the previous entry
+                    self._history_count += 1
+                    self._history_last = raw_line
+                self.handle_line(raw_line)
 
             except KeyboardInterrupt:
                 print("\nUse .exit or .quit to exit")
@@ -179,26 +407,68 @@ class SimplDBREPL:
                 print(f"Error: {e}")
                 self.command_buffer = []
 
+    def run_script(self, text: str):
+        """Run a whole script (e.g. piped stdin) line by line, then exit"""
+        for raw_line in text.splitlines():
+            if not self.running:
+                return
+            try:
+                self.handle_line(raw_line)
+            except Exception as e:
+                print(f"Error: {e}")
+                self.command_buffer = []
+
+        if self.running:
+            self.exit_repl()
+
+    def handle_line(self, raw_line: str):
+        """Handle one line of input: a meta command or part of a statement"""
+        line = raw_line.strip()
+
+        if not line:
+            return
+
+        # Handle meta commands
+        if line.startswith("."):
+            self.handle_meta_command(line)
+            return
+
+        # Build multi-line SQL
+        self.command_buffer.append(line)
+
+        # Check if statement is complete (ends with semicolon)
+        if line.endswith(";"):
+            sql = " ".join(self.command_buffer)
+            self.command_buffer = []
+            self.execute_sql(sql)
+
     def handle_meta_command(self, command: str):
         """Handle meta commands (starting with .)"""
-        parts = command.split()
-        cmd = parts[0].lower()
-        args = parts[1:] if len(parts) > 1 else []
-
-        if cmd in self.meta_commands:
-            self.meta_commands[cmd](args)
+        # Only the command name is split off; the arguments are split
+        # only when there are any
+        head, *rest = command.split(None, 1)
+        cmd = head.lower()
+        args = rest[0].split() if rest else []
+
+        handler = self.meta_commands.get(cmd)
+        if handler is not None:
+            handler(args)
         else:
             print(f"Unknown command: {cmd}")
             print("Type .help for available commands")
 
     def execute_sql(self, sql: str):
         """Execute SQL query and display results"""
-        start_time = datetime.now()
+        start_time = time.perf_counter()
 
         try:
             result = self.db.execute(sql)
+            if _RE_DATA_CHANGE.match(sql):
+                self._invalidate_table_stats()
+                if _RE_SCHEMA_CHANGE.match(sql):
+                    self._invalidate_table_names()
 
-            elapsed = (datetime.now() - start_time).total_seconds()
+            elapsed = time.perf_counter() - start_time
 
             if result.success:
                 if result.rows:
@@ -229,76 +499,42 @@ class SimplDBREPL:
             print("No results")
             return
 
-        # Get all unique keys from all rows
-        # (in case of joins with different columns)
-        headers = []
-        seen = set()
-        for row in rows:
-            for key in row.keys():
-                if key not in seen:
-                    headers.append(key)
-                    seen.add(key)
-
-        # Build table data
-        table_data = []
-        for row in rows:
-            table_data.append([row.get(key, "") for key in headers])
-
-        # Print table
-        print()
-        print(tabulate(table_data, headers=headers, tablefmt="psql"))
-
-    def show_help(self, args):
-        """Show help information"""
-        help_text = """
-SimplDB Interactive Shell - Help
-
-SQL COMMANDS:
-  Write SQL queries ending with semicolon (;)
-  Multi-line queries are supported
-
-  Examples:
-    CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100));
-    INSERT INTO users (id, name) VALUES (1, 'Alice');
-    SELECT * FROM users;
-    UPDATE users SET name = 'Bob' WHERE id = 1;
-    DELETE FROM users WHERE id = 1;
-
-META COMMANDS:
-  .help              Show this help message
-  .tables            List all tables
-  .schema [table]    Show schema for all tables or specific table
-  .describe <table>  Show detailed information about a table
-  .stats [table]     Show statistics for all or specific table
-  .dbinfo            Show database information
-  .export <file>     Export database schema to file
-  .import <file>     Import database schema from file
-  .clear             Clear screen
-  .exit, .quit       Exit the shell
-
-KEYBOARD SHORTCUTS:
-  Tab                Auto-complete SQL keywords and table names
-  Ctrl+C             Cancel current input
-  Ctrl+D             Exit shell
-  Up/Down arrows     Navigate command history
+        # Render PAGE_SIZE rows at a time so a large result never has to
+        # be converted into one giant table string
+        page_through = (
+            self.interactive and sys.stdin.isatty() and sys.stdout.isatty()
+        )
+        headers = None
+        separator = "\n"
 
-SUPPORTED SQL:
-  - CREATE TABLE / DROP TABLE
-  - CREATE INDEX / DROP INDEX
-  - INSERT INTO
-  - SELECT (with WHERE, ORDER BY, LIMIT, JOIN)
-  - UPDATE (with WHERE)
-  - DELETE (with WHERE)
+        for start in range(0, len(rows), PAGE_SIZE):
+            page = rows[start : start + PAGE_SIZE]
 
-DATA TYPES:
-  INTEGER, VARCHAR(n), FLOAT, BOOLEAN, DATE, TEXT
+            # All keys in this page, in first-seen order
+            # (in case of joins with different columns)
+            page_headers = list(dict.fromkeys(k for row in page for k in row))
+            table_data = _table_cells(page, page_headers)
 
-CONSTRAINTS:
-  PRIMARY KEY, UNIQUE, NOT NULL, DEFAULT
+            if page_headers != headers:
+                headers = page_headers
+                table = tabulate(table_data, headers=headers, tablefmt="psql")
+            else:
+                table = tabulate(table_data, tablefmt="psql")
+            _write_out(separator + table + "\n")
+            separator = ""
+
+            if page_through and start + PAGE_SIZE < len(rows):
+                # Read without input() so the answer stays out of the
+                # readline history; an empty read (EOF) also stops
+                print("-- more -- (Enter to continue, q to stop) ", end="")
+                sys.stdout.flush()
+                answer = sys.stdin.readline()
+                if not answer or answer.strip().lower() == "q":
+                    break
 
-For more information, visit: https://github.com/yourusername/simpldb
-"""
-        print(help_text)
+    def show_help(self, args):
+        """Show help information"""
+        _write_out(HELP_TEXT + "\n")
 
     def show_tables(self, args):
         """List all tables"""
@@ -308,9 +544,10 @@ For more information, visit: https://github.com/yourusername/simpldb
             print("No tables in database")
             return
 
+        all_stats = self._get_table_stats()
         print(f"\nTables in database ({len(tables)}):")
         for i, table in enumerate(sorted(tables), 1):
-            stats = self.db.get_table_stats(table)
+            stats = all_stats.get(table)
             row_count = stats["row_count"] if stats else 0
             print(f"  {i}. {table} ({row_count} rows)")
 
@@ -333,7 +570,7 @@ For more information, visit: https://github.com/yourusername/simpldb
 
     def _show_table_schema(self, table_name: str):
         """Show schema for a specific table"""
-        info = self.db.describe_table(table_name)
+        info = self._describe(table_name)
 
         if not info:
             print(f"Table '{table_name}' not found")
@@ -375,7 +612,7 @@ For more information, visit: https://github.com/yourusername/simpldb
             return
 
         table_name = args[0]
-        info = self.db.describe_table(table_name)
+        info = self._describe(table_name)
 
         if not info:
             print(f"Table '{table_name}' not found")
@@ -450,8 +687,9 @@ For more information, visit: https://github.com/yourusername/simpldb
             total_rows = 0
             total_indexes = 0
 
+            all_stats = self._get_table_stats()
             for table_name in sorted(tables):
-                stats = self.db.get_table_stats(table_name)
+                stats = all_stats.get(table_name)
                 if stats:
                     rows = stats["row_count"]
                     indexes = len(stats["indexes"])
@@ -473,7 +711,7 @@ For more information, visit: https://github.com/yourusername/simpldb
 
     def _show_table_stats(self, table_name: str):
         """Show stats for specific table"""
-        stats = self.db.get_table_stats(table_name)
+        stats = self._stats_for(table_name)
 
         if not stats:
             print(f"Table '{table_name}' not found")
@@ -555,14 +793,20 @@ For more information, visit: https://github.com/yourusername/simpldb
             print(f"File not found: {filename}")
             return
 
+        total = success_count = 0
         try:
-            results = self.db.import_schema(filename)
-            success_count = sum(1 for r in results if r.success)
-            print(
-                f"Imported {success_count}/{len(results)} tables successfully"
-            )
+            for result in self.db.iter_import_schema(filename):
+                total += 1
+                success_count += result.success
+                if total % IMPORT_PROGRESS_EVERY == 0:
+                    print(f"  ... {total} tables processed")
+            print(f"Imported {success_count}/{total} tables successfully")
         except Exception as e:
             print(f"Error importing schema: {e}")
+        finally:
+            if total:
+                self._invalidate_table_names()
+                self._invalidate_table_stats()
 
     def clear_screen(self, args):
         """Clear the screen"""
@@ -578,15 +822,7 @@ For more information, visit: https://github.com/yourusername/simpldb
 
     def print_banner(self):
         """Print welcome banner"""
-        banner = """
-╔═══════════════════════════════════════════════════════════════════╗
-║                        SimplDB v0.1.0                             ║
-║              Simple Relational Database Management System         ║
-╚═══════════════════════════════════════════════════════════════════╝
-
-Type .help for help, .exit to quit
-"""
-        print(banner)
+        _write_out(BANNER + "\n")
 
 
 def main():
@@ -600,7 +836,11 @@ def main():
 
     args = parser.parse_args()
 
-    repl = SimplDBREPL(db_name=args.name, data_dir=args.data_dir)
+    repl = SimplDBREPL(
+        db_name=args.name,
+        data_dir=args.data_dir,
+        interactive=not args.execute and sys.stdin.isatty(),
+    )
 
     if args.execute:
         # Execute single command and exit
@@ -3,9 +3,18 @@ SimplDB Schema Manager
 Handles table schemas, column definitions, data types, and constraints
 """
 
+import sys
 from datetime import date, datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
 
 
 class DataType(Enum):
@@ -27,9 +36,98 @@ class ColumnConstraint(Enum):
     NOT_NULL = "NOT_NULL"
 
 
+def _convert_integer(value: Any) -> int:
+    # bool is subclass of int, handle separately
+    if isinstance(value, bool):
+        raise TypeError("Boolean cannot be converted to INTEGER")
+    return int(value)
+
+
+def _convert_boolean(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        if value.lower() in ("true", "1", "yes", "t", "y"):
+            return True
+        elif value.lower() in ("false", "0", "no", "f", "n"):
+            return False
+    if isinstance(value, int):
+        return bool(value)
+    raise TypeError(f"Cannot convert {value} to BOOLEAN")
+
+
+def _convert_date(value: Any) -> str:
+    # IMPORTANT: datetime must be checked before date
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+
+    if isinstance(value, date):
+        return value.isoformat()
+
+    if isinstance(value, str):
+        try:
+            if len(value) == 10 and value[4] == "-" and value[7] == "-":
+                # Already canonical YYYY-MM-DD; only needs validating
+                date.fromisoformat(value)
+                return value
+            parsed = datetime.fromisoformat(value).date()
+            return parsed.isoformat()
+        except ValueError:
+            raise ValueError(f"Invalid date format: {value}. Use YYYY-MM-DD")
+
+    raise TypeError(f"Cannot convert {type(value)} to DATE")
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+# Converter for each data type, looked up once per column instead of
+# dispatching on the type for every value
+_CONVERTERS: Dict[DataType, Callable[[Any], Any]] = {
+    DataType.INTEGER: _convert_integer,
+    DataType.VARCHAR: str,
+    DataType.TEXT: str,
+    DataType.FLOAT: float,
+    DataType.BOOLEAN: _convert_boolean,
+    DataType.DATE: _convert_date,
+}
+
+# Python type a converter returns its input unchanged for, so values
+# that already have it can skip the conversion call
+_NATIVE_TYPES: Dict[DataType, type] = {
+    DataType.INTEGER: int,
+    DataType.VARCHAR: str,
+    DataType.TEXT: str,
+    DataType.FLOAT: float,
+    DataType.BOOLEAN: bool,
+}
+
+# Per-column validation plan: name, converter, native type (None if
+# every value is converted), NOT NULL, VARCHAR max length (None when
+# unchecked) and default
+_ColumnPlan = Tuple[
+    str, Callable[[Any], Any], Optional[type], bool, Optional[int], Any
+]
+
+
 class Column:
     """Represents a column definition in a table"""
 
+    __slots__ = (
+        "name",
+        "data_type",
+        "max_length",
+        "constraints",
+        "default",
+        "_primary_key",
+        "_unique",
+        "_not_null",
+        "_convert",
+        "_native",
+        "_check_length",
+    )
+
     def __init__(
         self,
         name: str,
@@ -38,7 +136,7 @@ class Column:
         constraints: Optional[List[ColumnConstraint]] = None,
         default: Any = None,
     ):
-        self.name = name
+        self.name = sys.intern(name)
         self.data_type = data_type
         self.max_length = max_length
         self.constraints = constraints or []
@@ -56,17 +154,29 @@ class Column:
             if ColumnConstraint.NOT_NULL not in self.constraints:
                 self.constraints.append(ColumnConstraint.NOT_NULL)
 
+        # Constraint checks run per value, so answer them from flags
+        self._primary_key = ColumnConstraint.PRIMARY_KEY in self.constraints
+        self._unique = (
+            self._primary_key or ColumnConstraint.UNIQUE in self.constraints
+        )
+        self._not_null = ColumnConstraint.NOT_NULL in self.constraints
+
+        # Converter for this column's type, bound once, with the type it
+        # passes through unchanged and the VARCHAR limit (None if unchecked)
+        self._convert = _CONVERTERS.get(data_type, _identity)
+        self._native = _NATIVE_TYPES.get(data_type)
+        self._check_length = (
+            max_length if data_type == DataType.VARCHAR else None
+        )
+
     def is_primary_key(self) -> bool:
-        return ColumnConstraint.PRIMARY_KEY in self.constraints
+        return self._primary_key
 
     def is_unique(self) -> bool:
-        return (
-            ColumnConstraint.UNIQUE in self.constraints
-            or self.is_primary_key()
-        )
+        return self._unique
 
     def is_not_null(self) -> bool:
-        return ColumnConstraint.NOT_NULL in self.constraints
+        return self._not_null
 
     def validate_value(self, value: Any) -> tuple[bool, Optional[str]]:
         """
@@ -75,82 +185,51 @@ class Column:
         """
         # Check NOT NULL constraint
         if value is None:
-            if self.is_not_null():
+            if self._not_null:
                 return False, f"Column '{self.name}' cannot be NULL"
             return True, None  # NULL is valid for nullable columns
 
         # Type validation
-        try:
-            converted_value = self.convert_value(value)
-        except (ValueError, TypeError) as e:
-            return False, f"Invalid type for column '{self.name}': {str(e)}"
-
-        # VARCHAR length validation
-        if self.data_type == DataType.VARCHAR:
-            if len(str(converted_value)) > self.max_length:
+        if type(value) is self._native:
+            converted_value = value
+        else:
+            try:
+                converted_value = self._convert(value)
+            except (ValueError, TypeError) as e:
                 return (
                     False,
-                    (
-                        f"Value for '{self.name}' exceeds max length of "
-                        f"{self.max_length}"
-                    ),
+                    f"Invalid type for column '{self.name}': {str(e)}",
                 )
 
+        # VARCHAR length validation
+        max_length = self._check_length
+        if max_length is not None and len(converted_value) > max_length:
+            return (
+                False,
+                (
+                    f"Value for '{self.name}' exceeds max length of "
+                    f"{max_length}"
+                ),
+            )
+
         return True, None
 
     def convert_value(self, value: Any) -> Any:
         """Convert and validate value to the correct type"""
-        if value is None:
-            return None
-
-        if self.data_type == DataType.INTEGER:
-            if isinstance(
-                value, bool
-            ):  # bool is subclass of int, handle separately
-                raise TypeError("Boolean cannot be converted to INTEGER")
-            return int(value)
-
-        elif (
-            self.data_type == DataType.VARCHAR
-            or self.data_type == DataType.TEXT
-        ):
-            return str(value)
-
-        elif self.data_type == DataType.FLOAT:
-            return float(value)
-
-        elif self.data_type == DataType.BOOLEAN:
-            if isinstance(value, bool):
-                return value
-            if isinstance(value, str):
-                if value.lower() in ("true", "1", "yes", "t", "y"):
-                    return True
-                elif value.lower() in ("false", "0", "no", "f", "n"):
-                    return False
-            if isinstance(value, int):
-                return bool(value)
-            raise TypeError(f"Cannot convert {value} to BOOLEAN")
-
-        elif self.data_type == DataType.DATE:
-            # IMPORTANT: datetime must be checked before date
-            if isinstance(value, datetime):
-                return value.date().isoformat()
-
-            if isinstance(value, date):
-                return value.isoformat()
-
-            if isinstance(value, str):
-                try:
-                    parsed = datetime.fromisoformat(value).date()
-                    return parsed.isoformat()
-                except ValueError:
-                    raise ValueError(
-                        f"Invalid date format: {value}. Use YYYY-MM-DD"
-                    )
-
-            raise TypeError(f"Cannot convert {type(value)} to DATE")
+        if value is None or type(value) is self._native:
+            return value
+        return self._convert(value)
 
-        return value
+    def _plan(self) -> _ColumnPlan:
+        """Everything validate_row / convert_row need for this column"""
+        return (
+            self.name,
+            self._convert,
+            self._native,
+            self._not_null,
+            self._check_length,
+            self.default,
+        )
 
     def to_dict(self) -> Dict[str, Any]:
         """Serialize column definition"""
@@ -190,6 +269,25 @@ class Schema:
         self.table_name = table_name
         self.columns = {col.name: col for col in columns}
         self._validate_schema()
+        self._primary_key = next(
+            (col for col in self.columns.values() if col.is_primary_key()),
+            None,
+        )
+        self._unique_columns = tuple(
+            col for col in self.columns.values() if col.is_unique()
+        )
+        self._compiled: Optional[Tuple[_ColumnPlan, ...]] = None
+
+    def _compile(self) -> Tuple[_ColumnPlan, ...]:
+        """
+        Resolve each column's converter and constraints once, so that
+        validating or converting a row does no per-value type dispatch
+        """
+        if self._compiled is None:
+            self._compiled = tuple(
+                col._plan() for col in self.columns.values()
+            )
+        return self._compiled
 
     def _validate_schema(self):
         """Validate the schema definition"""
@@ -210,41 +308,115 @@ class Schema:
 
     def get_primary_key(self) -> Optional[Column]:
         """Get the primary key column if it exists"""
-        for col in self.columns.values():
-            if col.is_primary_key():
-                return col
-        return None
+        return self._primary_key
 
     def get_unique_columns(self) -> List[Column]:
         """Get all columns with UNIQUE constraint"""
-        return [col for col in self.columns.values() if col.is_unique()]
+        return list(self._unique_columns)
 
     def validate_row(self, row_data: Dict[str, Any]) -> tuple[bool, List[str]]:
         """
         Validate a row of data against this schema
         Returns: (is_valid, list_of_errors)
         """
-        errors = []
+        columns = self.columns
 
         # Check for unknown columns
-        for col_name in row_data.keys():
-            if col_name not in self.columns:
-                errors.append(f"Unknown column: '{col_name}'")
+        errors = [
+            f"Unknown column: '{col_name}'"
+            for col_name in row_data
+            if col_name not in columns
+        ]
 
         # Validate each column
-        for col_name, column in self.columns.items():
-            value = row_data.get(col_name)
+        for plan in self._compile():
+            name, convert, native, not_null, max_length, default = plan
+            value = row_data.get(name)
+
+            if value is None:
+                # Use default if value not provided
+                if default is None:
+                    if not_null:
+                        errors.append(f"Column '{name}' cannot be NULL")
+                    continue
+                row_data[name] = value = default
+
+            if type(value) is native:
+                converted = value
+            else:
+                try:
+                    converted = convert(value)
+                except (ValueError, TypeError) as e:
+                    errors.append(f"Invalid type for column '{name}': {e}")
+                    continue
+
+            # VARCHAR length validation
+            if max_length is not None and len(converted) > max_length:
+                errors.append(
+                    f"Value for '{name}' exceeds max length of {max_length}"
+                )
+
+        return not errors, errors
+
+    def validate_rows(
+        self, rows: List[Dict[str, Any]]
+    ) -> tuple[bool, List[str]]:
+        """
+        Validate many rows at once, one column at a time
+        Applies defaults like validate_row; each error is prefixed with
+        the position of its row
+        Returns: (all_valid, list_of_errors)
+        """
+        columns = self.columns
 
-            # Use default if value not provided
-            if value is None and column.default is not None:
-                row_data[col_name] = column.default
-                value = column.default
+        # Check for unknown columns
+        errors = [
+            f"Row {i}: Unknown column: '{col_name}'"
+            for i, row_data in enumerate(rows)
+            for col_name in row_data
+            if col_name not in columns
+        ]
 
-            is_valid, error = column.validate_value(value)
-            if not is_valid:
-                errors.append(error)
+        for plan in self._compile():
+            name, convert, native, not_null, max_length, default = plan
+
+            # Fast path: a column whose values are all present and already
+            # of the native type is checked with C-level map/set/max calls
+            values = [row_data.get(name) for row_data in rows]
+            if values and set(map(type, values)) == {native}:
+                if max_length is None or max(map(len, values)) <= max_length:
+                    continue
+
+            for i, row_data in enumerate(rows):
+                value = row_data.get(name)
+
+                if value is None:
+                    if default is None:
+                        if not_null:
+                            errors.append(
+                                f"Row {i}: Column '{name}' cannot be NULL"
+                            )
+                        continue
+                    row_data[name] = value = default
+
+                if type(value) is native:
+                    converted = value
+                else:
+                    try:
+                        converted = convert(value)
+                    except (ValueError, TypeError) as e:
+                        errors.append(
+                            f"Row {i}: Invalid type for column '{name}': {e}"
+                        )
+                        continue
+
+                if max_length is not None and len(converted) > max_length:
+                    errors.append(
+                        f"Row {i}: Value for '{name}' exceeds max length "
+                        f"of {max_length}"
+                    )
 
-        return len(errors) == 0, errors
+        return not errors, errors
 
     def convert_row(self, row_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -253,18 +425,18 @@ class Schema:
         """
         converted = {}
 
-        for col_name, column in self.columns.items():
-            value = row_data.get(col_name)
+        for name, convert, native, _, _, default in self._compile():
+            value = row_data.get(name)
 
             # Apply default if missing
-            if value is None and column.default is not None:
-                value = column.default
+            if value is None:
+                value = default
 
             # Convert to correct type
-            if value is not None:
-                converted[col_name] = column.convert_value(value)
+            if value is None or type(value) is native:
+                converted[name] = value
             else:
-                converted[col_name] = None
+                converted[name] = convert(value)
 
         return converted
 
@@ -280,6 +452,31 @@ class Schema:
         exclude_row_id: Row ID to exclude from check (for updates)
         Returns: (is_valid, error_message)
         """
+        if value is None:
+            return True, None  # NULL values don't violate unique constraint
+
+        holders = [
+            row.get("row_id")
+            for row in existing_rows
+            if row.get("data", {}).get(column_name) == value
+        ]
+        return self.check_unique_value(
+            column_name, value, holders, exclude_row_id
+        )
+
+    def check_unique_value(
+        self,
+        column_name: str,
+        value: Any,
+        row_ids: Collection[int],
+        exclude_row_id: Optional[int] = None,
+    ) -> tuple[bool, Optional[str]]:
+        """
+        Check a unique constraint given the IDs of the rows that already
+        hold value (e.g. from TableStorage.find_ids)
+        exclude_row_id: Row ID to exclude from check (for updates)
+        Returns: (is_valid, error_message)
+        """
         column = self.get_column(column_name)
         if not column or not column.is_unique():
             return True, None
@@ -287,24 +484,21 @@ class Schema:
         if value is None:
             return True, None  # NULL values don't violate unique constraint
 
-        # Check existing rows
-        for row in existing_rows:
+        for row_id in row_ids:
             # Skip the row being updated
-            if exclude_row_id and row.get("row_id") == exclude_row_id:
+            if exclude_row_id and row_id == exclude_row_id:
                 continue
 
-            row_value = row.get("data", {}).get(column_name)
-            if row_value == value:
-                constraint_type = (
-                    "PRIMARY KEY" if column.is_primary_key() else "UNIQUE"
-                )
-                return (
-                    False,
-                    (
-                        f"{constraint_type} violation: "
-                        f"'{column_name}' value '{value}' already exists"
-                    ),
-                )
+            constraint_type = (
+                "PRIMARY KEY" if column.is_primary_key() else "UNIQUE"
+            )
+            return (
+                False,
+                (
+                    f"{constraint_type} violation: "
+                    f"'{column_name}' value '{value}' already exists"
+                ),
+            )
 
         return True, None
 
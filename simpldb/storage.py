@@ -4,20 +4,106 @@ Handles data persistence to disk using JSON files
 """
 
 import json
+import mmap
+import os
+import sys
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from threading import Lock
-from typing import Any, Dict, List, Optional
+from threading import Condition, Event, Lock, Thread
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; the stdlib json is used instead
+    orjson = None
+
+# Strings up to this length are interned when rows are stored or loaded,
+# so repeated categorical values (status, country codes) share one object
+INTERN_MAX_LENGTH = 64
+
+# Change log records tolerated before a table is compacted (the log is
+# also allowed to grow to as many records as the table has rows)
+COMPACT_MIN_RECORDS = 1000
+
+# Write buffer of a table's change log handle
+LOG_BUFFER_SIZE = 64 * 1024
+
+# When logged changes are forced to disk with fsync: never (left to the
+# OS), every COMMIT_INTERVAL_MS from a background thread, or per write
+SYNC_POLICIES = ("none", "batch", "always")
+COMMIT_INTERVAL_MS = 100
+
+_intern = sys.intern
+_new_row = object.__new__
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize to compact JSON bytes"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            pass  # e.g. integers wider than 64 bits
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def _loads(data: Union[bytes, memoryview]) -> Any:
+    """Parse JSON bytes, raising ValueError on malformed input"""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN written by the stdlib encoder
+    return json.loads(bytes(data))
+
+
+def _intern_values(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a row's data with column names and short strings interned"""
+    return {
+        _intern(key): (
+            _intern(value)
+            if type(value) is str and len(value) <= INTERN_MAX_LENGTH
+            else value
+        )
+        for key, value in data.items()
+    }
 
 
 class Row:
     """Represents a single row/record in a table"""
 
-    def __init__(self, data: Dict[str, Any], row_id: Optional[int] = None):
+    __slots__ = ("data", "row_id", "created_at", "_updated_at", "_dirty")
+
+    def __init__(
+        self,
+        data: Dict[str, Any],
+        row_id: Optional[int] = None,
+        created_at: Optional[str] = None,
+        updated_at: Optional[str] = None,
+    ):
         self.data = data
         self.row_id = row_id
-        self.created_at = datetime.now().isoformat()
-        self.updated_at = datetime.now().isoformat()
+        if created_at is None or updated_at is None:
+            now = datetime.now().isoformat()
+            created_at = now if created_at is None else created_at
+            updated_at = now if updated_at is None else updated_at
+        self.created_at = created_at
+        self._updated_at = updated_at
+        self._dirty = False  # Modified since updated_at was last stamped
+
+    @property
+    def updated_at(self) -> str:
+        """Time of the last modification, stamped when first asked for"""
+        if self._dirty:
+            self._updated_at = datetime.now().isoformat()
+            self._dirty = False
+        return self._updated_at
+
+    @updated_at.setter
+    def updated_at(self, value: str):
+        self._updated_at = value
+        self._dirty = False
 
     def __getitem__(self, key: str) -> Any:
         """Allow dict-like access: row['column_name']"""
@@ -26,12 +112,24 @@ class Row:
     def __setitem__(self, key: str, value: Any):
         """Allow dict-like assignment: row['column_name'] = value"""
         self.data[key] = value
-        self.updated_at = datetime.now().isoformat()
+        self._dirty = True
 
     def get(self, key: str, default=None) -> Any:
         """Get value with default"""
         return self.data.get(key, default)
 
+    def copy(self) -> "Row":
+        """Copy of this row whose data can be changed independently"""
+        # Filled in slot by slot: storage hands out a copy of every row
+        # it returns, and __init__'s timestamp defaulting is not needed
+        row = _new_row(Row)
+        row.data = dict(self.data)
+        row.row_id = self.row_id
+        row.created_at = self.created_at
+        row._updated_at = self.updated_at
+        row._dirty = False
+        return row
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert row to dictionary for serialization"""
         return {
@@ -44,23 +142,139 @@ class Row:
     @classmethod
     def from_dict(cls, row_dict: Dict[str, Any]) -> "Row":
         """Create Row from dictionary"""
-        row = cls(row_dict["data"], row_dict["row_id"])
-        row.created_at = row_dict.get("created_at", row.created_at)
-        row.updated_at = row_dict.get("updated_at", row.updated_at)
-        return row
+        return cls(
+            _intern_values(row_dict["data"]),
+            row_dict["row_id"],
+            row_dict.get("created_at"),
+            row_dict.get("updated_at"),
+        )
 
     def __repr__(self):
         return f"Row(id={self.row_id}, data={self.data})"
 
 
+class RWLock:
+    """
+    Reader-writer lock: any number of readers or a single writer
+
+    Used as a context manager it is held for writing; `with lock.reader`
+    holds it for reading. Waiting writers block new readers, so a steady
+    stream of reads cannot starve writes. Not reentrant.
+    """
+
+    def __init__(self):
+        self._cond = Condition(Lock())
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+        self.reader = _ReadLock(self)
+
+    def acquire_read(self):
+        with self._cond:
+            while self._writing or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writing or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writing = True
+
+    def release_write(self):
+        with self._cond:
+            self._writing = False
+            self._cond.notify_all()
+
+    def __enter__(self):
+        self.acquire_write()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release_write()
+
+
+class _ReadLock:
+    """Read side of an RWLock, as a context manager"""
+
+    def __init__(self, lock: RWLock):
+        self._lock = lock
+
+    def __enter__(self):
+        self._lock.acquire_read()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._lock.release_read()
+
+
 class TableStorage:
-    """Manages storage for a single table"""
+    """
+    Manages storage for a single table
+
+    Rows are kept in memory, keyed by row ID. On disk a table is a JSON
+    snapshot ({table}.json) plus an append-only log of the changes made
+    since ({table}.log, one JSON record per line). The log is replayed
+    on load and folded back into the snapshot once it grows past
+    COMPACT_MIN_RECORDS records and the number of live rows.
+
+    With autocommit (the default) every change is handed to the OS as
+    it is made, so instances opened on the directory afterwards see it.
+    Instances that are already open do not: rows are read from disk only
+    when a table is opened, so only one instance should use a table at a
+    time (Database enforces this per data directory). Without autocommit,
+    log records collect in the handle's buffer until commit(), sync() or
+    close(), so runs of small writes become a single write call. The
+    sync policy (see SYNC_POLICIES) decides when changes are also
+    fsynced. Between begin_batch() and end_batch() the hand-off (and a
+    per-write fsync) is deferred to the end of the batch.
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        data_dir: Path,
+        autocommit: bool = True,
+        sync: str = "none",
+        commit_interval_ms: int = COMMIT_INTERVAL_MS,
+    ):
+        if sync not in SYNC_POLICIES:
+            raise ValueError(f"Unknown sync policy: {sync}")
 
-    def __init__(self, table_name: str, data_dir: Path):
         self.table_name = table_name
+        self.autocommit = autocommit
+        self.sync_policy = sync
+        self.commit_interval_ms = commit_interval_ms
         self.data_dir = Path(data_dir)
         self.file_path = self.data_dir / f"{table_name}.json"
-        self.lock = Lock()  # Thread-safe operations
+        self.log_path = self.data_dir / f"{table_name}.log"
+        self.lock = RWLock()  # Many readers or one writer
+
+        self._rows: Dict[int, Row] = {}
+        self._next_id = 1
+        self._metadata: Dict[str, Any] = {}
+        # Buffered append handle, opened on first write and kept open
+        self._log = None
+        self._log_records = 0
+        self._batch_depth = 0
+
+        # Group commit ("batch" policy): a background thread fsyncs the
+        # log whenever it has unsynced records
+        self._unsynced = False
+        self._sync_thread: Optional[Thread] = None
+        self._stop_sync = Event()
+
+        # column -> value -> IDs of the rows holding it, built on first
+        # lookup of a column and kept current by every change afterwards
+        self._value_ids: Dict[str, Dict[Any, Set[int]]] = {}
 
         # Ensure data directory exists
         self.data_dir.mkdir(parents=True, exist_ok=True)
@@ -68,141 +282,407 @@ class TableStorage:
         # Initialize file if it doesn't exist
         if not self.file_path.exists():
             self._write_data({"rows": [], "next_id": 1, "metadata": {}})
+            if self.log_path.exists():
+                self.log_path.unlink()  # Left over from a dropped table
+
+        self._load()
 
     def _read_data(self) -> Dict[str, Any]:
-        """Read data from disk"""
+        """Read the snapshot from disk"""
         try:
-            with open(self.file_path, "r") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
+            # Parsed straight from the page cache through a read-only
+            # mapping, without first copying the file into a bytes object
+            # (an empty file cannot be mapped and raises ValueError)
+            with open(self.file_path, "rb") as f, mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mapped, memoryview(mapped) as view:
+                return _loads(view)
+        except (ValueError, FileNotFoundError):
             # If file is corrupted or missing, return empty structure
             return {"rows": [], "next_id": 1, "metadata": {}}
 
     def _write_data(self, data: Dict[str, Any]):
-        """Write data to disk"""
-        with open(self.file_path, "w") as f:
-            json.dump(data, f, indent=2)
+        """Write a snapshot to disk, replacing the previous one"""
+        tmp_path = self.file_path.with_suffix(".json.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(_dumps(data))
+            if self.sync_policy != "none":
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self.file_path)
+
+    def _load(self):
+        """Load the snapshot and replay the change log into memory"""
+        data = self._read_data()
+        self._rows = {
+            row_dict["row_id"]: Row.from_dict(row_dict)
+            for row_dict in data["rows"]
+        }
+        self._next_id = data["next_id"]
+        self._metadata = data.get("metadata", {})
+
+        if not self.log_path.exists():
+            return
+
+        with open(self.log_path, "rb") as f:
+            for line in f:
+                try:
+                    record = _loads(line)
+                except ValueError:
+                    # Torn final write: rewrite the snapshot so new
+                    # records are not appended after the partial line
+                    self._compact()
+                    return
+                self._apply(record)
+                self._log_records += 1
+
+    def _apply(self, record: Dict[str, Any]):
+        """Apply one change log record to the in-memory table"""
+        op = record["op"]
+        if op == "i":
+            row_id = record["id"]
+            self._rows[row_id] = Row(
+                _intern_values(record["d"]), row_id, record["c"], record["u"]
+            )
+            self._next_id = max(self._next_id, row_id + 1)
+        elif op == "u":
+            row = self._rows.get(record["id"])
+            if row is not None:
+                # "d" holds the changed columns only
+                row.data = {**row.data, **_intern_values(record["d"])}
+                row.updated_at = record["u"]
+        elif op == "d":
+            self._rows.pop(record["id"], None)
+        elif op == "x":
+            self._rows.clear()
+        elif op == "m":
+            self._metadata[record["k"]] = record["v"]
+
+    def _append(self, records: List[Dict[str, Any]]):
+        """Append change records to the log and hand them to the OS"""
+        if self._log is None:
+            self._log = open(self.log_path, "ab", buffering=LOG_BUFFER_SIZE)
+        self._log.write(b"".join(_dumps(record) + b"\n" for record in records))
+        if not self._batch_depth:
+            self._flush_log()
+        if self.sync_policy == "batch":
+            self._unsynced = True
+            if self._sync_thread is None:
+                self._sync_thread = Thread(
+                    target=self._sync_loop,
+                    name=f"simpldb-sync-{self.table_name}",
+                    daemon=True,
+                )
+                self._sync_thread.start()
+        self._log_records += len(records)
+
+        if self._log_records > max(COMPACT_MIN_RECORDS, len(self._rows)):
+            self._compact()
+
+    def _flush_log(self):
+        """Hand written records to the OS as the policies require"""
+        if self.sync_policy == "always":
+            self._log.flush()
+            os.fsync(self._log.fileno())
+        elif self.autocommit:
+            self._log.flush()
+
+    def _compact(self):
+        """Fold the change log into a fresh snapshot"""
+        self._write_data(
+            {
+                "rows": [row.to_dict() for row in self._rows.values()],
+                "next_id": self._next_id,
+                "metadata": self._metadata,
+            }
+        )
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        if self.log_path.exists():
+            self.log_path.unlink()
+        self._log_records = 0
+
+    def _index_row(self, row: Row):
+        """Add a row's values to the tracked value lookups"""
+        for column, ids_by_value in self._value_ids.items():
+            value = row.data.get(column)
+            if value is not None:
+                ids_by_value.setdefault(value, set()).add(row.row_id)
+
+    def _unindex_row(self, row: Row):
+        """Remove a row's values from the tracked value lookups"""
+        for column, ids_by_value in self._value_ids.items():
+            ids = ids_by_value.get(row.data.get(column))
+            if ids is not None:
+                ids.discard(row.row_id)
+                if not ids:
+                    del ids_by_value[row.data[column]]
+
+    def _insert_row(self, row_data: Dict[str, Any], now: str) -> Dict:
+        """Store a new row in memory and return its log record"""
+        row_id = self._next_id
+        row = Row(_intern_values(row_data), row_id, now, now)
+        self._rows[row_id] = row
+        self._index_row(row)
+        self._next_id += 1
+        return {"op": "i", "id": row_id, "d": row.data, "c": now, "u": now}
 
     def insert(self, row_data: Dict[str, Any]) -> int:
         """Insert a new row and return its ID"""
         with self.lock:
-            data = self._read_data()
-            row_id = data["next_id"]
-
-            row = Row(row_data, row_id)
-            data["rows"].append(row.to_dict())
-            data["next_id"] += 1
-
-            self._write_data(data)
-            return row_id
+            record = self._insert_row(row_data, datetime.now().isoformat())
+            self._append([record])
+            return record["id"]
 
     def insert_many(self, rows_data: List[Dict[str, Any]]) -> List[int]:
         """Insert multiple rows efficiently"""
         with self.lock:
-            data = self._read_data()
-            inserted_ids = []
-
-            for row_data in rows_data:
-                row_id = data["next_id"]
-                row = Row(row_data, row_id)
-                data["rows"].append(row.to_dict())
-                data["next_id"] += 1
-                inserted_ids.append(row_id)
-
-            self._write_data(data)
-            return inserted_ids
+            # One timestamp and one log write for the whole batch
+            now = datetime.now().isoformat()
+            records = [
+                self._insert_row(row_data, now) for row_data in rows_data
+            ]
+            if records:
+                self._append(records)
+            return [record["id"] for record in records]
 
     def select_all(self) -> List[Row]:
         """Retrieve all rows"""
-        with self.lock:
-            data = self._read_data()
-            return [Row.from_dict(row_dict) for row_dict in data["rows"]]
+        with self.lock.reader:
+            return [row.copy() for row in self._rows.values()]
+
+    def select_column(self, column: str) -> Tuple[List[int], List[Any]]:
+        """
+        Row IDs and one column's values (None where missing), in the same
+        order, read straight from the stored rows without copying them
+        """
+        with self.lock.reader:
+            rows = self._rows
+            return list(rows), [row.data.get(column) for row in rows.values()]
 
     def select_by_id(self, row_id: int) -> Optional[Row]:
         """Retrieve a specific row by ID"""
-        with self.lock:
-            data = self._read_data()
-            for row_dict in data["rows"]:
-                if row_dict["row_id"] == row_id:
-                    return Row.from_dict(row_dict)
-            return None
+        with self.lock.reader:
+            row = self._rows.get(row_id)
+            return row.copy() if row is not None else None
 
     def update_by_id(self, row_id: int, updates: Dict[str, Any]) -> bool:
         """Update a row by ID, returns True if successful"""
         with self.lock:
-            data = self._read_data()
-            for i, row_dict in enumerate(data["rows"]):
-                if row_dict["row_id"] == row_id:
-                    # Update the data
-                    row = Row.from_dict(row_dict)
-                    for key, value in updates.items():
-                        row[key] = value
-                    data["rows"][i] = row.to_dict()
-                    self._write_data(data)
-                    return True
-            return False
+            row = self._rows.get(row_id)
+            if row is None:
+                return False
+
+            # Update the data; callers usually pass the whole row, so only
+            # the columns whose values differ are logged
+            old = row.data
+            changed = {
+                key: value
+                for key, value in _intern_values(updates).items()
+                if key not in old
+                or old[key] != value
+                or type(old[key]) is not type(value)
+            }
+            self._unindex_row(row)
+            row.data = {**old, **changed}
+            self._index_row(row)
+            row.updated_at = datetime.now().isoformat()
+            self._append(
+                [{"op": "u", "id": row_id, "d": changed, "u": row.updated_at}]
+            )
+            return True
 
     def delete_by_id(self, row_id: int) -> bool:
         """Delete a row by ID, returns True if successful"""
         with self.lock:
-            data = self._read_data()
-            original_count = len(data["rows"])
-            data["rows"] = [r for r in data["rows"] if r["row_id"] != row_id]
-
-            if len(data["rows"]) < original_count:
-                self._write_data(data)
-                return True
-            return False
+            row = self._rows.pop(row_id, None)
+            if row is None:
+                return False
+            self._unindex_row(row)
+            self._append([{"op": "d", "id": row_id}])
+            return True
 
     def delete_all(self) -> int:
         """Delete all rows, returns count of deleted rows"""
         with self.lock:
-            data = self._read_data()
-            count = len(data["rows"])
-            data["rows"] = []
-            self._write_data(data)
+            count = len(self._rows)
+            self._rows.clear()
+            self._value_ids.clear()
+            self._compact()
             return count
 
     def count(self) -> int:
         """Count total rows"""
-        with self.lock:
-            data = self._read_data()
-            return len(data["rows"])
+        with self.lock.reader:
+            return len(self._rows)
+
+    def find_ids(self, column: str, value: Any) -> Set[int]:
+        """IDs of the rows whose column equals value (not NULL)"""
+        with self.lock.reader:
+            ids_by_value = self._value_ids.get(column)
+            if ids_by_value is None:
+                # Built completely before it is published, since other
+                # readers may be doing the same
+                ids_by_value = {}
+                for row in self._rows.values():
+                    row_value = row.data.get(column)
+                    if row_value is not None:
+                        ids_by_value.setdefault(row_value, set()).add(
+                            row.row_id
+                        )
+                self._value_ids[column] = ids_by_value
+            return set(ids_by_value.get(value, ()))
 
     def set_metadata(self, key: str, value: Any):
         """Store metadata about the table"""
         with self.lock:
-            data = self._read_data()
-            data["metadata"][key] = value
-            self._write_data(data)
+            self._metadata[key] = value
+            self._append([{"op": "m", "k": key, "v": value}])
 
     def get_metadata(self, key: str, default=None) -> Any:
         """Retrieve metadata"""
+        with self.lock.reader:
+            return self._metadata.get(key, default)
+
+    def _sync_loop(self):
+        """Background group commit for the "batch" sync policy"""
+        interval = self.commit_interval_ms / 1000
+        while not self._stop_sync.wait(interval):
+            with self.lock.reader:
+                if self._unsynced and self._log is not None:
+                    self._log.flush()
+                    os.fsync(self._log.fileno())
+                self._unsynced = False
+
+    def _stop_sync_thread(self):
+        """Stop the group commit thread (call without holding the lock)"""
+        if self._sync_thread is not None:
+            self._stop_sync.set()
+            self._sync_thread.join()
+            self._sync_thread = None
+            self._stop_sync.clear()
+
+    def begin_batch(self):
+        """Defer handing log records to the OS until end_batch()"""
+        with self.lock:
+            self._batch_depth += 1
+
+    def end_batch(self):
+        """End a batch; the outermost one flushes (and fsyncs) once"""
+        with self.lock:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._log is not None:
+                self._flush_log()
+
+    def commit(self):
+        """Hand buffered log records to the OS (see autocommit)"""
+        with self.lock.reader:
+            if self._log is not None:
+                self._log.flush()
+
+    def sync(self):
+        """Force logged changes through to the disk"""
+        with self.lock.reader:
+            if self._log is not None:
+                self._log.flush()
+                os.fsync(self._log.fileno())
+
+    def close(self):
+        """Fold pending changes into the snapshot and release the log"""
+        self._stop_sync_thread()
         with self.lock:
-            data = self._read_data()
-            return data.get("metadata", {}).get(key, default)
+            if self._log_records:
+                self._compact()
+
+    def __del__(self):
+        # Flush whatever is still buffered; __init__ may not have finished
+        log = getattr(self, "_log", None)
+        if log is not None:
+            log.close()
 
     def drop(self):
-        """Delete the table file"""
+        """Delete the table files"""
+        self._stop_sync_thread()
         with self.lock:
-            if self.file_path.exists():
-                self.file_path.unlink()
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            for path in (self.file_path, self.log_path):
+                if path.exists():
+                    path.unlink()
+            self._rows.clear()
+            self._value_ids.clear()
 
 
 class Storage:
     """Main storage manager for all tables"""
 
-    def __init__(self, data_dir: str = "data"):
+    def __init__(
+        self,
+        data_dir: str = "data",
+        autocommit: bool = True,
+        sync: str = "none",
+        commit_interval_ms: int = COMMIT_INTERVAL_MS,
+    ):
+        if sync not in SYNC_POLICIES:
+            raise ValueError(f"Unknown sync policy: {sync}")
+
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.autocommit = autocommit
+        self.sync_policy = sync
+        self.commit_interval_ms = commit_interval_ms
         self._tables: Dict[str, TableStorage] = {}
+        self._batch_depth = 0
 
     def get_table(self, table_name: str) -> TableStorage:
         """Get or create a table storage"""
         if table_name not in self._tables:
-            self._tables[table_name] = TableStorage(table_name, self.data_dir)
+            table = TableStorage(
+                table_name,
+                self.data_dir,
+                self.autocommit,
+                self.sync_policy,
+                self.commit_interval_ms,
+            )
+            if self._batch_depth:
+                table.begin_batch()  # Joins the batch in progress
+            self._tables[table_name] = table
         return self._tables[table_name]
 
+    def begin_batch(self):
+        """
+        Start a batch across all tables: each table's writes are handed
+        to the OS (and fsynced under the "always" policy) once, when the
+        outermost batch ends
+        """
+        self._batch_depth += 1
+        if self._batch_depth == 1:
+            for table in self._tables.values():
+                table.begin_batch()
+
+    def end_batch(self):
+        """End a batch started with begin_batch()"""
+        self._batch_depth -= 1
+        if not self._batch_depth:
+            for table in self._tables.values():
+                table.end_batch()
+
+    @contextmanager
+    def batch(self) -> Iterator["Storage"]:
+        """begin_batch() / end_batch() as a context manager"""
+        self.begin_batch()
+        try:
+            yield self
+        finally:
+            self.end_batch()
+
+    def commit(self):
+        """Hand every table's buffered log records to the OS"""
+        for table in self._tables.values():
+            table.commit()
+
     def table_exists(self, table_name: str) -> bool:
         """Check if a table exists"""
         file_path = self.data_dir / f"{table_name}.json"
@@ -210,7 +690,15 @@ class Storage:
 
     def list_tables(self) -> List[str]:
         """List all table names"""
-        return [f.stem for f in self.data_dir.glob("*.json")]
+        # scandir reports the entry type from the directory listing, so
+        # no per-file stat or Path objects are needed
+        with os.scandir(self.data_dir) as entries:
+            return [
+                entry.name[:-5]
+                for entry in entries
+                if entry.name.endswith(".json")
+                and entry.is_file(follow_symlinks=False)
+            ]
 
     def drop_table(self, table_name: str):
         """Drop a table"""
@@ -221,6 +709,11 @@ class Storage:
             table = TableStorage(table_name, self.data_dir)
             table.drop()
 
+    def close(self):
+        """Compact and close every open table"""
+        for table in self._tables.values():
+            table.close()
+
     def clear_all(self):
         """Clear all tables (use with caution!)"""
         for table_name in list(self._tables.keys()):
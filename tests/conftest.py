@@ -0,0 +1,54 @@
+"""
+Shared pytest fixtures
+Every test runs inside its own tmp_path, so relative data directories
+never collide and the suite can run in parallel:
+pytest tests/ -n auto
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from simpldb.database import Database
+from simpldb.parser import SQLParser
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "parser: SQL parser tests that touch no disk state"
+    )
+
+
+@pytest.fixture(autouse=True)
+def _in_tmp_path(tmp_path, monkeypatch):
+    """Run each test with its tmp_path as the working directory"""
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture(scope="session")
+def sql_parser():
+    """One parser, and its statement cache, for the whole run"""
+    return SQLParser()
+
+
+@pytest.fixture(scope="module")
+def shared_db(tmp_path_factory):
+    """One database per test module, opened and closed once"""
+    database = Database(
+        data_dir=str(tmp_path_factory.mktemp("db")),
+        in_memory=True,
+        durability="none",
+    )
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def db(shared_db):
+    """The module's database, emptied again after each test"""
+    yield shared_db
+    for table_name in shared_db.list_tables():
+        shared_db.execute(f"DROP TABLE {table_name}")
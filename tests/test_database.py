@@ -1,66 +1,71 @@
 """
 Unit tests for Database Core
-Run with: python tests/test_database.py
+Run with: python -m pytest tests/test_database.py
 """
 
-import sys
-import os
-import shutil
+import io
+import json
 from pathlib import Path
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 from simpldb.database import Database, DatabaseCatalog
 
 
-def cleanup():
-    """Clean up test data"""
-    test_dir = Path("test_db_data")
-    if test_dir.exists():
-        shutil.rmtree(test_dir)
+def setup_users(db, rows, *extra):
+    """Create and fill the users table (plus any extra SQL) in one batch"""
+    sqls = [
+        "CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100), age INTEGER)"
+    ]
+    sqls += [
+        f"INSERT INTO users (id, name, age) VALUES ({id_}, '{name}', {age})"
+        for id_, name, age in rows
+    ]
+    sqls += extra
+    results = db.execute_many(sqls)
+    assert all(r.success for r in results)
+    return results
 
 
-def test_database_creation():
+def test_database_creation(tmp_path):
     """Test database initialization"""
-    print("Testing database creation...")
-    
-    cleanup()
-    db = Database(name="testdb", data_dir="test_db_data")
+    db = Database(name="testdb", data_dir=str(tmp_path / "disk"))
     
     assert db.name == "testdb"
     assert db.data_dir.exists()
     assert db.catalog.catalog_file.exists()
-    
     db.close()
-    cleanup()
-    print("✅ Database creation test passed")
-
-
-def test_execute_create_table():
-    """Test CREATE TABLE via Database.execute()"""
-    print("\nTesting CREATE TABLE execution...")
-    
-    cleanup()
-    db = Database(data_dir="test_db_data")
     
+    # In-memory catalogs never touch catalog.json
+    mem = Database(data_dir=str(tmp_path / "mem"), in_memory=True)
+    mem.execute("CREATE TABLE users (id INTEGER PRIMARY KEY)")
+    assert "users" in mem.catalog.get_all_tables()
+    assert not mem.catalog.catalog_file.exists()
+    mem.close()
+    
+    # Durability levels map onto the storage sync policies
+    full = Database(data_dir=str(tmp_path / "full"), durability="full")
+    assert full.storage.sync_policy == "always"
+    assert full.catalog.fsync
+    full.execute("CREATE TABLE users (id INTEGER PRIMARY KEY)")
+    assert full.execute("INSERT INTO users (id) VALUES (1)").success
+    full.close()
+    try:
+        Database(data_dir=str(tmp_path / "bad"), durability="paranoid")
+        assert False, "Should have raised ValueError"
+    except ValueError as e:
+        assert "durability" in str(e)
+
+
+def test_execute_create_table(db):
+    """Test CREATE TABLE via Database.execute()"""
     sql = "CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100))"
     result = db.execute(sql)
     
     assert result.success
-    assert "users" in db.list_tables()
-    
-    db.close()
-    cleanup()
-    print("✅ CREATE TABLE execution test passed")
+    assert db.has_table("users")
 
 
-def test_execute_insert_select():
+def test_execute_insert_select(db):
     """Test INSERT and SELECT"""
-    print("\nTesting INSERT and SELECT...")
-    
-    cleanup()
-    db = Database(data_dir="test_db_data")
-    
     # Create table
     db.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100), age INTEGER)")
     
@@ -74,23 +79,12 @@ def test_execute_insert_select():
     assert result.success
     assert len(result.rows) == 1
     assert result.rows[0]['name'] == 'Alice'
-    
-    db.close()
-    cleanup()
-    print("✅ INSERT and SELECT test passed")
 
 
-def test_execute_update_delete():
+def test_execute_update_delete(db):
     """Test UPDATE and DELETE"""
-    print("\nTesting UPDATE and DELETE...")
-    
-    cleanup()
-    db = Database(data_dir="test_db_data")
-    
     # Setup
-    db.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100), age INTEGER)")
-    db.execute("INSERT INTO users (id, name, age) VALUES (1, 'Alice', 30)")
-    db.execute("INSERT INTO users (id, name, age) VALUES (2, 'Bob', 25)")
+    setup_users(db, [(1, 'Alice', 30), (2, 'Bob', 25)])
     
     # Update
     result = db.execute("UPDATE users SET age = 31 WHERE id = 1")
@@ -109,19 +103,10 @@ def test_execute_update_delete():
     # Verify delete
     result = db.execute("SELECT * FROM users")
     assert len(result.rows) == 1
-    
-    db.close()
-    cleanup()
-    print("✅ UPDATE and DELETE test passed")
 
 
-def test_execute_many():
+def test_execute_many(db):
     """Test execute_many()"""
-    print("\nTesting execute_many...")
-    
-    cleanup()
-    db = Database(data_dir="test_db_data")
-    
     sqls = [
         "CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100))",
         "INSERT INTO users (id, name) VALUES (1, 'Alice')",
@@ -137,19 +122,24 @@ def test_execute_many():
     # Verify
     result = db.execute("SELECT * FROM users")
     assert len(result.rows) == 3
+    tx = db.transactions[max(db.transactions)]
+    assert not tx.is_active
     
-    db.close()
-    cleanup()
-    print("✅ execute_many test passed")
+    # Index and catalog writes are deferred to the end of the batch
+    assert db.index_manager._deferred is None
+    assert db.index_manager._get_index_file("users").exists()
+    
+    # The batch stops at the first failing query
+    results = db.execute_many([
+        "INSERT INTO users (id, name) VALUES (4, 'Dan')",
+        "INSERT INTO users (id, name) VALUES (4, 'Dan')",
+        "INSERT INTO users (id, name) VALUES (5, 'Eve')",
+    ])
+    assert [r.success for r in results] == [True, False]
 
 
-def test_list_tables():
+def test_list_tables(db):
     """Test list_tables()"""
-    print("\nTesting list_tables...")
-    
-    cleanup()
-    db = Database(data_dir="test_db_data")
-    
     # Initially empty
     assert len(db.list_tables()) == 0
     
@@ -161,19 +151,10 @@ def test_list_tables():
     assert len(tables) == 2
     assert "users" in tables
     assert "posts" in tables
-    
-    db.close()
-    cleanup()
-    print("✅ list_tables test passed")
 
 
-def test_describe_table():
+def test_describe_table(db):
     """Test describe_table()"""
-    print("\nTesting describe_table...")
-    
-    cleanup()
-    db = Database(data_dir="test_db_data")
-    
     db.execute("""
         CREATE TABLE users (
             id INTEGER PRIMARY KEY,
@@ -190,26 +171,27 @@ def test_describe_table():
     assert info['columns'][0]['name'] == 'id'
     assert 'PRIMARY_KEY' in info['columns'][0]['constraints']
     
+    # Column details are reused until DDL changes the catalog
+    assert db.describe_table("users")['columns'] is info['columns']
+    assert 'columns' not in db.catalog.get_table_info("users")
+    db.execute("INSERT INTO users (id, name, age) VALUES (1, 'Alice', 30)")
+    assert db.describe_table("users")['row_count'] == 1
+    db.execute("CREATE INDEX idx_age ON users(age)")
+    info = db.describe_table("users")
+    assert [idx['column'] for idx in info['indexes']] == ['age']
+    
     # Non-existent table
     info = db.describe_table("nonexistent")
     assert info is None
-    
-    db.close()
-    cleanup()
-    print("✅ describe_table test passed")
 
 
-def test_table_stats():
+def test_table_stats(db):
     """Test get_table_stats()"""
-    print("\nTesting get_table_stats...")
-    
-    cleanup()
-    db = Database(data_dir="test_db_data")
-    
-    db.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100))")
-    db.execute("INSERT INTO users (id, name) VALUES (1, 'Alice')")
-    db.execute("INSERT INTO users (id, name) VALUES (2, 'Bob')")
-    db.execute("CREATE INDEX idx_name ON users(name)")
+    setup_users(
+        db,
+        [(1, 'Alice', 30), (2, 'Bob', 25)],
+        "CREATE INDEX idx_name ON users(name)",
+    )
     
     stats = db.get_table_stats("users")
     
@@ -218,51 +200,44 @@ def test_table_stats():
     assert stats['row_count'] == 2
     assert len(stats['indexes']) == 2  # id (primary key) and name
     
-    db.close()
-    cleanup()
-    print("✅ get_table_stats test passed")
+    all_stats = db.get_all_table_stats()
+    assert list(all_stats) == ['users']
+    assert all_stats['users']['row_count'] == 2
 
 
-def test_database_info():
+def test_database_info(tmp_path):
     """Test get_database_info()"""
-    print("\nTesting get_database_info...")
-    
-    cleanup()
-    db = Database(name="testdb", data_dir="test_db_data")
+    db = Database(name="testdb", data_dir=str(tmp_path), in_memory=True)
     
-    db.execute("CREATE TABLE users (id INTEGER PRIMARY KEY)")
-    db.execute("CREATE TABLE posts (id INTEGER PRIMARY KEY)")
-    db.execute("INSERT INTO users (id) VALUES (1)")
-    db.execute("INSERT INTO posts (id) VALUES (1)")
+    setup_users(
+        db,
+        [(1, 'Alice', 30)],
+        "CREATE TABLE posts (id INTEGER PRIMARY KEY)",
+        "INSERT INTO posts (id) VALUES (1)",
+    )
     
     info = db.get_database_info()
     
     assert info['name'] == 'testdb'
     assert info['total_tables'] == 2
     assert info['total_rows'] == 2
-    
     db.close()
-    cleanup()
-    print("✅ get_database_info test passed")
 
 
-def test_catalog_persistence():
+def test_catalog_persistence(tmp_path):
     """Test catalog persistence across sessions"""
-    print("\nTesting catalog persistence...")
-    
-    cleanup()
+    data_dir = str(tmp_path / "persist")
     
     # Create database and table
-    db1 = Database(data_dir="test_db_data")
-    db1.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100))")
-    db1.execute("INSERT INTO users (id, name) VALUES (1, 'Alice')")
+    db1 = Database(data_dir=data_dir)
+    setup_users(db1, [(1, 'Alice', 30)])
     db1.close()
     
     # Open new database instance
-    db2 = Database(data_dir="test_db_data")
+    db2 = Database(data_dir=data_dir)
     
     # Check that schema was loaded
-    assert "users" in db2.list_tables()
+    assert db2.has_table("users")
     
     # Check that data persists
     result = db2.execute("SELECT * FROM users")
@@ -270,17 +245,83 @@ def test_catalog_persistence():
     assert result.rows[0]['name'] == 'Alice'
     
     db2.close()
-    cleanup()
-    print("✅ Catalog persistence test passed")
 
 
-def test_transactions():
-    """Test basic transaction management"""
-    print("\nTesting transactions...")
+def test_data_dir_lock(tmp_path):
+    """Test that only one Database at a time uses a data directory"""
+    data_dir = str(tmp_path / "locked")
+    db1 = Database(data_dir=data_dir)
+    setup_users(db1, [(1, 'Alice', 30)])
     
-    cleanup()
-    db = Database(data_dir="test_db_data")
+    # A second instance would work from stale in-memory rows, so it is
+    # refused instead of silently losing writes
+    try:
+        Database(data_dir=data_dir)
+        assert False, "Should have raised RuntimeError"
+    except RuntimeError as e:
+        assert "in use" in str(e)
     
+    db1.close()
+    db2 = Database(data_dir=data_dir)
+    assert len(db2.execute("SELECT * FROM users").rows) == 1
+    db2.close()
+
+
+def test_catalog_wal(tmp_path):
+    """Test catalog changes are logged and replayed"""
+    data_dir = str(tmp_path / "wal")
+    db1 = Database(data_dir=data_dir)
+    setup_users(db1, [(1, 'Alice', 30)], "CREATE INDEX idx_age ON users(age)")
+    db1.catalog.set_metadata("owner", "alice")
+    db1.catalog.set_metadata_bulk({"env": "test", "owner": "bob"})
+    
+    # Changes are in the WAL, not yet in catalog.json
+    assert db1.catalog.wal_file.exists()
+    with open(db1.catalog.catalog_file) as f:
+        assert json.load(f)["tables"] == {}
+    
+    # A new instance replays the WAL (db1 was never closed; dropping its
+    # directory lock stands in for its process exiting)
+    db1._lock_file.close()
+    db2 = Database(data_dir=data_dir)
+    assert db2.list_tables() == ["users"]
+    assert db2.catalog.get_table_info("users")["row_count"] == 1
+    assert "users.age" in db2.catalog.get_all_indexes()
+    assert db2.catalog.get_metadata("owner") == "bob"
+    assert db2.catalog.get_metadata("env") == "test"
+    assert not db2.catalog.wal_file.exists()
+    
+    # A torn final record is ignored
+    db2.execute("DROP TABLE users")
+    with open(db2.catalog.wal_file, "ab") as f:
+        f.write(b'{"op": "t", "n": "posts"')
+    db2._lock_file.close()
+    db3 = Database(data_dir=data_dir)
+    assert db3.list_tables() == []
+    assert db3.catalog.get_all_indexes() == {}
+    db3.close()
+
+
+def test_catalog_corrupt(tmp_path):
+    """Test an unreadable catalog.json does not discard the WAL"""
+    data_dir = str(tmp_path / "corrupt")
+    db1 = Database(data_dir=data_dir)
+    setup_users(db1, [(1, 'Alice', 30)])
+    db1._lock_file.close()
+    with open(db1.catalog.catalog_file, "wb") as f:
+        f.write(b'{"version": "0.1')
+    
+    db2 = Database(data_dir=data_dir)
+    assert db2.list_tables() == ["users"]
+    assert db2.catalog.get_table_info("users")["row_count"] == 1
+    # Checkpoints are written beside catalog.json and moved into place
+    assert not db2.catalog.wal_file.exists()
+    assert not (tmp_path / "corrupt" / "catalog.json.tmp").exists()
+    db2.close()
+
+
+def test_transactions(db):
+    """Test basic transaction management"""
     # Begin transaction
     tx_id = db.begin_transaction()
     assert tx_id > 0
@@ -296,66 +337,68 @@ def test_transactions():
     success = db.rollback_transaction(tx_id2)
     assert success
     assert not db.transactions[tx_id2].is_active
-    
-    db.close()
-    cleanup()
-    print("✅ Transactions test passed")
 
 
-def test_schema_export_import():
+def test_schema_export_import(db, tmp_path):
     """Test schema export and import"""
-    print("\nTesting schema export/import...")
-    
-    cleanup()
-    db = Database(data_dir="test_db_data")
-    
     # Create schema
-    db.execute("""
-        CREATE TABLE users (
-            id INTEGER PRIMARY KEY,
-            name VARCHAR(100) NOT NULL,
-            age INTEGER
-        )
-    """)
-    db.execute("CREATE INDEX idx_age ON users(age)")
+    setup_users(db, [], "CREATE INDEX idx_age ON users(age)")
     
     # Export schema
-    export_file = "test_db_data/test_schema.json"
+    export_file = str(tmp_path / "test_schema.json")
     db.export_schema(export_file)
     
     assert Path(export_file).exists()
+    with open(export_file) as f:
+        exported = json.load(f)
+    assert [t["schema"]["table_name"] for t in exported["tables"]] == ["users"]
+    
+    # Unchanged tables are re-exported from the previous export's text
+    db.export_schema(export_file)
+    with open(export_file) as f:
+        assert json.load(f)["tables"] == exported["tables"]
+    db.execute("INSERT INTO users (id, name, age) VALUES (1, 'Alice', 30)")
+    db.export_schema(export_file)
+    with open(export_file) as f:
+        assert json.load(f)["tables"][0]["row_count"] == 1
     
     # Drop table
     db.execute("DROP TABLE users")
-    assert "users" not in db.list_tables()
+    assert not db.has_table("users")
     
     # Import schema
     results = db.import_schema(export_file)
     
     assert all(r.success for r in results)
-    assert "users" in db.list_tables()
+    assert db.has_table("users")
     
     # Verify structure
     info = db.describe_table("users")
     assert len(info['columns']) == 3
+
+    # Streaming import yields one result per table
+    db.execute("DROP TABLE users")
+    results = db.iter_import_schema(export_file)
+    assert next(results).success
+    assert next(results, None) is None
     
-    db.close()
-    cleanup()
-    print("✅ Schema export/import test passed")
+    # File objects round-trip without touching the filesystem
+    buffer = io.StringIO()
+    db.export_schema(buffer)
+    db.execute("DROP TABLE users")
+    buffer.seek(0)
+    assert all(r.success for r in db.import_schema(buffer))
+    assert db.has_table("users")
 
 
-def test_catalog_operations():
+def test_catalog_operations(db):
     """Test catalog operations"""
-    print("\nTesting catalog operations...")
-    
-    cleanup()
-    db = Database(data_dir="test_db_data")
-    
     # Create table
     db.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100))")
     
     # Check catalog
-    assert "users" in db.catalog.get_all_tables()
+    assert db.catalog.has_table("users")
+    assert not db.catalog.has_table("posts")
     
     table_info = db.catalog.get_table_info("users")
     assert table_info is not None
@@ -371,18 +414,14 @@ def test_catalog_operations():
     db.catalog.set_metadata("custom_key", "custom_value")
     assert db.catalog.get_metadata("custom_key") == "custom_value"
     
-    db.close()
-    cleanup()
-    print("✅ Catalog operations test passed")
+    db.catalog.set_metadata_bulk({"owner": "alice", "env": "test"})
+    assert db.catalog.get_metadata("owner") == "alice"
+    assert db.catalog.get_metadata("env") == "test"
+    assert db.catalog.get_metadata("custom_key") == "custom_value"
 
 
-def test_error_handling():
+def test_error_handling(db):
     """Test error handling"""
-    print("\nTesting error handling...")
-    
-    cleanup()
-    db = Database(data_dir="test_db_data")
-    
     # Invalid SQL
     result = db.execute("INVALID SQL QUERY")
     assert not result.success
@@ -395,37 +434,4 @@ def test_error_handling():
     db.execute("CREATE TABLE users (id INTEGER PRIMARY KEY)")
     result = db.execute("CREATE TABLE users (id INTEGER PRIMARY KEY)")
     assert not result.success
-    
-    db.close()
-    cleanup()
-    print("✅ Error handling test passed")
-
-
-def run_all_tests():
-    """Run all database tests"""
-    print("=" * 70)
-    print("Running Database Core Tests")
-    print("=" * 70)
-    
-    test_database_creation()
-    test_execute_create_table()
-    test_execute_insert_select()
-    test_execute_update_delete()
-    test_execute_many()
-    test_list_tables()
-    test_describe_table()
-    test_table_stats()
-    test_database_info()
-    test_catalog_persistence()
-    test_transactions()
-    test_schema_export_import()
-    test_catalog_operations()
-    test_error_handling()
-    
-    print("\n" + "=" * 70)
-    print("✅ All database core tests passed!")
-    print("=" * 70)
-
-
-if __name__ == "__main__":
-    run_all_tests()
\ No newline at end of file
+
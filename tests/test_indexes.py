@@ -1,30 +1,16 @@
 """
 Unit tests for the Index Manager
-Run with: python tests/test_indexes.py
+Run with: python -m pytest tests/test_indexes.py
 """
 
-import sys
-import os
-import shutil
-from pathlib import Path
-
-# Add parent directory to path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import random
+from collections import defaultdict
 
 from simpldb.indexes import BTreeNode, Index, IndexManager
 
 
-def cleanup():
-    """Clean up test data"""
-    test_dir = Path("test_index_data")
-    if test_dir.exists():
-        shutil.rmtree(test_dir)
-
-
 def test_btree_node():
     """Test BTreeNode operations"""
-    print("Testing BTreeNode...")
-    
     node = BTreeNode()
     
     # Insert values
@@ -53,39 +39,39 @@ def test_btree_node():
     node.delete(3)
     results = node.search(3)
     assert results == []
-    
-    print("✅ BTreeNode test passed")
 
 
 def test_btree_range_search():
     """Test range search in BTreeNode"""
-    print("\nTesting BTreeNode range search...")
-    
     node = BTreeNode()
     
-    # Insert values
-    for i in range(10):
-        node.insert(i, i)
+    # Load values
+    assert node.bulk_load([(i, i) for i in range(10)]) == []
     
     # Range search [3, 7]
     results = node.range_search(3, 7)
-    assert sorted(results) == [3, 4, 5, 6, 7]
+    assert results == [3, 4, 5, 6, 7]
     
     # Range search [3, 7)
     results = node.range_search(3, 7, include_end=False)
-    assert sorted(results) == [3, 4, 5, 6]
+    assert results == [3, 4, 5, 6]
     
     # Range search (3, 7]
     results = node.range_search(3, 7, include_start=False)
-    assert sorted(results) == [4, 5, 6, 7]
+    assert results == [4, 5, 6, 7]
     
-    print("✅ BTreeNode range search test passed")
+    # (3, 7), empty and out-of-order inserts
+    results = node.range_search(3, 7, include_start=False, include_end=False)
+    assert results == [4, 5, 6]
+    assert node.range_search(7, 3) == []
+    node.insert(4.5, 10)
+    node.insert(-1, 11)
+    assert node.keys == [-1, 0, 1, 2, 3, 4, 4.5, 5, 6, 7, 8, 9]
+    assert node.range_search(4, 5, include_start=False) == [10, 5]
 
 
 def test_index_basic():
     """Test basic Index operations"""
-    print("\nTesting Index basic operations...")
-    
     idx = Index("users", "email", unique=True)
     
     # Insert
@@ -116,14 +102,51 @@ def test_index_basic():
     idx.delete("bob@example.com", 2)
     results = idx.search("bob@example.com")
     assert results == []
-    
-    print("✅ Index basic operations test passed")
+
+
+def test_index_properties():
+    """Test Index against a dict oracle on random workloads"""
+    rng = random.Random(1234)
+    for _ in range(200):
+        pairs = [
+            (rng.randint(-20, 20), rng.randint(0, 50))
+            for _ in range(rng.randint(0, 50))
+        ]
+        oracle = defaultdict(list)
+        for key, row_id in pairs:
+            if row_id not in oracle[key]:
+                oracle[key].append(row_id)
+        
+        # Incremental inserts and a bulk load must agree with the oracle
+        inserted = Index("t", "c", unique=False)
+        for key, row_id in pairs:
+            inserted.insert(key, row_id)
+        loaded = Index("t", "c", unique=False)
+        loaded.bulk_load(pairs)
+        
+        for key in range(-21, 22):
+            expected = oracle.get(key, [])
+            assert inserted.search(key) == expected
+            assert loaded.search(key) == expected
+        
+        for _ in range(3):
+            lo, hi = sorted(rng.randint(-22, 22) for _ in range(2))
+            include_start = rng.random() < 0.5
+            include_end = rng.random() < 0.5
+            expected = []
+            for key in sorted(oracle):
+                if (lo < key or (include_start and key == lo)) and (
+                    key < hi or (include_end and key == hi)
+                ):
+                    expected.extend(oracle[key])
+            for idx in (inserted, loaded):
+                assert idx.range_search(
+                    lo, hi, include_start, include_end
+                ) == expected
 
 
 def test_index_unique_constraint():
     """Test unique constraint in Index"""
-    print("\nTesting Index unique constraint...")
-    
     idx = Index("users", "username", unique=True)
     
     # Insert first value
@@ -145,40 +168,83 @@ def test_index_unique_constraint():
     
     results = non_unique_idx.search(30)
     assert 1 in results and 2 in results
-    
-    print("✅ Index unique constraint test passed")
 
 
 def test_index_range_search():
     """Test range search in Index"""
-    print("\nTesting Index range search...")
-    
     idx = Index("products", "price", unique=False)
     
-    # Insert prices
+    # Load prices
     prices = [(10.0, 1), (15.0, 2), (20.0, 3), (25.0, 4), (30.0, 5)]
-    for price, row_id in prices:
-        idx.insert(price, row_id)
+    idx.bulk_load(prices)
     
     # Range search [15, 25]
     results = idx.range_search(15.0, 25.0)
-    assert sorted(results) == [2, 3, 4]
+    assert results == [2, 3, 4]
     
     # Range search [15, 25)
     results = idx.range_search(15.0, 25.0, include_end=False)
-    assert sorted(results) == [2, 3]
+    assert results == [2, 3]
+    
+    # Range search (15, 25]
+    results = idx.range_search(15.0, 25.0, include_start=False)
+    assert results == [3, 4]
+    
+    # Open-ended ranges
+    results = idx.range_search(25.0)
+    assert results == [4, 5]
+    results = idx.range_search(None, 15.0, include_end=False)
+    assert results == [1]
     
     # All values
     results = idx.range_search()
-    assert sorted(results) == [1, 2, 3, 4, 5]
+    assert results == [1, 2, 3, 4, 5]
+
+
+def test_index_insert_delete():
+    """Test interleaved writes on a non-unique index"""
+    idx = Index("users", "age", unique=False)
+    
+    idx.insert(30, 1)
+    idx.insert(30, 2)
+    idx.delete(30, 1)
+    assert idx.search(30) == [2]
+    
+    # Deleting a whole key
+    idx.insert(40, 3)
+    idx.delete(40)
+    assert idx.search(40) == []
+    
+    for i in range(512):
+        idx.insert(i % 10, 100 + i)
+    
+    results = idx.search(5)
+    assert len(results) == 512 // 10
+    assert idx.get_stats()['total_entries'] == 512 + 1
+
+
+def test_index_bulk_load():
+    """Test loading an index from unsorted (key, row_id) pairs"""
+    idx = Index("users", "age", unique=False)
+    idx.insert(99, 100)  # Replaced by the load
+    rejected = idx.bulk_load([(30, 1), (25, 2), (30, 3), (25, 2), (40, 4)])
     
-    print("✅ Index range search test passed")
+    assert rejected == []
+    assert idx.root.keys == [25, 30, 40]
+    assert idx.root.values == [[2], [1, 3], [4]]
+    assert idx.search(99) == []
+    
+    # Unique indexes keep the first row for each key
+    idx = Index("users", "email", unique=True)
+    rejected = idx.bulk_load([("b", 1), ("a", 2), ("b", 3)])
+    
+    assert idx.search("b") == [1]
+    assert [row_id for row_id, _ in rejected] == [3]
+    assert "Unique constraint violation" in rejected[0][1]
 
 
 def test_index_stats():
     """Test index statistics"""
-    print("\nTesting Index statistics...")
-    
     idx = Index("users", "age", unique=False)
     
     idx.insert(30, 1)
@@ -192,14 +258,10 @@ def test_index_stats():
     assert stats['unique'] == False
     assert stats['distinct_keys'] == 2  # 25 and 30
     assert stats['total_entries'] == 3  # 3 row_ids total
-    
-    print("✅ Index statistics test passed")
 
 
 def test_index_serialization():
     """Test index serialization"""
-    print("\nTesting Index serialization...")
-    
     idx = Index("users", "email", unique=True)
     idx.insert("alice@example.com", 1)
     idx.insert("bob@example.com", 2)
@@ -216,16 +278,11 @@ def test_index_serialization():
     
     results = restored.search("alice@example.com")
     assert results == [1]
-    
-    print("✅ Index serialization test passed")
 
 
-def test_index_manager():
+def test_index_manager(tmp_path):
     """Test IndexManager"""
-    print("\nTesting IndexManager...")
-    
-    cleanup()
-    manager = IndexManager("test_index_data")
+    manager = IndexManager(str(tmp_path))
     
     # Create indexes
     idx1 = manager.create_index("users", "id", unique=True)
@@ -249,17 +306,11 @@ def test_index_manager():
         assert False, "Should have raised ValueError"
     except ValueError as e:
         assert "already exists" in str(e)
-    
-    cleanup()
-    print("✅ IndexManager test passed")
 
 
-def test_index_manager_insert():
+def test_index_manager_insert(tmp_path):
     """Test IndexManager insert operations"""
-    print("\nTesting IndexManager insert operations...")
-    
-    cleanup()
-    manager = IndexManager("test_index_data")
+    manager = IndexManager(str(tmp_path))
     
     manager.create_index("users", "id", unique=True)
     manager.create_index("users", "email", unique=True)
@@ -285,17 +336,11 @@ def test_index_manager_insert():
     id_idx = manager.get_index("users", "id")
     results = id_idx.search(2)
     assert results == []
-    
-    cleanup()
-    print("✅ IndexManager insert test passed")
 
 
-def test_index_manager_update():
+def test_index_manager_update(tmp_path):
     """Test IndexManager update operations"""
-    print("\nTesting IndexManager update operations...")
-    
-    cleanup()
-    manager = IndexManager("test_index_data")
+    manager = IndexManager(str(tmp_path))
     
     manager.create_index("users", "id", unique=True)
     manager.create_index("users", "email", unique=True)
@@ -325,17 +370,11 @@ def test_index_manager_update():
     
     # Verify rollback - bob's email should still be indexed
     assert email_idx.search("bob@example.com") == [2]
-    
-    cleanup()
-    print("✅ IndexManager update test passed")
 
 
-def test_index_manager_delete():
+def test_index_manager_delete(tmp_path):
     """Test IndexManager delete operations"""
-    print("\nTesting IndexManager delete operations...")
-    
-    cleanup()
-    manager = IndexManager("test_index_data")
+    manager = IndexManager(str(tmp_path))
     
     manager.create_index("users", "id", unique=True)
     manager.create_index("users", "email", unique=True)
@@ -352,17 +391,11 @@ def test_index_manager_delete():
     
     id_idx = manager.get_index("users", "id")
     assert id_idx.search(1) == []
-    
-    cleanup()
-    print("✅ IndexManager delete test passed")
 
 
-def test_index_manager_rebuild():
+def test_index_manager_rebuild(tmp_path):
     """Test index rebuilding"""
-    print("\nTesting index rebuild...")
-    
-    cleanup()
-    manager = IndexManager("test_index_data")
+    manager = IndexManager(str(tmp_path))
     
     manager.create_index("users", "age", unique=False)
     
@@ -380,42 +413,43 @@ def test_index_manager_rebuild():
     # Verify
     age_idx = manager.get_index("users", "age")
     results = age_idx.search(30)
-    assert sorted(results) == [1, 3]
+    assert results == [1, 3]
     
-    cleanup()
-    print("✅ Index rebuild test passed")
+    # Parallel arrays give the same index as row dicts
+    row_ids = list(range(1, 10001))
+    ages = [(row_id * 7919) % 97 for row_id in row_ids]
+    rows = [
+        {"row_id": row_id, "data": {"age": age}}
+        for row_id, age in zip(row_ids, ages)
+    ]
+    assert manager.rebuild_index("users", "age", rows)
+    from_rows = age_idx.to_dict()["root"]
+    assert manager.rebuild_index_from_arrays("users", "age", row_ids, ages)
+    assert age_idx.to_dict()["root"] == from_rows
+    assert len(age_idx.root.keys) == 97
+    assert not manager.rebuild_index_from_arrays("users", "name", [], [])
 
 
-def test_index_manager_persistence():
+def test_index_manager_persistence(tmp_path):
     """Test index persistence"""
-    print("\nTesting index persistence...")
-    
-    cleanup()
-    
     # Create manager and indexes
-    manager1 = IndexManager("test_index_data")
+    manager1 = IndexManager(str(tmp_path))
     manager1.create_index("users", "email", unique=True)
     manager1.insert_into_indexes("users", 1, {"email": "alice@example.com"})
     
     # Create new manager instance (loads from disk)
-    manager2 = IndexManager("test_index_data")
+    manager2 = IndexManager(str(tmp_path))
     
     # Verify data was persisted
     assert manager2.has_index("users", "email")
     email_idx = manager2.get_index("users", "email")
     results = email_idx.search("alice@example.com")
     assert results == [1]
-    
-    cleanup()
-    print("✅ Index persistence test passed")
 
 
-def test_index_manager_stats():
+def test_index_manager_stats(tmp_path):
     """Test index statistics"""
-    print("\nTesting index statistics...")
-    
-    cleanup()
-    manager = IndexManager("test_index_data")
+    manager = IndexManager(str(tmp_path))
     
     manager.create_index("users", "age", unique=False)
     manager.insert_into_indexes("users", 1, {"age": 30})
@@ -432,36 +466,4 @@ def test_index_manager_stats():
     assert age_stats["column"] == "age"
     assert age_stats["distinct_keys"] == 2
     assert age_stats["total_entries"] == 3
-    
-    cleanup()
-    print("✅ Index statistics test passed")
-
-
-def run_all_tests():
-    """Run all index tests"""
-    print("=" * 60)
-    print("Running Index Manager Tests")
-    print("=" * 60)
-    
-    test_btree_node()
-    test_btree_range_search()
-    test_index_basic()
-    test_index_unique_constraint()
-    test_index_range_search()
-    test_index_stats()
-    test_index_serialization()
-    test_index_manager()
-    test_index_manager_insert()
-    test_index_manager_update()
-    test_index_manager_delete()
-    test_index_manager_rebuild()
-    test_index_manager_persistence()
-    test_index_manager_stats()
-    
-    print("\n" + "=" * 60)
-    print("✅ All index tests passed!")
-    print("=" * 60)
-
-
-if __name__ == "__main__":
-    run_all_tests()
\ No newline at end of file
+
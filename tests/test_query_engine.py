@@ -1,180 +1,360 @@
 """
 Unit tests for SQL Parser and Query Executor
-Run with: python tests/test_query_engine.py
+Run with: python -m pytest tests/test_query_engine.py
+(parser tests only: python -m pytest tests/test_query_engine.py -m parser)
 """
 
 import sys
 import os
-import shutil
-from pathlib import Path
+
+import pytest
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from simpldb.parser import SQLParser, QueryType
+from simpldb.parser import SQLParser, QueryType, Operator
 from simpldb.executor import QueryExecutor
 
-
-def cleanup():
-    """Clean up test data"""
-    test_dir = Path("test_query_data")
-    if test_dir.exists():
-        shutil.rmtree(test_dir)
-
-
-def test_parse_create_table():
-    """Test CREATE TABLE parsing"""
-    print("Testing CREATE TABLE parsing...")
-    
-    parser = SQLParser()
-    
-    sql = "CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, age INTEGER)"
-    query = parser.parse(sql)
-    
-    assert query.query_type == QueryType.CREATE_TABLE
-    assert query.table_name == "users"
-    assert len(query.columns) == 3
-    
-    assert query.columns[0].name == "id"
-    assert query.columns[0].data_type == "INTEGER"
-    assert "PRIMARY_KEY" in query.columns[0].constraints
-    
-    assert query.columns[1].name == "name"
-    assert query.columns[1].data_type == "VARCHAR"
-    assert query.columns[1].max_length == 100
-    assert "NOT_NULL" in query.columns[1].constraints
-    
-    print("✅ CREATE TABLE parsing test passed")
-
-
-def test_parse_insert():
-    """Test INSERT parsing"""
-    print("\nTesting INSERT parsing...")
-    
-    parser = SQLParser()
-    
-    sql = "INSERT INTO users (id, name, age) VALUES (1, 'Alice', 30)"
-    query = parser.parse(sql)
-    
-    assert query.query_type == QueryType.INSERT
-    assert query.table_name == "users"
-    assert query.columns == ['id', 'name', 'age']
-    assert query.values == [1, 'Alice', 30]
-    
-    print("✅ INSERT parsing test passed")
-
-
-def test_parse_select():
-    """Test SELECT parsing"""
-    print("\nTesting SELECT parsing...")
-    
-    parser = SQLParser()
-    
-    # Simple SELECT
-    sql = "SELECT * FROM users"
-    query = parser.parse(sql)
-    assert query.query_type == QueryType.SELECT
-    assert query.table_name == "users"
-    assert query.columns == ['*']
-    
-    # SELECT with WHERE
-    sql = "SELECT name, age FROM users WHERE age > 25"
-    query = parser.parse(sql)
-    assert query.columns == ['name', 'age']
-    assert len(query.where) == 1
-    assert query.where[0].column == "age"
-    assert query.where[0].value == 25
-    
-    # SELECT with ORDER BY and LIMIT
-    sql = "SELECT * FROM users ORDER BY age DESC LIMIT 10"
-    query = parser.parse(sql)
-    assert query.order_by == [('age', 'DESC')]
-    assert query.limit == 10
-    
-    print("✅ SELECT parsing test passed")
-
-
-def test_parse_update():
-    """Test UPDATE parsing"""
-    print("\nTesting UPDATE parsing...")
-    
-    parser = SQLParser()
-    
-    sql = "UPDATE users SET age = 31, name = 'Bob' WHERE id = 1"
-    query = parser.parse(sql)
-    
-    assert query.query_type == QueryType.UPDATE
-    assert query.table_name == "users"
-    assert query.updates == {'age': 31, 'name': 'Bob'}
-    assert len(query.where) == 1
-    assert query.where[0].column == "id"
-    
-    print("✅ UPDATE parsing test passed")
-
-
-def test_parse_delete():
-    """Test DELETE parsing"""
-    print("\nTesting DELETE parsing...")
-    
-    parser = SQLParser()
-    
-    sql = "DELETE FROM users WHERE id = 1"
-    query = parser.parse(sql)
-    
-    assert query.query_type == QueryType.DELETE
-    assert query.table_name == "users"
-    assert len(query.where) == 1
-    
-    print("✅ DELETE parsing test passed")
-
-
-def test_parse_create_index():
-    """Test CREATE INDEX parsing"""
-    print("\nTesting CREATE INDEX parsing...")
-    
-    parser = SQLParser()
-    
-    # Regular index
-    sql = "CREATE INDEX idx_email ON users(email)"
+USERS_DDL = (
+    "CREATE TABLE users "
+    "(id INTEGER PRIMARY KEY, name VARCHAR(100), age INTEGER)"
+)
+USERS = [(1, 'Alice', 30), (2, 'Bob', 25), (3, 'Charlie', 35)]
+USERS_INSERT = "INSERT INTO users (id, name, age) VALUES (%d, '%s', %d)"
+USERS_SELECT_ALL = "SELECT * FROM users"
+USERS_AGE_INDEX = "CREATE INDEX idx_age ON users(age)"
+
+
+def users_executor(data_dir, parser, rows=USERS):
+    """Fresh executor with the users table holding the given rows"""
+    executor = QueryExecutor(str(data_dir))
+    executor.execute(parser.parse(USERS_DDL))
+    if rows:
+        values = ", ".join("(%d, '%s', %d)" % row for row in rows)
+        result = executor.execute(parser.parse(
+            f"INSERT INTO users (id, name, age) VALUES {values}"
+        ))
+        assert result.rows_affected == len(rows)
+    return executor
+
+
+# (sql, {attribute path: expected value}); a path is dotted attribute
+# names and list positions, e.g. "columns.0.name"
+PARSE_CASES = [
+    (
+        "CREATE TABLE users (id INTEGER PRIMARY KEY, "
+        "name VARCHAR(100) NOT NULL, age INTEGER)",
+        {
+            "query_type": QueryType.CREATE_TABLE,
+            "table_name": "users",
+            "columns.__len__": 3,
+            "columns.0.name": "id",
+            "columns.0.data_type": "INTEGER",
+            "columns.0.constraints": ["PRIMARY_KEY"],
+            "columns.1.name": "name",
+            "columns.1.data_type": "VARCHAR",
+            "columns.1.max_length": 100,
+            "columns.1.constraints": ["NOT_NULL"],
+        },
+    ),
+    # Spaced length, quoted DEFAULT containing a space
+    (
+        "CREATE TABLE notes (title VARCHAR( 20 ) DEFAULT 'no title' UNIQUE)",
+        {
+            "columns.0.max_length": 20,
+            "columns.0.default": "no title",
+            "columns.0.constraints": ["UNIQUE"],
+        },
+    ),
+    (
+        "INSERT INTO users (id, name, age) VALUES (1, 'Alice', 30)",
+        {
+            "query_type": QueryType.INSERT,
+            "table_name": "users",
+            "columns": ['id', 'name', 'age'],
+            "values": [1, 'Alice', 30],
+        },
+    ),
+    (
+        "INSERT INTO users (id, name) VALUES (1, 'a,b'), (2, 'c')",
+        {
+            "values": [1, 'a,b'],
+            "rows": [[1, 'a,b'], [2, 'c']],
+        },
+    ),
+    (
+        "SELECT * FROM users",
+        {
+            "query_type": QueryType.SELECT,
+            "table_name": "users",
+            "columns": ('*',),
+        },
+    ),
+    (
+        "SELECT name, age FROM users WHERE age > 25",
+        {
+            "columns": ['name', 'age'],
+            "where.__len__": 1,
+            "where.0.column": "age",
+            "where.0.value": 25,
+        },
+    ),
+    # Operator characters inside a quoted value
+    (
+        "SELECT * FROM users WHERE name = 'a<=b' AND email IS NULL",
+        {
+            "where.0.column": "name",
+            "where.0.operator": Operator.EQ,
+            "where.0.value": "a<=b",
+            "where.1.operator": Operator.IS_NULL,
+        },
+    ),
+    # AND inside a quoted value is not a separator
+    (
+        "SELECT * FROM shows WHERE title = 'Tom and Jerry' AND id = 1",
+        {
+            "where.__len__": 2,
+            "where.0.value": "Tom and Jerry",
+            "where.1.value": 1,
+        },
+    ),
+    (
+        "SELECT * FROM users ORDER BY age DESC LIMIT 10",
+        {"order_by": [('age', 'DESC')], "limit": 10},
+    ),
+    (
+        "UPDATE users SET age = 31, name = 'Bob' WHERE id = 1",
+        {
+            "query_type": QueryType.UPDATE,
+            "table_name": "users",
+            "updates": {'age': 31, 'name': 'Bob'},
+            "where.__len__": 1,
+            "where.0.column": "id",
+        },
+    ),
+    (
+        "DELETE FROM users WHERE id = 1",
+        {
+            "query_type": QueryType.DELETE,
+            "table_name": "users",
+            "where.__len__": 1,
+        },
+    ),
+    (
+        "CREATE INDEX idx_email ON users(email)",
+        {
+            "query_type": QueryType.CREATE_INDEX,
+            "index_name": "idx_email",
+            "table_name": "users",
+            "column_name": "email",
+            "unique": False,
+        },
+    ),
+    (
+        "CREATE UNIQUE INDEX idx_username ON users(username)",
+        {"unique": True},
+    ),
+    (
+        "SELECT u.name, p.title FROM users u "
+        "INNER JOIN posts p ON u.id = p.author_id",
+        {
+            "query_type": QueryType.SELECT,
+            "joins.__len__": 1,
+            "joins.0.table": "p",
+            "joins.0.on_left": "u.id",
+            "joins.0.on_right": "p.author_id",
+        },
+    ),
+    # JOIN followed by the remaining clauses
+    (
+        "SELECT * FROM users u LEFT JOIN posts p ON u.id = p.author_id "
+        "WHERE u.id = 1 ORDER BY p.title DESC LIMIT 5 OFFSET 2",
+        {
+            "joins.0.table": "p",
+            "where.0.column": "u.id",
+            "order_by": [('p.title', 'DESC')],
+            "limit": 5,
+            "offset": 2,
+        },
+    ),
+    # Clauses out of the usual order are each still found
+    (
+        "SELECT * FROM users WHERE a = 1 LIMIT 10 ORDER BY b",
+        {
+            "where.__len__": 1,
+            "where.0.value": 1,
+            "order_by": [('b', 'ASC')],
+            "limit": 10,
+        },
+    ),
+    (
+        "SELECT * FROM users ORDER BY b LIMIT 3 WHERE a = 2",
+        {
+            "where.0.value": 2,
+            "order_by": [('b', 'ASC')],
+            "limit": 3,
+        },
+    ),
+    (
+        "SELECT * FROM users LIMIT 5 WHERE a = 1",
+        {"where.0.value": 1, "order_by": None, "limit": 5},
+    ),
+    # Malformed LIMIT/OFFSET tails keep the clauses before them intact
+    (
+        "SELECT * FROM users ORDER BY b DESC LIMIT 5 OFFSET x",
+        {"order_by": [('b', 'DESC')], "limit": 5, "offset": None},
+    ),
+    (
+        "SELECT * FROM users WHERE a = 1 LIMIT 5 OFFSET x",
+        {"where.__len__": 1, "where.0.value": 1, "limit": 5, "offset": None},
+    ),
+    (
+        "SELECT * FROM users WHERE a = 1 LIMIT x",
+        {"where.__len__": 1, "where.0.value": 1, "limit": None},
+    ),
+    (
+        "SELECT * FROM users LIMIT 5 OFFSET",
+        {"where": None, "limit": 5, "offset": None},
+    ),
+]
+
+
+def _resolve(obj, path):
+    """Follow a dotted attribute/index path from PARSE_CASES"""
+    for part in path.split("."):
+        if part == "__len__":
+            obj = len(obj)
+        elif part.isdigit():
+            obj = obj[int(part)]
+        else:
+            obj = getattr(obj, part)
+    return obj
+
+
+@pytest.mark.parser
+@pytest.mark.parametrize("sql,expected", PARSE_CASES)
+def test_parse(sql, expected, sql_parser):
+    """Test parsed Query attributes against the expected values"""
+    query = sql_parser.parse(sql)
+    for path, value in expected.items():
+        assert _resolve(query, path) == value, path
+
+
+@pytest.mark.parser
+def test_parse_join_sharing(sql_parser):
+    """Test identical JOIN clauses are shared between parsed queries"""
+    parser = sql_parser
+    
+    sql = ("SELECT * FROM users u LEFT JOIN posts p ON u.id = p.author_id "
+           "WHERE u.id = 1 ORDER BY p.title DESC LIMIT 5 OFFSET 2")
     query = parser.parse(sql)
+    other = parser.parse(sql.replace("u.id = 1", "u.id = 2"))
+    assert other.joins[0] is query.joins[0]
+    assert other.where[0].value == 2
+    
+    # Shared clauses cannot be changed through one of the queries
+    try:
+        query.joins[0].table = "x"
+        assert False, "Should have raised an error"
+    except AttributeError:
+        pass
+
+
+@pytest.mark.parser
+def test_parse_interning(sql_parser):
+    """Test identifiers parsed from different statements are interned"""
+    # Built at runtime so the literal is not interned by the compiler
+    table = "".join(["us", "ers"])
+    queries = [
+        sql_parser.parse(f"INSERT INTO {table} (id) VALUES (1)"),
+        sql_parser.parse(f"SELECT id FROM {table} WHERE id = 1"),
+        sql_parser.parse(f"UPDATE {table} SET id = 2"),
+        sql_parser.parse(f"DELETE FROM {table} WHERE id = 2"),
+    ]
+    for query in queries:
+        assert query.table_name is queries[0].table_name
+    assert queries[0].columns[0] is queries[1].where[0].column
+
+
+@pytest.mark.parser
+def test_parse_dispatch(sql_parser):
+    """Test statement classification is case-insensitive and strict"""
+    parser = sql_parser
+    
+    assert parser.parse("select * from users").query_type == QueryType.SELECT
+    query = parser.parse("Create Unique Index idx_a ON t(a)")
     assert query.query_type == QueryType.CREATE_INDEX
-    assert query.index_name == "idx_email"
-    assert query.table_name == "users"
-    assert query.column_name == "email"
-    assert query.unique == False
-    
-    # Unique index
-    sql = "CREATE UNIQUE INDEX idx_username ON users(username)"
-    query = parser.parse(sql)
     assert query.unique == True
-    
-    print("✅ CREATE INDEX parsing test passed")
+    query = parser.parse("drop\ttable users;")
+    assert query.query_type == QueryType.DROP_TABLE
+    
+    for sql in ["CREATE VIEW v AS SELECT * FROM t", "SELECTED * FROM t"]:
+        try:
+            parser.parse(sql)
+            assert False, "Should have raised ValueError"
+        except ValueError as e:
+            assert "Unsupported query type" in str(e)
+
+
+@pytest.mark.parser
+def test_parse_cache():
+    """Test that repeated statements reuse the cached Query"""
+    parser = SQLParser(cache_size=2)
+
+    first = parser.parse("SELECT * FROM users WHERE id = 1")
+    # Whitespace and trailing semicolon are normalized before lookup
+    assert parser.parse("  SELECT * FROM users WHERE id = 1;") is first
+    assert parser.parse("SELECT * FROM users WHERE id = 2") is not first
+
+    # Least recently used entry is evicted once the cache is full
+    parser.parse("SELECT * FROM posts")
+    assert parser.parse("SELECT * FROM users WHERE id = 1") is not first
+
+    # Errors are not cached
+    for _ in range(2):
+        try:
+            parser.parse("VACUUM users")
+            assert False, "Should have raised ValueError"
+        except ValueError:
+            pass
+
+    # Caching can be disabled
+    parser = SQLParser(cache_size=0)
+    sql = "SELECT * FROM users"
+    assert parser.parse(sql) is not parser.parse(sql)
 
 
-def test_parse_join():
-    """Test JOIN parsing"""
-    print("\nTesting JOIN parsing...")
-    
+@pytest.mark.parser
+def test_parse_many():
+    """Test batch parsing"""
     parser = SQLParser()
-    
-    sql = "SELECT u.name, p.title FROM users u INNER JOIN posts p ON u.id = p.author_id"
-    query = parser.parse(sql)
-    
-    assert query.query_type == QueryType.SELECT
-    assert len(query.joins) == 1
-    assert query.joins[0].table == "p"
-    assert query.joins[0].on_left == "u.id"
-    assert query.joins[0].on_right == "p.author_id"
-    
-    print("✅ JOIN parsing test passed")
-
-
-def test_execute_create_table():
+    hot = parser.parse("SELECT * FROM users")
+    
+    queries = parser.parse_many([
+        "INSERT INTO users (id) VALUES (1);",
+        "SELECT * FROM users",
+        "INSERT INTO users (id) VALUES (1)",
+        "DELETE FROM users WHERE id = 1",
+    ])
+    assert [q.query_type for q in queries] == [
+        QueryType.INSERT, QueryType.SELECT, QueryType.INSERT, QueryType.DELETE
+    ]
+    assert queries[1] is hot
+    assert queries[2] is queries[0]
+    
+    # The batch does not populate the shared cache
+    assert parser.parse("INSERT INTO users (id) VALUES (1)") is not queries[0]
+    
+    try:
+        parser.parse_many(["SELECT * FROM users", "VACUUM"])
+        assert False, "Should have raised ValueError"
+    except ValueError:
+        pass
+
+
+def test_execute_create_table(tmp_path, sql_parser):
     """Test CREATE TABLE execution"""
-    print("\nTesting CREATE TABLE execution...")
-    
-    cleanup()
-    executor = QueryExecutor("test_query_data")
-    parser = SQLParser()
+    parser = sql_parser
+    executor = QueryExecutor(str(tmp_path))
     
     sql = "CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, age INTEGER)"
     query = parser.parse(sql)
@@ -182,22 +362,12 @@ def test_execute_create_table():
     
     assert result.success
     assert executor.schema_manager.table_exists("users")
-    
-    cleanup()
-    print("✅ CREATE TABLE execution test passed")
 
 
-def test_execute_insert():
+def test_execute_insert(tmp_path, sql_parser):
     """Test INSERT execution"""
-    print("\nTesting INSERT execution...")
-    
-    cleanup()
-    executor = QueryExecutor("test_query_data")
-    parser = SQLParser()
-    
-    # Create table
-    sql = "CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100), age INTEGER)"
-    executor.execute(parser.parse(sql))
+    parser = sql_parser
+    executor = users_executor(tmp_path, parser, [])
     
     # Insert data
     sql = "INSERT INTO users (id, name, age) VALUES (1, 'Alice', 30)"
@@ -205,27 +375,15 @@ def test_execute_insert():
     
     assert result.success
     assert result.rows_affected == 1
-    
-    cleanup()
-    print("✅ INSERT execution test passed")
 
 
-def test_execute_select():
+def test_execute_select(tmp_path, sql_parser):
     """Test SELECT execution"""
-    print("\nTesting SELECT execution...")
-    
-    cleanup()
-    executor = QueryExecutor("test_query_data")
-    parser = SQLParser()
-    
-    # Setup
-    executor.execute(parser.parse("CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100), age INTEGER)"))
-    executor.execute(parser.parse("INSERT INTO users (id, name, age) VALUES (1, 'Alice', 30)"))
-    executor.execute(parser.parse("INSERT INTO users (id, name, age) VALUES (2, 'Bob', 25)"))
-    executor.execute(parser.parse("INSERT INTO users (id, name, age) VALUES (3, 'Charlie', 35)"))
+    parser = sql_parser
+    executor = users_executor(tmp_path, parser)
     
     # Select all
-    result = executor.execute(parser.parse("SELECT * FROM users"))
+    result = executor.execute(parser.parse(USERS_SELECT_ALL))
     assert result.success
     assert len(result.rows) == 3
     
@@ -241,22 +399,12 @@ def test_execute_select():
     # Select with LIMIT
     result = executor.execute(parser.parse("SELECT * FROM users LIMIT 2"))
     assert len(result.rows) == 2
-    
-    cleanup()
-    print("✅ SELECT execution test passed")
 
 
-def test_execute_update():
+def test_execute_update(tmp_path, sql_parser):
     """Test UPDATE execution"""
-    print("\nTesting UPDATE execution...")
-    
-    cleanup()
-    executor = QueryExecutor("test_query_data")
-    parser = SQLParser()
-    
-    # Setup
-    executor.execute(parser.parse("CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100), age INTEGER)"))
-    executor.execute(parser.parse("INSERT INTO users (id, name, age) VALUES (1, 'Alice', 30)"))
+    parser = sql_parser
+    executor = users_executor(tmp_path, parser, USERS[:1])
     
     # Update
     result = executor.execute(parser.parse("UPDATE users SET age = 31 WHERE id = 1"))
@@ -266,23 +414,12 @@ def test_execute_update():
     # Verify
     result = executor.execute(parser.parse("SELECT * FROM users WHERE id = 1"))
     assert result.rows[0]['age'] == 31
-    
-    cleanup()
-    print("✅ UPDATE execution test passed")
 
 
-def test_execute_delete():
+def test_execute_delete(tmp_path, sql_parser):
     """Test DELETE execution"""
-    print("\nTesting DELETE execution...")
-    
-    cleanup()
-    executor = QueryExecutor("test_query_data")
-    parser = SQLParser()
-    
-    # Setup
-    executor.execute(parser.parse("CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100), age INTEGER)"))
-    executor.execute(parser.parse("INSERT INTO users (id, name, age) VALUES (1, 'Alice', 30)"))
-    executor.execute(parser.parse("INSERT INTO users (id, name, age) VALUES (2, 'Bob', 25)"))
+    parser = sql_parser
+    executor = users_executor(tmp_path, parser, USERS[:2])
     
     # Delete
     result = executor.execute(parser.parse("DELETE FROM users WHERE id = 1"))
@@ -290,49 +427,141 @@ def test_execute_delete():
     assert result.rows_affected == 1
     
     # Verify
-    result = executor.execute(parser.parse("SELECT * FROM users"))
+    result = executor.execute(parser.parse(USERS_SELECT_ALL))
     assert len(result.rows) == 1
     assert result.rows[0]['id'] == 2
-    
-    cleanup()
-    print("✅ DELETE execution test passed")
 
 
-def test_execute_with_indexes():
+@pytest.mark.parametrize("mode", ["incremental", "bulk"])
+def test_execute_with_indexes(tmp_path, mode, sql_parser):
     """Test queries with indexes"""
-    print("\nTesting queries with indexes...")
-    
-    cleanup()
-    executor = QueryExecutor("test_query_data")
-    parser = SQLParser()
-    
-    # Setup
-    executor.execute(parser.parse("CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100), age INTEGER)"))
-    executor.execute(parser.parse("INSERT INTO users (id, name, age) VALUES (1, 'Alice', 30)"))
-    executor.execute(parser.parse("INSERT INTO users (id, name, age) VALUES (2, 'Bob', 25)"))
-    executor.execute(parser.parse("INSERT INTO users (id, name, age) VALUES (3, 'Charlie', 35)"))
-    
-    # Create index
-    result = executor.execute(parser.parse("CREATE INDEX idx_age ON users(age)"))
-    assert result.success
+    parser = sql_parser
+    # An index created before the rows is maintained entry by entry; one
+    # created over existing rows is bulk loaded from them
+    if mode == "incremental":
+        executor = users_executor(tmp_path, parser, [])
+        result = executor.execute(parser.parse(USERS_AGE_INDEX))
+        assert result.success
+        for row in USERS:
+            executor.execute(parser.parse(USERS_INSERT % row))
+    else:
+        executor = users_executor(tmp_path, parser)
+        result = executor.execute(parser.parse(USERS_AGE_INDEX))
+        assert result.success
+    
+    index = executor.index_manager.get_index("users", "age")
+    table = executor.storage.get_table("users")
+    ages = [table.select_by_id(row_id).data['age']
+            for row_id in index.range_search(None, None)]
+    assert ages == [25, 30, 35]
     
     # Query using index
+    executor.stats.update(index_lookups=0, full_scans=0)
     result = executor.execute(parser.parse("SELECT * FROM users WHERE age = 30"))
     assert result.success
     assert len(result.rows) == 1
     assert result.rows[0]['name'] == 'Alice'
+    assert executor.stats == {"index_lookups": 1, "full_scans": 0}
     
-    cleanup()
-    print("✅ Indexed query test passed")
+    # Conditions on unindexed columns fall back to a scan
+    result = executor.execute(parser.parse(
+        "SELECT * FROM users WHERE name = 'Alice'"
+    ))
+    assert len(result.rows) == 1
+    assert executor.stats == {"index_lookups": 1, "full_scans": 1}
 
 
-def test_unique_constraint():
-    """Test UNIQUE constraint enforcement"""
-    print("\nTesting UNIQUE constraint...")
+def test_execute_insert_rows(tmp_path, sql_parser):
+    """Test multi-row INSERT execution"""
+    parser = sql_parser
+    executor = users_executor(tmp_path, parser, [])
+    executor.execute(parser.parse(USERS_AGE_INDEX))
     
-    cleanup()
-    executor = QueryExecutor("test_query_data")
-    parser = SQLParser()
+    result = executor.execute(parser.parse(
+        "INSERT INTO users (id, name, age) VALUES "
+        "(1, 'Alice', 30), (2, 'Bob', 25)"
+    ))
+    assert result.success
+    assert result.rows_affected == 2
+    result = executor.execute(parser.parse(
+        "SELECT * FROM users WHERE age = 25"
+    ))
+    assert [row['name'] for row in result.rows] == ['Bob']
+    
+    # A duplicate inside the statement or against stored rows, or an
+    # invalid row, rejects the whole statement
+    for sql in [
+        "INSERT INTO users (id, name, age) VALUES "
+        "(3, 'Carl', 40), (3, 'Cat', 41)",
+        "INSERT INTO users (id, name, age) VALUES "
+        "(3, 'Carl', 40), (1, 'Al', 41)",
+        "INSERT INTO users (id, name, age) VALUES "
+        "(3, 'Carl', 40), (4, 'Dee', 'old')",
+    ]:
+        result = executor.execute(parser.parse(sql))
+        assert not result.success
+    result = executor.execute(parser.parse(USERS_SELECT_ALL))
+    assert len(result.rows) == 2
+    result = executor.execute(parser.parse(
+        "SELECT * FROM users WHERE age = 40"
+    ))
+    assert result.rows == []
+    
+    for sql in [
+        "INSERT INTO users (id) VALUES (1) (2)",
+        "INSERT INTO users (id) VALUES (1), (2, 3)",
+    ]:
+        try:
+            parser.parse(sql)
+            assert False, "Should have raised ValueError"
+        except ValueError:
+            pass
+
+
+def test_execute_insert_rows_index_rollback(tmp_path, sql_parser):
+    """Test a multi-row INSERT failing in an index is fully undone"""
+    parser = sql_parser
+    executor = users_executor(tmp_path, parser)
+    executor.execute(parser.parse(USERS_AGE_INDEX))
+    # The schema does not make name unique, so duplicates pass the
+    # pre-insert checks and are only rejected by this index
+    executor.execute(parser.parse(
+        "CREATE UNIQUE INDEX idx_name ON users(name)"
+    ))
+    
+    result = executor.execute(parser.parse(
+        "INSERT INTO users (id, name, age) VALUES "
+        "(4, 'Dan', 40), (5, 'Eve', 41), (6, 'Dan', 42)"
+    ))
+    assert not result.success
+    assert "Index error" in result.message
+    
+    # No rows stored and no index entries left behind
+    table = executor.storage.get_table("users")
+    assert sorted(row['id'] for row in table.select_all()) == [1, 2, 3]
+    age_index = executor.index_manager.get_index("users", "age")
+    assert age_index.range_search(40, None) == []
+    name_index = executor.index_manager.get_index("users", "name")
+    assert name_index.search("Dan") == []
+    assert name_index.search("Eve") == []
+    assert len(age_index.range_search(None, None)) == 3
+    
+    # The same rows go in once the conflict is removed
+    result = executor.execute(parser.parse(
+        "INSERT INTO users (id, name, age) VALUES "
+        "(4, 'Dan', 40), (5, 'Eve', 41)"
+    ))
+    assert result.rows_affected == 2
+    result = executor.execute(parser.parse(
+        "SELECT * FROM users WHERE age >= 40"
+    ))
+    assert sorted(row['name'] for row in result.rows) == ['Dan', 'Eve']
+
+
+def test_unique_constraint(tmp_path, sql_parser):
+    """Test UNIQUE constraint enforcement"""
+    parser = sql_parser
+    executor = QueryExecutor(str(tmp_path))
     
     # Create table with unique constraint
     executor.execute(parser.parse("CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR(100) UNIQUE)"))
@@ -342,40 +571,44 @@ def test_unique_constraint():
     result = executor.execute(parser.parse("INSERT INTO users (id, email) VALUES (2, 'alice@example.com')"))
     assert not result.success
     assert "constraint" in result.message.lower() or "exists" in result.message.lower()
-    
-    cleanup()
-    print("✅ UNIQUE constraint test passed")
+
+    # The freed value can be reused once its row changes or goes away
+    executor.execute(parser.parse(
+        "INSERT INTO users (id, email) VALUES (2, 'bob@example.com')"
+    ))
+    result = executor.execute(parser.parse(
+        "UPDATE users SET email = 'bob@example.com' WHERE id = 1"
+    ))
+    assert not result.success
+    result = executor.execute(parser.parse(
+        "UPDATE users SET email = 'carol@example.com' WHERE id = 1"
+    ))
+    assert result.success
+    executor.execute(parser.parse("DELETE FROM users WHERE id = 2"))
+    result = executor.execute(parser.parse(
+        "INSERT INTO users (id, email) VALUES (3, 'alice@example.com')"
+    ))
+    assert result.success
+    result = executor.execute(parser.parse(
+        "INSERT INTO users (id, email) VALUES (4, 'bob@example.com')"
+    ))
+    assert result.success
 
 
-def test_complex_where():
+def test_complex_where(tmp_path, sql_parser):
     """Test complex WHERE clauses"""
-    print("\nTesting complex WHERE clauses...")
-    
-    cleanup()
-    executor = QueryExecutor("test_query_data")
-    parser = SQLParser()
-    
-    # Setup
-    executor.execute(parser.parse("CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100), age INTEGER)"))
-    executor.execute(parser.parse("INSERT INTO users (id, name, age) VALUES (1, 'Alice', 30)"))
-    executor.execute(parser.parse("INSERT INTO users (id, name, age) VALUES (2, 'Bob', 25)"))
-    executor.execute(parser.parse("INSERT INTO users (id, name, age) VALUES (3, 'Charlie', 35)"))
+    parser = sql_parser
+    executor = users_executor(tmp_path, parser)
     
     # Multiple conditions
     result = executor.execute(parser.parse("SELECT * FROM users WHERE age >= 30 AND age <= 35"))
     assert len(result.rows) == 2
-    
-    cleanup()
-    print("✅ Complex WHERE test passed")
 
 
-def test_data_types():
+def test_data_types(tmp_path, sql_parser):
     """Test various data types"""
-    print("\nTesting data types...")
-    
-    cleanup()
-    executor = QueryExecutor("test_query_data")
-    parser = SQLParser()
+    parser = sql_parser
+    executor = QueryExecutor(str(tmp_path))
     
     sql = """CREATE TABLE products (
         id INTEGER PRIMARY KEY,
@@ -393,41 +626,4 @@ def test_data_types():
     result = executor.execute(parser.parse("SELECT * FROM products"))
     assert result.rows[0]['price'] == 19.99
     assert result.rows[0]['in_stock'] == True
-    
-    cleanup()
-    print("✅ Data types test passed")
-
-
-def run_all_tests():
-    """Run all query engine tests"""
-    print("=" * 70)
-    print("Running Query Engine Tests (Parser + Executor)")
-    print("=" * 70)
-    
-    # Parser tests
-    test_parse_create_table()
-    test_parse_insert()
-    test_parse_select()
-    test_parse_update()
-    test_parse_delete()
-    test_parse_create_index()
-    test_parse_join()
-    
-    # Executor tests
-    test_execute_create_table()
-    test_execute_insert()
-    test_execute_select()
-    test_execute_update()
-    test_execute_delete()
-    test_execute_with_indexes()
-    test_unique_constraint()
-    test_complex_where()
-    test_data_types()
-    
-    print("\n" + "=" * 70)
-    print("✅ All query engine tests passed!")
-    print("=" * 70)
-
-
-if __name__ == "__main__":
-    run_all_tests()
\ No newline at end of file
+
@@ -1,100 +1,83 @@
 """
 Basic tests for REPL functionality
-Run with: python tests/test_repl.py
+Run with: python -m pytest tests/test_repl.py
+or simply: python tests/test_repl.py
 """
 
+import io
 import sys
 import os
-import shutil
+import readline
 from pathlib import Path
-from io import StringIO
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-from simpldb.repl import SimplDBREPL
+import pytest
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-def cleanup():
-    """Clean up test data"""
-    test_dir = Path("test_repl_data")
-    if test_dir.exists():
-        shutil.rmtree(test_dir)
+from simpldb.repl import PAGE_SIZE, SimplDBREPL
 
 
-def test_repl_creation():
+def test_repl_creation(tmp_path):
     """Test REPL initialization"""
-    print("Testing REPL creation...")
-    
-    cleanup()
-    repl = SimplDBREPL(db_name="test_repl", data_dir="test_repl_data")
+    repl = SimplDBREPL(db_name="test_repl", data_dir=str(tmp_path))
     
     assert repl.db is not None
     assert repl.running is True
     assert repl.db.name == "test_repl"
     
     repl.exit_repl()
-    cleanup()
-    print("✅ REPL creation test passed")
+    
+    # Non-interactive (--execute) mode leaves readline untouched
+    readline.set_completer(None)
+    repl = SimplDBREPL(db_name="test_repl", data_dir=str(tmp_path),
+                       interactive=False)
+    assert readline.get_completer() is None
+    
+    repl.exit_repl()
 
 
-def test_execute_sql():
+def test_execute_sql(capsys, tmp_path):
     """Test SQL execution through REPL"""
-    print("\nTesting SQL execution...")
-    
-    cleanup()
-    repl = SimplDBREPL(data_dir="test_repl_data")
-    
-    # Capture output
-    old_stdout = sys.stdout
-    sys.stdout = StringIO()
+    repl = SimplDBREPL(data_dir=str(tmp_path))
     
     # Create table
     repl.execute_sql("CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100));")
-    output = sys.stdout.getvalue()
-    
-    sys.stdout = old_stdout
+    output = capsys.readouterr().out
     
     assert "created successfully" in output.lower() or "executed" in output.lower()
     assert "users" in repl.db.list_tables()
     
     repl.exit_repl()
-    cleanup()
-    print("✅ SQL execution test passed")
 
 
-def test_meta_commands():
+def test_meta_commands(capsys, tmp_path):
     """Test meta commands"""
-    print("\nTesting meta commands...")
-    
-    cleanup()
-    repl = SimplDBREPL(data_dir="test_repl_data")
+    repl = SimplDBREPL(data_dir=str(tmp_path))
     
     # Create test table
     repl.db.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100))")
     repl.db.execute("INSERT INTO users (id, name) VALUES (1, 'Alice')")
     
     # Test .tables
-    old_stdout = sys.stdout
-    sys.stdout = StringIO()
-    
     repl.show_tables([])
-    output = sys.stdout.getvalue()
-    
-    sys.stdout = old_stdout
+    output = capsys.readouterr().out
     
     assert "users" in output
+    assert "(1 rows)" in output
+    
+    # Writes through the shell refresh the cached statistics
+    repl.execute_sql("INSERT INTO users (id, name) VALUES (2, 'Bob');")
+    repl.show_tables([])
+    output = capsys.readouterr().out
+    
+    assert "(2 rows)" in output
     
     repl.exit_repl()
-    cleanup()
-    print("✅ Meta commands test passed")
 
 
-def test_display_results():
+def test_display_results(capsys, tmp_path):
     """Test result display"""
-    print("\nTesting result display...")
-    
-    cleanup()
-    repl = SimplDBREPL(data_dir="test_repl_data")
+    repl = SimplDBREPL(data_dir=str(tmp_path))
     
     # Create and populate table
     repl.db.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100), age INTEGER)")
@@ -105,29 +88,69 @@ def test_display_results():
     result = repl.db.execute("SELECT * FROM users")
     
     # Test display
-    old_stdout = sys.stdout
-    sys.stdout = StringIO()
-    
     repl.display_results(result.rows)
-    output = sys.stdout.getvalue()
-    
-    sys.stdout = old_stdout
+    output = capsys.readouterr().out
     
     assert "Alice" in output
     assert "Bob" in output
     assert "id" in output  # Header
+
+    # Rows with differing keys leave the missing cells blank
+    repl.display_results([{"id": 1, "name": "Carol"}, {"id": 2}])
+    output = capsys.readouterr().out
+
+    assert "Carol" in output
+    assert "|    2 |        |" in output
     
     repl.exit_repl()
-    cleanup()
-    print("✅ Result display test passed")
 
 
-def test_describe_table():
-    """Test describe table functionality"""
-    print("\nTesting describe table...")
+def test_display_results_paged(capsys, tmp_path):
+    """Test that large results are rendered in pages"""
+    repl = SimplDBREPL(data_dir=str(tmp_path))
     
-    cleanup()
-    repl = SimplDBREPL(data_dir="test_repl_data")
+    rows = [{"id": i, "name": f"user{i}"} for i in range(PAGE_SIZE + 5)]
+    rows[-1]["email"] = "last@example.com"
+    
+    repl.display_results(rows)
+    output = capsys.readouterr().out
+    
+    assert f"user{PAGE_SIZE + 4}" in output
+    # Headers are printed for the first page and again when they change
+    assert output.count("| name") == 2
+    assert "email" in output
+    
+    repl.exit_repl()
+
+
+def test_display_results_pager(capsys, monkeypatch, tmp_path):
+    """Test that the pager stops on q without touching readline history"""
+    repl = SimplDBREPL(data_dir=str(tmp_path))
+    
+    class TTYInput(io.StringIO):
+        def isatty(self):
+            return True
+    
+    monkeypatch.setattr(sys, "stdin", TTYInput("\nq\n"))
+    monkeypatch.setattr(sys.stdout, "isatty", lambda: True)
+    history_length = readline.get_current_history_length()
+    
+    rows = [{"id": i, "name": f"user{i}"} for i in range(PAGE_SIZE * 4)]
+    repl.display_results(rows)
+    output = capsys.readouterr().out
+    
+    # Enter shows the second page, q stops before the third
+    assert output.count("-- more --") == 2
+    assert f"user{PAGE_SIZE * 2 - 1}" in output
+    assert f"user{PAGE_SIZE * 2}" not in output
+    assert readline.get_current_history_length() == history_length
+    
+    repl.exit_repl()
+
+
+def test_describe_table(capsys, tmp_path):
+    """Test describe table functionality"""
+    repl = SimplDBREPL(data_dir=str(tmp_path))
     
     # Create table
     repl.db.execute("""
@@ -138,72 +161,99 @@ def test_describe_table():
         )
     """)
     
-    old_stdout = sys.stdout
-    sys.stdout = StringIO()
-    
     repl.describe_table(['users'])
-    output = sys.stdout.getvalue()
-    
-    sys.stdout = old_stdout
+    output = capsys.readouterr().out
     
     assert "users" in output.lower()
     assert "id" in output
     assert "username" in output
     assert "PRIMARY_KEY" in output or "primary" in output.lower()
+    assert "Row Count: 0" in output
+
+    # Repeated describes are cached until the next write
+    assert repl._describe("users") is repl._describe("users")
+    repl.execute_sql(
+        "INSERT INTO users (id, username, age) VALUES (1, 'alice', 30)"
+    )
+
+    repl.describe_table(['users'])
+    output = capsys.readouterr().out
+
+    assert "Row Count: 1" in output
     
     repl.exit_repl()
-    cleanup()
-    print("✅ Describe table test passed")
 
 
-def test_stats():
+def test_stats(capsys, tmp_path):
     """Test statistics display"""
-    print("\nTesting statistics...")
-    
-    cleanup()
-    repl = SimplDBREPL(data_dir="test_repl_data")
+    repl = SimplDBREPL(data_dir=str(tmp_path))
     
     # Create and populate table
     repl.db.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100))")
     repl.db.execute("INSERT INTO users (id, name) VALUES (1, 'Alice')")
     repl.db.execute("INSERT INTO users (id, name) VALUES (2, 'Bob')")
     
-    old_stdout = sys.stdout
-    sys.stdout = StringIO()
-    
     repl.show_stats([])
-    output = sys.stdout.getvalue()
-    
-    sys.stdout = old_stdout
+    output = capsys.readouterr().out
     
     assert "users" in output.lower()
     assert "2" in output  # Row count
     
     repl.exit_repl()
-    cleanup()
-    print("✅ Statistics test passed")
 
 
-def test_export_import():
-    """Test schema export/import"""
-    print("\nTesting export/import...")
+def test_completer(tmp_path):
+    """Test tab completion"""
+    repl = SimplDBREPL(data_dir=str(tmp_path))
     
-    cleanup()
-    repl = SimplDBREPL(data_dir="test_repl_data")
+    assert repl._completer("SEL", 0) == "SELECT"
+    assert repl._completer("SEL", 1) is None
+    assert repl._completer(".ta", 0) == ".tables"
+    assert repl._completer("us", 0) is None
+    
+    # Creating a table through the shell refreshes the cached names
+    repl.execute_sql("CREATE TABLE users (id INTEGER PRIMARY KEY);")
+    
+    assert repl._completer("us", 0) == "users"
+    # "u" matches both the UPDATE/UNIQUE keywords and the table
+    options = [repl._completer("u", i) for i in range(4)]
+    assert options == ["UNIQUE", "UPDATE", "users", None]
+    
+    repl.exit_repl()
+
+
+def test_run_script(capsys, tmp_path):
+    """Test running a piped script"""
+    repl = SimplDBREPL(data_dir=str(tmp_path), interactive=False)
+    
+    script = """
+CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100));
+INSERT INTO users (id, name)
+    VALUES (1, 'Alice');
+.tables
+SELECT * FROM users;
+"""
+    repl.run_script(script)
+    output = capsys.readouterr().out
+    
+    assert "Alice" in output
+    assert "users (1 rows)" in output
+    assert "simpldb>" not in output
+    assert repl.running is False
+
+
+def test_export_import(tmp_path):
+    """Test schema export/import"""
+    repl = SimplDBREPL(data_dir=str(tmp_path))
     
     # Create table
     repl.db.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100))")
     
     # Export
-    export_file = "test_repl_data/test_export.json"
-    
-    old_stdout = sys.stdout
-    sys.stdout = StringIO()
+    export_file = str(tmp_path / "test_export.json")
     
     repl.export_schema([export_file])
     
-    sys.stdout = old_stdout
-    
     assert Path(export_file).exists()
     
     # Drop table
@@ -211,40 +261,12 @@ def test_export_import():
     assert "users" not in repl.db.list_tables()
     
     # Import
-    old_stdout = sys.stdout
-    sys.stdout = StringIO()
-    
     repl.import_schema([export_file])
     
-    sys.stdout = old_stdout
-    
     assert "users" in repl.db.list_tables()
     
     repl.exit_repl()
-    cleanup()
-    print("✅ Export/import test passed")
-
-
-def run_all_tests():
-    """Run all REPL tests"""
-    print("=" * 70)
-    print("Running REPL Tests")
-    print("=" * 70)
-    
-    test_repl_creation()
-    test_execute_sql()
-    test_meta_commands()
-    test_display_results()
-    test_describe_table()
-    test_stats()
-    test_export_import()
-    
-    print("\n" + "=" * 70)
-    print("✅ All REPL tests passed!")
-    print("=" * 70)
-    print("\nNote: Interactive features (readline, tab completion) require")
-    print("manual testing. Run: python -m simpldb.repl")
 
 
 if __name__ == "__main__":
-    run_all_tests()
\ No newline at end of file
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -6,33 +6,38 @@ or simply: python tests/test_storage.py
 
 import sys
 import os
-import shutil
-from pathlib import Path
+import threading
+import time
+
+import pytest
 
 # Add parent directory to path so we can import simpldb
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from simpldb.storage import Storage, TableStorage, Row
+from simpldb.storage import RWLock, Storage, TableStorage, Row
 
 
 def setup_test_storage():
     """Create a clean test storage"""
-    test_dir = Path("test_data")
-    if test_dir.exists():
-        shutil.rmtree(test_dir)
+    cleanup_test_storage()
     return Storage("test_data")
 
 
 def cleanup_test_storage():
     """Remove test data"""
-    test_dir = Path("test_data")
-    if test_dir.exists():
-        shutil.rmtree(test_dir)
+    # The directory is flat, so unlinking its entries is enough (no
+    # recursive walk or existence check)
+    try:
+        with os.scandir("test_data") as entries:
+            for entry in entries:
+                os.unlink(entry.path)
+        os.rmdir("test_data")
+    except FileNotFoundError:
+        pass
 
 
 def test_row_creation():
     """Test Row class"""
-    print("Testing Row creation...")
     row = Row({"name": "Alice", "age": 30}, row_id=1)
     assert row['name'] == "Alice"
     assert row['age'] == 30
@@ -41,12 +46,20 @@ def test_row_creation():
     # Test dict-like access
     row['age'] = 31
     assert row['age'] == 31
-    print("✅ Row creation test passed")
+    
+    # Stored timestamps are kept; a change restamps updated_at
+    stamp = "2025-01-01T00:00:00"
+    row = Row.from_dict({"row_id": 2, "data": {"age": 1},
+                         "created_at": stamp, "updated_at": stamp})
+    assert row.created_at == row.updated_at == stamp
+    row['age'] = 2
+    assert row.created_at == stamp
+    assert row.updated_at > stamp
+    assert row.to_dict()["updated_at"] == row.updated_at
 
 
 def test_insert_and_select():
     """Test insert and select operations"""
-    print("\nTesting insert and select...")
     storage = setup_test_storage()
     users = storage.get_table("users")
     
@@ -67,12 +80,10 @@ def test_insert_and_select():
     assert alice['name'] == "Alice"
     
     cleanup_test_storage()
-    print("✅ Insert and select test passed")
 
 
 def test_update():
     """Test update operations"""
-    print("\nTesting update...")
     storage = setup_test_storage()
     users = storage.get_table("users")
     
@@ -92,12 +103,10 @@ def test_update():
     assert success is False
     
     cleanup_test_storage()
-    print("✅ Update test passed")
 
 
 def test_delete():
     """Test delete operations"""
-    print("\nTesting delete...")
     storage = setup_test_storage()
     users = storage.get_table("users")
     
@@ -119,12 +128,10 @@ def test_delete():
     assert users.count() == 0
     
     cleanup_test_storage()
-    print("✅ Delete test passed")
 
 
 def test_insert_many():
     """Test bulk insert"""
-    print("\nTesting bulk insert...")
     storage = setup_test_storage()
     users = storage.get_table("users")
     
@@ -138,14 +145,24 @@ def test_insert_many():
     assert len(ids) == 3
     assert ids == [1, 2, 3]
     assert users.count() == 3
+    # A batch is stamped once
+    assert len({row.created_at for row in users.select_all()}) == 1
+    assert users.select_column("age") == ([1, 2, 3], [30, 25, 35])
+
+    # Repeated short strings and column names share one object
+    users.insert_many([{"status": "act" + "ive"}, {"status": "active"}])
+    loaded = users.select_all()
+    assert loaded[-2]["status"] is loaded[-1]["status"]
+    reloaded = Storage("test_data").get_table("users").select_all()
+    assert reloaded[-1]["status"] is loaded[-1]["status"]
+    assert not hasattr(loaded[-1], "__dict__")  # Rows use __slots__
+    assert users.select_column("status")[1] == [None] * 3 + ["active"] * 2
     
     cleanup_test_storage()
-    print("✅ Bulk insert test passed")
 
 
 def test_metadata():
     """Test metadata storage"""
-    print("\nTesting metadata...")
     storage = setup_test_storage()
     users = storage.get_table("users")
     
@@ -157,12 +174,10 @@ def test_metadata():
     assert users.get_metadata("nonexistent", "default") == "default"
     
     cleanup_test_storage()
-    print("✅ Metadata test passed")
 
 
 def test_table_management():
     """Test table creation and listing"""
-    print("\nTesting table management...")
     storage = setup_test_storage()
     
     # Create tables
@@ -183,13 +198,10 @@ def test_table_management():
     assert "comments" not in tables
     
     cleanup_test_storage()
-    print("✅ Table management test passed")
 
 
 def test_persistence():
     """Test data persistence across storage instances"""
-    print("\nTesting persistence...")
-    
     # Create storage and insert data
     storage1 = Storage("test_data")
     users1 = storage1.get_table("users")
@@ -204,28 +216,117 @@ def test_persistence():
     assert all_users[0]['name'] == "Alice"
     
     cleanup_test_storage()
-    print("✅ Persistence test passed")
 
 
-def run_all_tests():
-    """Run all tests"""
-    print("=" * 60)
-    print("Running Storage Layer Tests")
-    print("=" * 60)
+def test_change_log():
+    """Test that changes are logged, replayed and compacted"""
+    storage = setup_test_storage()
+    users = storage.get_table("users")
+    
+    id1 = users.insert({"name": "Alice", "age": 30})
+    id2 = users.insert({"name": "Bob", "age": 25})
+    users.update_by_id(id1, {"age": 31})
+    users.delete_by_id(id2)
+    users.set_metadata("owner", "admin")
+    assert users.log_path.exists()
+    # Updates log only the columns that changed
+    users.update_by_id(id1, {"name": "Alice", "age": 31})
+    assert users.log_path.read_text().splitlines()[-1].startswith(
+        '{"op":"u","id":1,"d":{},'
+    )
+    
+    # A new instance replays the log on top of the snapshot
+    reopened = Storage("test_data").get_table("users")
+    assert reopened.count() == 1
+    assert reopened.select_by_id(id1)["age"] == 31
+    assert reopened.get_metadata("owner") == "admin"
+    
+    # Closing folds the log into the snapshot
+    reopened.close()
+    assert not reopened.log_path.exists()
+    reopened = Storage("test_data").get_table("users")
+    assert reopened.select_by_id(id1)["age"] == 31
+    assert reopened.insert({"name": "Carol", "age": 40}) == 3
+    
+    # Rows handed out are copies of the stored ones
+    row = reopened.select_by_id(id1)
+    row["age"] = 99
+    assert reopened.select_by_id(id1)["age"] == 31
+    
+    # Without autocommit, records reach the file on commit()
+    buffered = Storage("test_data", autocommit=False)
+    orders = buffered.get_table("orders")
+    orders.insert({"item": "book"})
+    assert Storage("test_data").get_table("orders").count() == 0
+    buffered.commit()
+    assert Storage("test_data").get_table("orders").count() == 1
+    
+    cleanup_test_storage()
+
+
+def test_sync_policies():
+    """Test fsync policies for the change log"""
+    setup_test_storage()
     
-    test_row_creation()
-    test_insert_and_select()
-    test_update()
-    test_delete()
-    test_insert_many()
-    test_metadata()
-    test_table_management()
-    test_persistence()
+    # Group commit: a background thread fsyncs shortly after a write
+    storage = Storage("test_data", sync="batch", commit_interval_ms=10)
+    users = storage.get_table("users")
+    users.insert({"name": "Alice"})
+    assert users._sync_thread is not None
+    for _ in range(100):
+        if not users._unsynced:
+            break
+        time.sleep(0.01)
+    assert not users._unsynced
+    storage.close()
+    assert users._sync_thread is None
+    
+    # Per-write fsync
+    storage = Storage("test_data", sync="always")
+    storage.get_table("users").insert({"name": "Bob"})
+    assert Storage("test_data").get_table("users").count() == 2
+    
+    # A batch writes and fsyncs once at the end, including for tables
+    # first opened inside it
+    with storage.batch():
+        storage.get_table("users").insert({"name": "Carol"})
+        with storage.batch():
+            storage.get_table("orders").insert({"item": "book"})
+        storage.get_table("users").insert({"name": "Dave"})
+        assert Storage("test_data").get_table("users").count() == 2
+        assert Storage("test_data").get_table("orders").count() == 0
+    assert Storage("test_data").get_table("users").count() == 4
+    assert Storage("test_data").get_table("orders").count() == 1
+    
+    try:
+        Storage("test_data", sync="sometimes")
+        assert False, "Should have raised ValueError"
+    except ValueError as e:
+        assert "sync policy" in str(e)
     
-    print("\n" + "=" * 60)
-    print("✅ All tests passed!")
-    print("=" * 60)
+    cleanup_test_storage()
+
+
+def test_rwlock():
+    """Test that readers share the table lock and writers do not"""
+    lock = RWLock()
+    events = []
+    
+    def write():
+        with lock:
+            events.append("write")
+    
+    with lock.reader:
+        # A second reader gets in while the first still holds the lock
+        with lock.reader:
+            events.append("read")
+        writer = threading.Thread(target=write)
+        writer.start()
+        writer.join(0.05)
+        assert events == ["read"]  # The writer waits for the reader
+    writer.join()
+    assert events == ["read", "write"]
 
 
 if __name__ == "__main__":
-    run_all_tests()
\ No newline at end of file
+    sys.exit(pytest.main([__file__, "-q"]))
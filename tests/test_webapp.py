@@ -0,0 +1,37 @@
+"""
+Smoke tests for the web application entry point
+Run with: python -m pytest tests/test_webapp.py
+(skipped unless the webapp requirements are installed)
+"""
+
+import runpy
+import sys
+
+import pytest
+
+flask = pytest.importorskip("flask")
+pytest.importorskip("dotenv")
+
+
+def test_run_as_main(tmp_path, monkeypatch):
+    """Test `python -m webapp.app` serves the module's app"""
+    monkeypatch.setenv("SECRET_KEY", "test")
+    monkeypatch.setenv("DATABASE_DIR", str(tmp_path / "data"))
+    # Config reads the environment on import
+    for name in list(sys.modules):
+        if name == "webapp" or name.startswith("webapp."):
+            monkeypatch.delitem(sys.modules, name)
+
+    runs = []
+    monkeypatch.setattr(
+        flask.Flask, "run", lambda app, **kwargs: runs.append((app, kwargs))
+    )
+
+    # Opening a second Database on the data directory would raise here
+    namespace = runpy.run_module("webapp.app", run_name="__main__")
+
+    [(app, kwargs)] = runs
+    assert app is namespace["app"]
+    # The reloader's child process could not take the directory lock
+    assert kwargs["use_reloader"] is False
+    assert app.test_client().get("/health").status_code == 200
@@ -39,7 +39,13 @@ def create_app(config_class=Config):
 
 app = create_app()
 
-# Local dev only
+# Local dev only. Reuses the app above: its Database holds the data
+# directory's lock, so neither a second create_app() nor the reloader's
+# child process could open it
 if __name__ == "__main__":
-    app = create_app()
-    app.run(debug=Config.DEBUG, host=Config.HOST, port=Config.PORT)
+    app.run(
+        debug=Config.DEBUG,
+        host=Config.HOST,
+        port=Config.PORT,
+        use_reloader=False,
+    )